@@ -0,0 +1,48 @@
+import argparse, logging, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from fake_providers import FakeAIProvider
+from synthetic import write_swagger_spec
+
+###------ AI Fan-out Benchmark -----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare single-prompt and chunked AI enhancement against a fake provider.")
+    parser.add_argument('--operations', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.2, help="Simulated latency of every request in seconds.")
+    parser.add_argument('--seconds-per-1k-tokens', type=float, default=0.05, help="Simulated generation time per 1k prompt tokens.")
+    parser.add_argument('--rate-limit-probability', type=float, default=0.1, help="Probability that a request answers 429.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--tokens-per-minute', type=int)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        swagger_file = os.path.join(workdir, "swagger.json")
+        write_swagger_spec(swagger_file, args.operations)
+        os.chdir(workdir)
+        documentation = pipeline.generate_documentation(*pipeline.parse_swagger(swagger_file))
+
+    provider = FakeAIProvider(latency=args.latency, seconds_per_1k_tokens=args.seconds_per_1k_tokens)
+    pipeline.register_ai_provider('fake', provider)
+    start = time.perf_counter()
+    pipeline.ai_component(documentation, ai='fake')
+    print(f"{'single prompt':>16}: {time.perf_counter() - start:6.2f}s, 1 request")
+
+    for concurrency in args.concurrency:
+        provider = FakeAIProvider(latency=args.latency, seconds_per_1k_tokens=args.seconds_per_1k_tokens,
+                                  rate_limit_probability=args.rate_limit_probability)
+        pipeline.register_ai_provider('fake', provider)
+        start = time.perf_counter()
+        output = pipeline.ai_component_chunked(documentation, ai='fake', max_concurrency=concurrency,
+                                               tokens_per_minute=args.tokens_per_minute)
+        elapsed = time.perf_counter() - start
+        print(f"{'chunked x' + str(concurrency):>16}: {elapsed:6.2f}s, {provider.calls} requests, "
+              f"{provider.rate_limited} rate limited, max in flight {provider.max_in_flight}, "
+              f"{len(output)} chars")
+
+if __name__ == "__main__":
+    main()
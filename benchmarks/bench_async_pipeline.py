@@ -0,0 +1,61 @@
+import argparse, logging, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from fake_providers import FakeAIProvider
+from synthetic import write_swagger_spec, write_test_file
+
+###------ Async Pipeline Benchmark -----
+def run(mode_flag, concurrency, latency):
+    """
+    Runs the pipeline once in the current directory against a fake provider.
+
+    Args:
+        mode_flag (str): '--chunked' for the sequential stages, '--async-pipeline' for the overlapping ones.
+        concurrency (int): The maximum number of AI requests in flight.
+        latency (float): The simulated latency of every request in seconds.
+
+    Returns:
+        tuple: The wall time in seconds, the number of requests and the generated documentation.
+    """
+
+    provider = FakeAIProvider(latency=latency)
+    pipeline.register_ai_provider('fake', provider)
+    args = pipeline.parse_args(['--swagger', "swagger.json", '--tests', "test_api.py", '--ai', 'fake', '--no-cache',
+                                '--no-spec-cache', '--max-concurrency', str(concurrency), mode_flag])
+    start = time.perf_counter()
+    pipeline.run_pipeline(args, pipeline.PipelineMetrics())
+    elapsed = time.perf_counter() - start
+    with open(args.output) as f:
+        return elapsed, provider.calls, f.read()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the sequential chunked pipeline with the async pipeline whose stages overlap.")
+    parser.add_argument('--operations', type=int, default=2000)
+    parser.add_argument('--tests', type=int, help="Number of tests in the test file. One per 10 operations by default.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Simulated latency of every request in seconds.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16])
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_swagger_spec(os.path.join(workdir, "swagger.json"), args.operations)
+        write_test_file(os.path.join(workdir, "test_api.py"), args.operations,
+                        args.tests if args.tests is not None else args.operations // 10)
+        os.chdir(workdir)
+        print(f"{'concurrency':>11} {'mode':>12} {'wall s':>8} {'requests':>9}")
+        for concurrency in args.concurrency:
+            outputs = []
+            for label, flag in (('sequential', '--chunked'), ('async', '--async-pipeline')):
+                elapsed, calls, output = run(flag, concurrency, args.latency)
+                outputs.append(output)
+                print(f"{concurrency:>11} {label:>12} {elapsed:>8.2f} {calls:>9}")
+            if outputs[0] != outputs[1]:
+                print("The async pipeline produced different documentation")
+        os.chdir(BENCHMARK_DIR)
+
+if __name__ == "__main__":
+    main()
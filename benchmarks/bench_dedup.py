@@ -0,0 +1,54 @@
+import argparse, logging, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from fake_providers import FakeAIProvider
+from synthetic import write_swagger_spec
+
+###------ Deduplication Benchmark -----
+def report_spec(label, swagger_file, latency):
+    """
+    Prints the prompt token reduction of a spec, and the time to enhance it with a fake provider.
+
+    Args:
+        label (str): The name printed for the spec.
+        swagger_file (str): The path to the Swagger file.
+        latency (float): The simulated latency of every request in seconds.
+    """
+
+    metadata, paths = pipeline.parse_swagger(swagger_file)
+    documentation = "".join(pipeline.iter_documentation(metadata, paths))
+    provider = FakeAIProvider(latency=latency)
+    pipeline.register_ai_provider('fake', provider)
+    start = time.perf_counter()
+    _, report = pipeline.ai_component_deduplicated(documentation, paths, ai='fake', max_concurrency=8,
+                                                   schemas=pipeline.schema_renderer(metadata))
+    elapsed = time.perf_counter() - start
+    saved = report['prompt_tokens'] - report['deduplicated_prompt_tokens']
+    print(f"{label:>24} {report['operations']:>10} {report['groups']:>7} {report['prompt_tokens']:>10} "
+          f"{report['deduplicated_prompt_tokens']:>10} {saved / max(report['prompt_tokens'], 1):>6.0%} "
+          f"{provider.calls:>9} {elapsed:>7.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the prompt tokens saved by deduplicating operations before AI enhancement.")
+    parser.add_argument('swagger_files', nargs='*', default=[os.path.join(REPO_DIR, "input", "swagger.json")])
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000], help="Sizes of the synthetic specs also reported.")
+    parser.add_argument('--latency', type=float, default=0.01, help="Simulated latency of every request in seconds.")
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{'spec':>24} {'operations':>10} {'groups':>7} {'tokens':>10} {'dedup':>10} {'saved':>6} {'requests':>9} {'wall s':>7}")
+    for swagger_file in args.swagger_files:
+        report_spec(os.path.basename(swagger_file), swagger_file, args.latency)
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"synthetic_{operations}.json")
+            write_swagger_spec(swagger_file, operations)
+            report_spec(os.path.basename(swagger_file), swagger_file, args.latency)
+
+if __name__ == "__main__":
+    main()
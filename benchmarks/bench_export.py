@@ -0,0 +1,58 @@
+import argparse, logging, os, sys, tempfile, time, tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from synthetic import write_swagger_spec
+
+###------ Export Benchmark -----
+def export_strings(metadata, paths, output_dir):
+    """
+    Baseline export: every format is built as one string, then written, one after the other.
+    """
+
+    for name, renderer in (('markdown', pipeline.iter_documentation), ('html', pipeline.iter_html_documentation),
+                           ('json', pipeline.iter_json_documentation)):
+        content = "".join(renderer(metadata, paths))
+        pipeline.export_documentation(content, os.path.join(output_dir, pipeline.EXPORT_FILENAMES[name]))
+    for filename, title, operations in pipeline.plan_site_pages(paths):
+        content = "".join(pipeline.iter_html_page(title, operations))
+        pipeline.export_documentation(content, os.path.join(output_dir, "site", filename))
+
+def export_streamed(metadata, paths, output_dir):
+    """
+    Streamed export: every file and site page is written fragment by fragment by its own thread.
+    """
+
+    pipeline.export_formats(metadata, paths, pipeline.EXPORT_FORMATS, output_dir)
+
+def measure(export, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    export(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare string-at-once and streamed, parallel multi-format export.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{'operations':>10} {'mode':>9} {'wall s':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations)
+            metadata, paths = pipeline.parse_swagger(swagger_file)
+            output_dir = os.path.join(workdir, f"export_{operations}")
+            for mode, export in (('strings', export_strings), ('streamed', export_streamed)):
+                elapsed, peak = measure(export, metadata, paths, output_dir)
+                print(f"{operations:>10} {mode:>9} {elapsed:>8.2f} {peak:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse, logging, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from mock_http_server import MockAIServer
+
+###------ HTTP Client Benchmark -----
+def run(send, calls, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(calls)))
+    return time.perf_counter() - start, results
+
+def post_until_accepted(client, url, payload):
+    """
+    Sends a request with the client, sending it again while it is rate limited, as
+    `call_ai_provider_with_retry` does. The client itself only retries 5xx answers.
+    """
+
+    while True:
+        try:
+            return client.post(url, json=payload).status_code
+        except pipeline.RateLimitError:
+            continue
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare bare requests.post with the pooled, retrying provider client.")
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--failure-probability', type=float, default=0.05, help="Share of requests answering 429 or 503.")
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+    payload = {'prompt': 'x' * 2000, 'max_tokens': 1500}
+
+    with MockAIServer() as server:
+        elapsed, _ = run(lambda _: requests.post(server.url, json=payload, timeout=10).status_code,
+                         args.calls, args.concurrency)
+        print(f"{'bare requests.post':>20}: {args.calls / elapsed:8.0f} req/s, {len(server.connections)} connections")
+
+    with MockAIServer() as server:
+        client = pipeline.ProviderHTTPClient(pool_size=args.concurrency)
+        elapsed, _ = run(lambda _: client.post(server.url, json=payload).status_code, args.calls, args.concurrency)
+        print(f"{'pooled client':>20}: {args.calls / elapsed:8.0f} req/s, {len(server.connections)} connections")
+
+    half = args.failure_probability / 2
+    with MockAIServer(rate_limit_probability=half, error_probability=half) as server:
+        client = pipeline.ProviderHTTPClient(pool_size=args.concurrency, backoff=0.01)
+        elapsed, statuses = run(lambda _: post_until_accepted(client, server.url, payload), args.calls, args.concurrency)
+        print(f"{'pooled with retries':>20}: {args.calls / elapsed:8.0f} req/s, {server.failures} failures retried, "
+              f"{statuses.count(200)}/{args.calls} succeeded")
+
+if __name__ == "__main__":
+    main()
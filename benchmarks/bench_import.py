@@ -0,0 +1,52 @@
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+
+###------ Import Time Benchmark -----
+HEAVY_MODULES = ('openai', 'google.generativeai', 'grpc', 'google.protobuf', 'requests', 'dotenv')
+SCENARIOS = (
+    ('import main', "import main"),
+    ('+ select gemini, openai', "import main; main.load_ai_provider('gemini'); main.load_ai_provider('openai')"),
+)
+
+def time_command(command, cwd, repeat):
+    """
+    Runs a command in fresh interpreters and measures its wall time.
+
+    Args:
+        command (list): The command to run.
+        cwd (str): The working directory of the command.
+        repeat (int): The number of runs.
+
+    Returns:
+        tuple: The median wall time in seconds, and the standard output of the last run.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(command, cwd=cwd, check=True, capture_output=True, text=True).stdout
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), output
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup cost of importing main.py with and without the AI SDKs.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of runs per scenario; the median is reported.")
+    args = parser.parse_args(argv)
+
+    report = f"; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    print(f"{'scenario':>26} {'wall s':>8}  heavy modules loaded")
+    for label, code in SCENARIOS:
+        elapsed, output = time_command([sys.executable, '-c', code + report], REPO_DIR, args.repeat)
+        print(f"{label:>26} {elapsed:>8.3f}  {output.strip() or '-'}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        command = [sys.executable, os.path.join(REPO_DIR, "main.py"), '--no-ai', '--no-spec-cache',
+                   '--swagger', os.path.join(REPO_DIR, "input", "swagger.json"),
+                   '--tests', os.path.join(REPO_DIR, "input", "test_api.py")]
+        elapsed, _ = time_command(command, workdir, args.repeat)
+        print(f"{'main.py --no-ai (petstore)':>26} {elapsed:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse, gc, json, os, subprocess, sys, tempfile, tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic import write_swagger_spec
+
+###------ Legacy Parser -----
+def parse_swagger_dicts(swagger_file):
+    """
+    The original parser, which copies every parameter into a new dict and keeps responses raw.
+    """
+
+    import main
+
+    with open(swagger_file, 'r') as f:
+        swagger_data = json.load(f)
+    metadata = main.parse_swagger_metadata(swagger_data)
+    parsed_paths = {}
+    for path, methods in swagger_data.get('paths', {}).items():
+        parsed_methods = {}
+        for method, details in methods.items():
+            parsed_params = []
+            for param in details.get('parameters', []):
+                if '$ref' in param:
+                    param = main.resolve_ref(param['$ref'], swagger_data)
+                parsed_params.append({
+                    'name': param.get('name'),
+                    'in': param.get('in'),
+                    'description': param.get('description', 'No description'),
+                    'required': param.get('required', False),
+                    'type': param.get('type', 'N/A'),
+                    'format': param.get('format', 'N/A')
+                })
+            parsed_methods[method] = {
+                'description': details.get('description', 'No description'),
+                'parameters': parsed_params,
+                'responses': details.get('responses', {})
+            }
+        parsed_paths[path] = parsed_methods
+    return metadata, parsed_paths
+
+###------ IR Memory Benchmark -----
+def retained_memory(swagger_file, representation):
+    """
+    Measures the memory retained by the parsed representation of a Swagger file.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        representation (str): 'dict' for the original parser or 'ir' for the slotted intermediate representation.
+
+    Returns:
+        int: The number of bytes still allocated once parsing returned.
+    """
+
+    import main
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    parsed = parse_swagger_dicts(swagger_file) if representation == 'dict' else main.parse_swagger(swagger_file)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del parsed
+    return retained
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the memory retained by the dict-based and the slotted parsed representation.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[50000])
+    parser.add_argument('--params', type=int, default=4, help="Number of parameters per operation.")
+    parser.add_argument('--worker', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(retained_memory(*args.worker))
+        return
+
+    print(f"{'operations':>10} {'dict MB':>9} {'IR MB':>9} {'dict B/op':>10} {'IR B/op':>9} {'saved':>6}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations, args.params)
+            # Each representation is measured in a fresh interpreter
+            sizes = [int(subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', swagger_file, representation],
+                                        check=True, capture_output=True, text=True).stdout.split()[-1])
+                     for representation in ('dict', 'ir')]
+            print(f"{operations:>10} {sizes[0] / 2 ** 20:>9.1f} {sizes[1] / 2 ** 20:>9.1f} {sizes[0] // operations:>10} "
+                  f"{sizes[1] // operations:>9} {1 - sizes[1] / sizes[0]:>6.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse, json, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import yaml
+import main as pipeline
+from synthetic import write_swagger_spec, write_swagger_yaml
+
+###------ Loader Benchmark -----
+def json_loader(swagger_file):
+    with open(swagger_file, 'r') as f:
+        return json.load(f)
+
+def orjson_loader(swagger_file):
+    with open(swagger_file, 'rb') as f:
+        return pipeline.orjson.loads(f.read())
+
+def yaml_loader(loader):
+    def load(swagger_file):
+        with open(swagger_file, 'rb') as f:
+            return yaml.load(f, Loader=loader)
+    return load
+
+def time_loader(loader, swagger_file, repeat):
+    """
+    Times the best of several loads of a spec file.
+
+    Args:
+        loader (callable): The function loading the file.
+        swagger_file (str): The path to the spec file.
+        repeat (int): The number of loads to run.
+
+    Returns:
+        float: The fastest load time in seconds.
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(swagger_file)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare spec load time per format and parser.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'operations':>10} {'format':>6} {'file MB':>8} {'loader':>22} {'best s':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            json_file = os.path.join(workdir, f"swagger_{operations}.json")
+            yaml_file = os.path.join(workdir, f"swagger_{operations}.yaml")
+            write_swagger_spec(json_file, operations)
+            write_swagger_yaml(yaml_file, operations)
+
+            loaders = [('json', json_file, 'json.load', json_loader)]
+            if pipeline.orjson is not None:
+                loaders.append(('json', json_file, 'orjson.loads', orjson_loader))
+            if hasattr(yaml, 'CSafeLoader'):
+                loaders.append(('yaml', yaml_file, 'yaml CSafeLoader', yaml_loader(yaml.CSafeLoader)))
+            loaders.append(('yaml', yaml_file, 'yaml SafeLoader', yaml_loader(yaml.SafeLoader)))
+            loaders.append(('json', json_file, 'load_swagger_document', pipeline.load_swagger_document))
+            loaders.append(('yaml', yaml_file, 'load_swagger_document', pipeline.load_swagger_document))
+
+            for file_format, swagger_file, name, loader in loaders:
+                size_mb = os.path.getsize(swagger_file) / (1024 * 1024)
+                elapsed = time_loader(loader, swagger_file, args.repeat)
+                print(f"{operations:>10} {file_format:>6} {size_mb:>8.1f} {name:>22} {elapsed:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse, os, resource, subprocess, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic import write_swagger_spec
+
+###------ Parser Benchmark -----
+def peak_rss_mb():
+    """
+    Measures the peak RSS of the current process.
+
+    On Linux, `ru_maxrss` survives `exec`, so a worker would report the peak of the benchmark process that
+    generated the spec. The high-water mark of /proc is reset by `exec` and is used when available.
+
+    Returns:
+        float: The peak RSS in MB.
+    """
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_parser(swagger_file, streaming):
+    """
+    Parses and renders a Swagger file in the current process, the way `run_pipeline` does: the eager parser
+    renders the documentation in memory, the streaming parser writes it to disk as it is rendered.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        streaming (bool): Whether to use the incremental parser instead of the eager one.
+
+    Returns:
+        tuple: The wall time in seconds and the peak RSS in MB of the current process.
+    """
+
+    import main
+
+    start = time.perf_counter()
+    if streaming:
+        metadata, paths = main.parse_swagger_streaming(swagger_file)
+        main.write_documentation(metadata, paths, "output/intermediate.md")
+    else:
+        metadata, paths = main.parse_swagger(swagger_file)
+        main.generate_documentation(metadata, paths, index_file=None)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mb()
+
+def measure(swagger_file, streaming):
+    """
+    Runs one parser mode in a fresh interpreter so that peak RSS is not shared between modes.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        streaming (bool): Whether to use the incremental parser.
+
+    Returns:
+        tuple: The wall time in seconds and the peak RSS in MB.
+    """
+
+    command = [sys.executable, os.path.abspath(__file__), '--worker', swagger_file]
+    if streaming:
+        command.append('--streaming-parser')
+    # Both modes write output/intermediate.md relative to the working directory
+    output = subprocess.run(command, cwd=os.path.dirname(swagger_file), check=True,
+                            capture_output=True, text=True).stdout
+    elapsed, peak_mb = output.split()
+    return float(elapsed), float(peak_mb)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare peak RSS and wall time of the eager and streaming Swagger parsers.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--unique', action='store_true',
+                        help="Give every operation its own parameters and inline response schema, so nothing can be shared.")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--streaming-parser', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print("%f %f" % run_parser(args.worker, args.streaming_parser))
+        return
+
+    print(f"{'operations':>10} {'file MB':>8} {'mode':>9} {'wall s':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations, unique=args.unique)
+            size_mb = os.path.getsize(swagger_file) / (1024 * 1024)
+            for mode, streaming in (('eager', False), ('streaming', True)):
+                elapsed, peak_mb = measure(swagger_file, streaming)
+                print(f"{operations:>10} {size_mb:>8.1f} {mode:>9} {elapsed:>8.2f} {peak_mb:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse, json, logging, os, platform, statistics, subprocess, sys, tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic import write_swagger_spec, write_test_file
+
+###------ End-to-End Pipeline Benchmark -----
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+PROFILES = {
+    'small': {'operations': 200, 'params': 4, 'ref_density': 0.0, 'nesting_depth': 1},
+    'large': {'operations': 5000, 'params': 4, 'ref_density': 0.0, 'nesting_depth': 1},
+    'refs': {'operations': 2000, 'params': 8, 'ref_density': 1.0, 'nesting_depth': 1},
+    'deep': {'operations': 2000, 'params': 4, 'ref_density': 0.5, 'nesting_depth': 12},
+    'wide': {'operations': 2000, 'params': 24, 'ref_density': 0.25, 'nesting_depth': 3},
+}
+MODE_FLAGS = {'single': [], 'chunked': ['--chunked'], 'dedup': ['--dedup'], 'incremental': ['--incremental'],
+              'async': ['--async-pipeline']}
+
+def run_worker(mode, trace_memory):
+    """
+    Runs the whole pipeline once in the current directory, with a stub AI provider that answers instantly.
+
+    Args:
+        mode (str): The AI enhancement mode, a key of `MODE_FLAGS`.
+        trace_memory (bool): Whether to measure the peak memory of every stage, which slows the stages down.
+
+    Returns:
+        dict: The metrics report of the run. See `PipelineMetrics.report`.
+    """
+
+    import main as pipeline
+    from fake_providers import FakeAIProvider
+
+    logging.disable(logging.INFO)
+    pipeline.register_ai_provider('stub', FakeAIProvider(latency=0))
+    args = pipeline.parse_args(['--swagger', "swagger.json", '--tests', "test_api.py", '--ai', 'stub', '--no-cache',
+                                '--no-spec-cache', '--manifest', "output/manifest.json"] + MODE_FLAGS[mode])
+    metrics = pipeline.PipelineMetrics(trace_memory=trace_memory)
+    pipeline.run_pipeline(args, metrics)
+    metrics.stop()
+    return metrics.report()
+
+def measure(workdir, mode, trace_memory):
+    """
+    Runs the pipeline in a fresh interpreter, so that runs share no caches or allocations.
+
+    Args:
+        workdir (str): The directory holding `swagger.json` and `test_api.py`. Outputs are written under it.
+        mode (str): The AI enhancement mode.
+        trace_memory (bool): Whether to measure peak memory.
+
+    Returns:
+        dict: The metrics report of the run.
+    """
+
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--mode', mode]
+    if trace_memory:
+        command.append('--trace-memory')
+    output = subprocess.run(command, cwd=workdir, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def benchmark_profile(config, mode, repeat):
+    """
+    Generates the spec and test file of a profile, then times every stage and measures its peak memory.
+
+    Durations are the median of `repeat` runs without memory tracing; peak memory comes from one extra
+    traced run.
+
+    Args:
+        config (dict): The generator parameters: operations, params, ref_density and nesting_depth.
+        mode (str): The AI enhancement mode.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict: The configuration, the total duration and the duration and peak memory of every stage.
+    """
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_swagger_spec(os.path.join(workdir, "swagger.json"), config['operations'], config['params'],
+                           config['ref_density'], config['nesting_depth'])
+        write_test_file(os.path.join(workdir, "test_api.py"), config['operations'])
+        timed = [measure(workdir, mode, trace_memory=False) for _ in range(repeat)]
+        traced = measure(workdir, mode, trace_memory=True)
+
+    stages = {}
+    for name, record in traced['stages'].items():
+        stages[name] = {'seconds': statistics.median(run['stages'][name]['seconds'] for run in timed),
+                        'peak_memory_bytes': record['peak_memory_bytes']}
+    return {'config': config, 'mode': mode, 'counters': traced['counters'],
+            'total_seconds': statistics.median(run['total_seconds'] for run in timed), 'stages': stages}
+
+def compare(name, result, baseline, tolerance, min_seconds, min_memory_bytes):
+    """
+    Prints the stages of a profile next to the baseline, flagging regressions.
+
+    A stage regresses if it is slower, or peaks higher, than the baseline by more than `tolerance` and
+    by more than an absolute margin, so that the noise of very short stages is not reported.
+
+    Args:
+        name (str): The profile name.
+        result (dict): The result of `benchmark_profile`.
+        baseline (dict, optional): The stored result of the same profile, or None.
+        tolerance (float): The allowed relative increase, e.g. 0.25 for 25%.
+        min_seconds (float): The smallest increase in seconds reported as a regression.
+        min_memory_bytes (int): The smallest increase in bytes reported as a regression.
+
+    Returns:
+        list: The descriptions of the regressions.
+    """
+
+    if baseline and (baseline['config'] != result['config'] or baseline['mode'] != result['mode']):
+        print(f"{name}: the baseline was recorded with another configuration, not compared")
+        baseline = None
+    regressions = []
+    for stage, record in result['stages'].items():
+        reference = (baseline or {}).get('stages', {}).get(stage)
+        columns = f"{name:>8} {stage:>12} {record['seconds']:>9.3f} {record['peak_memory_bytes'] / 2 ** 20:>9.1f}"
+        if reference is None:
+            print(f"{columns} {'-':>9} {'-':>9}")
+            continue
+        flags = []
+        for key, margin, label in (('seconds', min_seconds, 'time'), ('peak_memory_bytes', min_memory_bytes, 'memory')):
+            if record[key] > reference[key] * (1 + tolerance) and record[key] - reference[key] > margin:
+                flags.append(label)
+                regressions.append(f"{name}/{stage} {label}: {reference[key]:.3g} -> {record[key]:.3g}")
+        print(f"{columns} {reference['seconds']:>9.3f} {reference['peak_memory_bytes'] / 2 ** 20:>9.1f}"
+              f"{'  REGRESSION (' + ', '.join(flags) + ')' if flags else ''}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic specs and compare against a stored baseline.")
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=list(PROFILES),
+                        help="Named generator configurations to run.")
+    parser.add_argument('--operations', type=int, help="Run a custom profile with this many operations instead.")
+    parser.add_argument('--params', type=int, default=4, help="Parameters per operation of the custom profile.")
+    parser.add_argument('--ref-density', type=float, default=0.0, help="Fraction of shared parameters of the custom profile.")
+    parser.add_argument('--nesting-depth', type=int, default=1, help="Response schema depth of the custom profile.")
+    parser.add_argument('--mode', choices=sorted(MODE_FLAGS), default='single', help="AI enhancement mode of the pipeline.")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of timed runs per profile; the median is reported.")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline results to compare against.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store the results as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative increase before a regression is reported.")
+    parser.add_argument('--min-seconds', type=float, default=0.02, help="Smallest slowdown in seconds reported as a regression.")
+    parser.add_argument('--min-memory-mb', type=float, default=1.0, help="Smallest peak memory increase in MB reported as a regression.")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--trace-memory', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.mode, args.trace_memory)))
+        return
+
+    if args.operations:
+        profiles = {'custom': {'operations': args.operations, 'params': args.params,
+                               'ref_density': args.ref_density, 'nesting_depth': args.nesting_depth}}
+    else:
+        profiles = {name: PROFILES[name] for name in args.profiles}
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {'results': {}}
+    key = lambda name: f"{name}/{args.mode}"
+
+    print(f"{'profile':>8} {'stage':>12} {'seconds':>9} {'peak MB':>9} {'base s':>9} {'base MB':>9}")
+    results, regressions = {}, []
+    for name, config in profiles.items():
+        results[key(name)] = benchmark_profile(config, args.mode, args.repeat)
+        regressions += compare(name, results[key(name)], baseline['results'].get(key(name)),
+                               args.tolerance, args.min_seconds, args.min_memory_mb * 2 ** 20)
+
+    if args.save_baseline:
+        baseline = {'python': platform.python_version(), 'machine': platform.machine(),
+                    'results': {**baseline['results'], **results}}
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline stored in {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regressions against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
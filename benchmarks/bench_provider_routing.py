@@ -0,0 +1,66 @@
+import argparse, logging, os, sys, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from fake_providers import FakeAIProvider
+
+###------ Provider Routing Benchmark -----
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[int(fraction * (len(samples) - 1))]
+
+def run_strategy(router, requests):
+    """
+    Sends sequential requests through a router.
+
+    Args:
+        router (ProviderRouter): The router under test.
+        requests (int): The number of requests.
+
+    Returns:
+        tuple: The latencies in seconds and the number of requests left unimproved.
+    """
+
+    latencies = []
+    degraded = 0
+    for index in range(requests):
+        documentation = f"# Request {index}"
+        start = time.perf_counter()
+        if router.call(f"prompt {index}", documentation) == documentation:
+            degraded += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, degraded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare tail latency of a single AI service, a fallback chain and hedged requests.")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help="Usual latency of the fake services in seconds.")
+    parser.add_argument('--slow-latency', type=float, default=1.0, help="Latency of the slow requests in seconds.")
+    parser.add_argument('--slow-probability', type=float, default=0.02, help="Probability that a request of the primary service is slow.")
+    parser.add_argument('--failure-probability', type=float, default=0.05, help="Probability that a request of the primary service fails.")
+    parser.add_argument('--hedge-after', type=float, default=0.2, help="Hedging delay until enough latencies were measured.")
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    strategies = [
+        ('single', ['primary'], {}),
+        ('fallback', ['primary', 'secondary'], {}),
+        ('hedged', ['primary', 'secondary'], {'hedge_after': args.hedge_after}),
+    ]
+    print(f"{'strategy':>10} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7} {'degraded':>9} {'hedges':>7} {'fallbacks':>10}")
+    for label, chain, options in strategies:
+        pipeline.register_ai_provider('primary', FakeAIProvider(latency=args.latency, slow_latency=args.slow_latency,
+                                                                slow_probability=args.slow_probability,
+                                                                failure_probability=args.failure_probability, seed=1))
+        pipeline.register_ai_provider('secondary', FakeAIProvider(latency=args.latency * 1.5, seed=2, marker="secondary"))
+        router = pipeline.ProviderRouter(chain, **options)
+        latencies, degraded = run_strategy(router, args.requests)
+        stats = router.stats()
+        print(f"{label:>10} {percentile(latencies, 0.5):>7.3f} {percentile(latencies, 0.95):>7.3f} "
+              f"{percentile(latencies, 0.99):>7.3f} {max(latencies):>7.3f} {degraded:>9} {stats['hedges']:>7} {stats['fallbacks']:>10}")
+
+if __name__ == "__main__":
+    main()
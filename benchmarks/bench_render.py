@@ -0,0 +1,79 @@
+import argparse, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from synthetic import write_swagger_spec
+
+###------ Legacy Renderers -----
+def concat_documentation(metadata, paths):
+    """
+    The original renderer, which concatenates every line onto a single string.
+    """
+
+    documentation = f"# {metadata['title']} (v{metadata['version']})\n\n"
+    documentation += f"{metadata['description']}\n\n"
+
+    for path, methods in paths.items():
+        documentation += f"## Path: {path}\n"
+        for method, details in methods.items():
+            documentation += f"### Method: {method.upper()}\n"
+            documentation += f"Description: {details.description}\n"
+            documentation += "Parameters:\n"
+            for param in details.parameters:
+                documentation += f"- {param.name} ({param.location}): {param.description} (Required: {param.required}, Type: {param.type}, Format: {param.format})\n"
+            documentation += "Responses:\n"
+            for response in details.responses:
+                documentation += f"- {response.status}: {response.description}\n"
+            documentation += "\n"
+    return documentation
+
+def concat_test_summary_prompt(test_summaries):
+    """
+    The original test summary renderer, which concatenates every line onto a single string.
+    """
+
+    prompt_summary = "\n### Unit Test Summary:\n\n"
+    for test in test_summaries:
+        prompt_summary += f"- **{test['name']}**: {test['description']}\n"
+        prompt_summary += f"  - Expected output: {', '.join(test['expected_output'])}\n\n"
+    return prompt_summary.strip()
+
+###------ Render Benchmark -----
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the concatenating and the list-join documentation renderers.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args(argv)
+
+    print(f"{'operations':>10} {'concat s':>9} {'join s':>9} {'to file s':>9} {'tests concat s':>14} {'tests join s':>12} identical")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations)
+            metadata, paths = pipeline.parse_swagger(swagger_file)
+            test_summaries = [{'name': f"test_operation_{index}", 'description': f"Test operation {index}.",
+                               'expected_output': ["response.status_code == 200"]} for index in range(operations)]
+
+            concat_time, concat_output = timed(concat_documentation, metadata, paths)
+            # The legacy renderers do not render schemas
+            join_time, join_output = timed(lambda: "".join(pipeline.iter_documentation(metadata, paths, 0)))
+            output_file = os.path.join(workdir, "documentation.md")
+            file_time, _ = timed(pipeline.write_documentation, metadata, paths, output_file, 0)
+            with open(output_file, 'r') as f:
+                file_output = f.read()
+            tests_concat_time, tests_concat = timed(concat_test_summary_prompt, test_summaries)
+            tests_join_time, tests_join = timed(pipeline.generate_test_summary_prompt, test_summaries)
+
+            identical = concat_output == join_output == file_output and tests_concat == tests_join
+            print(f"{operations:>10} {concat_time:>9.3f} {join_time:>9.3f} {file_time:>9.3f} "
+                  f"{tests_concat_time:>14.3f} {tests_join_time:>12.3f} {identical}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from synthetic import write_swagger_spec
+
+###------ Inline Schema Renderer -----
+def iter_inline_schema(schema, definitions, depth, max_depth, indent="  "):
+    """
+    Expands a schema under the response that uses it, following references up to `max_depth` levels.
+    """
+
+    if '$ref' in schema:
+        schema = definitions.get(schema['$ref'].rsplit('/', 1)[-1], {})
+    for name, prop in schema.get('properties', {}).items():
+        target = prop.get('items', prop)
+        yield f"{indent}- {name}: {prop.get('type', target.get('$ref', 'object'))}\n"
+        if depth < max_depth and ('$ref' in target or 'properties' in target):
+            yield from iter_inline_schema(target, definitions, depth + 1, max_depth, indent + "  ")
+
+def inline_documentation(metadata, paths, max_depth):
+    """
+    Renders every response with its schema expanded in place, repeating shared definitions at every use.
+    """
+
+    definitions = metadata['definitions']
+    lines = [pipeline.render_header(metadata)]
+    for section in pipeline.iter_operation_sections(pipeline.iter_operations(paths)):
+        lines.append(section)
+    for _, _, details in pipeline.iter_operations(paths):
+        for response in details.responses:
+            if isinstance(response.schema, dict):
+                lines.extend(iter_inline_schema(response.schema, definitions, 1, max_depth))
+    return "".join(lines)
+
+###------ Schema Rendering Benchmark -----
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare linked, memoized model rendering with schemas expanded inline at every use.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 4000])
+    parser.add_argument('--nesting-depth', type=int, nargs='+', default=[2, 6, 8],
+                        help="Depth of the synthetic definitions; schemas are expanded to the same depth.")
+    args = parser.parse_args(argv)
+
+    print(f"{'operations':>10} {'depth':>5} {'models':>6} {'inline s':>9} {'inline KB':>10} {'linked s':>9} {'linked KB':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for operations in args.operations:
+            for depth in args.nesting_depth:
+                swagger_file = os.path.join(workdir, f"swagger_{operations}_{depth}.json")
+                write_swagger_spec(swagger_file, operations, nesting_depth=depth)
+                metadata, paths = pipeline.parse_swagger(swagger_file)
+
+                inline_time, inline_output = timed(inline_documentation, metadata, paths, depth)
+                linked_time, linked_output = timed(lambda: "".join(pipeline.iter_documentation(metadata, paths, depth)))
+                print(f"{operations:>10} {depth:>5} {linked_output.count(pipeline.MODEL_PREFIX):>6} "
+                      f"{inline_time:>9.3f} {len(inline_output) / 1024:>10.0f} "
+                      f"{linked_time:>9.3f} {len(linked_output) / 1024:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse, logging, os, re, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from synthetic import write_swagger_spec
+
+###------ Search Index Benchmark -----
+QUERIES = ['method:delete', 'param:field2 method:put', 'resource17*', 'path:resource123']
+
+def grep_documentation(markdown_file, pattern):
+    """
+    Baseline lookup: scans the whole Markdown file for path headings matching a pattern.
+    """
+
+    regex = re.compile(pattern)
+    with open(markdown_file, 'r') as f:
+        return [line for line in f if line.startswith("## Path:") and regex.search(line)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure search index size, build time and query latency against scanning the Markdown.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{'operations':>10} {'md MB':>6} {'idx MB':>7} {'build s':>8} {'query':>26} {'hits':>5} {'index ms':>9} {'scan ms':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations)
+            metadata, paths = pipeline.parse_swagger(swagger_file)
+            index_file = os.path.join(workdir, f"search_{operations}.idx")
+            start = time.perf_counter()
+            pipeline.generate_documentation(metadata, paths, index_file=index_file)
+            with_index = time.perf_counter() - start
+            start = time.perf_counter()
+            pipeline.generate_documentation(metadata, paths, index_file=None)
+            build = with_index - (time.perf_counter() - start)
+            markdown_mb = os.path.getsize("output/intermediate.md") / (1024 * 1024)
+            index_mb = os.path.getsize(index_file) / (1024 * 1024)
+            for query in QUERIES:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    # Every query opens and maps the index, as a CLI lookup would
+                    hits = len(pipeline.search_indexes([index_file], query))
+                index_ms = (time.perf_counter() - start) * 1000 / args.repeat
+                start = time.perf_counter()
+                grep_documentation("output/intermediate.md", r"resource123\b")
+                scan_ms = (time.perf_counter() - start) * 1000
+                print(f"{operations:>10} {markdown_mb:>6.1f} {index_mb:>7.1f} {build:>8.2f} {query:>26} {hits:>5} {index_ms:>9.2f} {scan_ms:>8.2f}")
+
+if __name__ == "__main__":
+    main()
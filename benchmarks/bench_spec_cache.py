@@ -0,0 +1,46 @@
+import argparse, os, sys, tempfile, time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import main as pipeline
+from synthetic import write_swagger_spec
+
+###------ Spec Cache Benchmark -----
+def time_parse(swagger_file, cache):
+    """
+    Times one parse of a Swagger file.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        cache (SpecCache): The cache of parsed specs, or None.
+
+    Returns:
+        float: The wall time in seconds.
+    """
+
+    start = time.perf_counter()
+    pipeline.parse_swagger(swagger_file, cache=cache)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare uncached, cold and warm parses of the parsed spec cache.")
+    parser.add_argument('--operations', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args(argv)
+
+    print(f"{'operations':>10} {'file MB':>8} {'cache MB':>9} {'uncached s':>11} {'cold s':>8} {'warm s':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = pipeline.SpecCache(os.path.join(workdir, 'cache'))
+        for operations in args.operations:
+            swagger_file = os.path.join(workdir, f"swagger_{operations}.json")
+            write_swagger_spec(swagger_file, operations)
+            uncached = time_parse(swagger_file, None)
+            cold = time_parse(swagger_file, cache)
+            warm = time_parse(swagger_file, cache)
+            size_mb = os.path.getsize(swagger_file) / (1024 * 1024)
+            cache_mb = os.path.getsize(cache._path(pipeline.file_digest(swagger_file))) / (1024 * 1024)
+            print(f"{operations:>10} {size_mb:>8.1f} {cache_mb:>9.1f} {uncached:>11.3f} {cold:>8.3f} {warm:>8.3f} {uncached / warm:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import random, threading, time
+
+from main import RateLimitError, estimate_tokens
+
+###------ Local Fake AI Providers -----
+class FakeAIProvider:
+    """
+    Local stand-in for an AI component that simulates prompt-size dependent latency and HTTP 429 responses.
+
+    Instances are callables with the (prompt, documentation) signature of the real components and
+    can be registered with `main.register_ai_provider`. The improved documentation is the original
+    documentation prefixed with a marker, so stitched outputs can be checked for order. A request
+    fails with `failure_probability`, returning the documentation unchanged like the real components,
+    and takes `slow_latency` seconds instead of `latency` with `slow_probability`, to model a long tail.
+    """
+
+    def __init__(self, latency=0.05, seconds_per_1k_tokens=0.0, rate_limit_probability=0.0, retry_after=0.01, seed=0,
+                 failure_probability=0.0, slow_probability=0.0, slow_latency=1.0, marker="enhanced"):
+        self.latency = latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.failure_probability = failure_probability
+        self.slow_probability = slow_probability
+        self.slow_latency = slow_latency
+        self.marker = marker
+        self.calls = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, documentation):
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            limited = self._random.random() < self.rate_limit_probability
+            if limited:
+                self.rate_limited += 1
+            # Only draw when enabled, so seeded runs without failures or tail latency are unchanged
+            failed = bool(self.failure_probability) and self._random.random() < self.failure_probability
+            if failed:
+                self.failed += 1
+            slow = bool(self.slow_probability) and self._random.random() < self.slow_probability
+        try:
+            if limited:
+                raise RateLimitError(retry_after=self.retry_after)
+            latency = self.slow_latency if slow else self.latency
+            time.sleep(latency + self.seconds_per_1k_tokens * estimate_tokens(prompt) / 1000)
+            if failed:
+                return documentation
+            return f"<!-- {self.marker} -->\n{documentation}".strip()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+class FakeStreamingProvider:
+    """
+    Local stand-in for a streaming AI component.
+
+    Calling an instance with a prompt yields the prompt back in fragments of `chunk_size` characters,
+    after `first_token_latency` seconds and then at `tokens_per_second`. With `fail_after` set, the
+    stream raises after that many fragments to simulate a dropped connection.
+    """
+
+    def __init__(self, first_token_latency=0.2, tokens_per_second=200.0, chunk_size=64, fail_after=None):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+
+    def __call__(self, prompt):
+        time.sleep(self.first_token_latency)
+        for index, start in enumerate(range(0, len(prompt), self.chunk_size)):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise ConnectionError("Simulated dropped stream")
+            chunk = prompt[start:start + self.chunk_size]
+            if index:
+                time.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield chunk
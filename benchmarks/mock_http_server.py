@@ -0,0 +1,84 @@
+import json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+###------ Local Mock AI HTTP Server -----
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # A bare client opens a new connection per request, which overflows the default backlog of 5
+    request_queue_size = 1024
+
+class MockAIServer:
+    """
+    Local HTTP server answering like the Fynd Copilot API, with simulated latency and failures.
+
+    Every POST answers `{"data": {"text": <prompt>}}`. A share of the requests answers 429 with a
+    `Retry-After` header or 503, and the number of distinct client connections is counted so that
+    connection reuse can be checked.
+    """
+
+    def __init__(self, latency=0.0, rate_limit_probability=0.0, error_probability=0.0, retry_after=0, seed=0):
+        self.latency = latency
+        self.rate_limit_probability = rate_limit_probability
+        self.error_probability = error_probability
+        self.retry_after = retry_after
+        self.requests = 0
+        self.failures = 0
+        self.connections = set()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/copilot"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which stalls keep-alive connections on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, headers=()):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with server._lock:
+                    server.requests += 1
+                    server.connections.add(self.client_address)
+                    draw = server._random.random()
+                time.sleep(server.latency)
+                if draw < server.rate_limit_probability:
+                    with server._lock:
+                        server.failures += 1
+                    self._send(429, {'error': 'rate limited'}, [('Retry-After', str(server.retry_after))])
+                elif draw < server.rate_limit_probability + server.error_probability:
+                    with server._lock:
+                        server.failures += 1
+                    self._send(503, {'error': 'unavailable'})
+                else:
+                    self._send(200, {'data': {'text': body.get('prompt', '')}})
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
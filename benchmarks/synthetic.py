@@ -0,0 +1,177 @@
+import json
+
+###------ Synthetic Swagger Specs -----
+HTTP_METHODS = ['get', 'post', 'put', 'delete']
+
+def operation_route(index):
+    """
+    Computes the path and method of a synthetic operation, shared by the spec and test generators.
+
+    Args:
+        index (int): The index of the operation.
+
+    Returns:
+        tuple: The resource number, the path template and the HTTP method of the operation.
+    """
+
+    resource = index // len(HTTP_METHODS)
+    return resource, f"/resource{resource}/{{itemId}}", HTTP_METHODS[index % len(HTTP_METHODS)]
+
+def generate_definitions(nesting_depth):
+    """
+    Generates the `Item` schema, nested `nesting_depth` levels deep through `child` references.
+
+    Args:
+        nesting_depth (int): The number of schemas in the chain, 1 for a flat `Item`.
+
+    Returns:
+        dict: The definitions `Item`, `Item1`, ..., `Item<nesting_depth - 1>`.
+    """
+
+    names = ['Item'] + [f"Item{level}" for level in range(1, nesting_depth)]
+    definitions = {}
+    for level, name in enumerate(names):
+        properties = {'id': {'type': 'integer', 'format': 'int64'}, 'name': {'type': 'string'}}
+        if level + 1 < len(names):
+            properties['child'] = {'$ref': f"#/definitions/{names[level + 1]}"}
+            properties['children'] = {'type': 'array', 'items': {'$ref': f"#/definitions/{names[level + 1]}"}}
+        definitions[name] = {'type': 'object', 'properties': properties}
+    return definitions
+
+def generate_swagger_spec(operations, params_per_operation=4, ref_density=0.0, nesting_depth=1, unique=False):
+    """
+    Generates a deterministic Swagger 2.0 specification of the requested size.
+
+    Args:
+        operations (int): The number of operations to generate.
+        params_per_operation (int): The number of parameters attached to every operation.
+        ref_density (float): The fraction of the query parameters declared once under `parameters` and
+                             referenced with `$ref`, from 0 (all inline) to 1 (all shared). The path
+                             parameter is always a reference.
+        nesting_depth (int): The depth of the response schema. See `generate_definitions`.
+        unique (bool): Whether every operation has its own inline parameter descriptions and an inline
+                       response schema, so that nothing is shared between operations.
+
+    Returns:
+        dict: The generated Swagger data.
+    """
+
+    query_params = max(params_per_operation - 1, 0)
+    shared_params = round(query_params * ref_density)
+    shared = {'itemId': {'name': 'itemId', 'in': 'path', 'description': 'ID of the item', 'required': True,
+                         'type': 'integer', 'format': 'int64'}}
+    paths = {}
+    for index in range(operations):
+        resource, path, method = operation_route(index)
+        parameters = [{'$ref': '#/parameters/itemId'}]
+        for param_index in range(query_params):
+            param = {
+                'name': f"field{param_index}",
+                'in': 'query',
+                'description': f"Filter on field {param_index} of {f'operation {index}' if unique else 'the resource'}.",
+                'required': param_index % 2 == 0,
+                'type': 'string'
+            }
+            if param_index < shared_params and not unique:
+                shared.setdefault(f"field{param_index}", param)
+                param = {'$ref': f"#/parameters/field{param_index}"}
+            parameters.append(param)
+        schema = {'$ref': '#/definitions/Item'}
+        if unique:
+            schema = {'type': 'object', 'properties': {
+                f"op{index}_field{field}": {'type': 'string', 'description': f"Field {field} returned by operation {index}."}
+                for field in range(4)}}
+        paths.setdefault(path, {})[method] = {
+            'tags': [f"resource{resource % 50}"],
+            'description': f"Operation {index} on resource {resource}.",
+            'parameters': parameters,
+            'responses': {
+                '200': {'description': 'successful operation', 'schema': schema},
+                '404': {'description': f"Item not found by operation {index}" if unique else 'Item not found'}
+            }
+        }
+
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'Synthetic API', 'version': '1.0.0', 'description': f"Synthetic spec with {operations} operations."},
+        'paths': paths,
+        'parameters': shared,
+        'definitions': generate_definitions(nesting_depth)
+    }
+
+def write_swagger_spec(filename, operations, params_per_operation=4, ref_density=0.0, nesting_depth=1, unique=False):
+    """
+    Writes a synthetic Swagger specification to disk.
+
+    Args:
+        filename (str): The file path where the specification will be saved.
+        operations (int): The number of operations to generate.
+        params_per_operation (int): The number of parameters attached to every operation.
+        ref_density (float): The fraction of shared query parameters. See `generate_swagger_spec`.
+        nesting_depth (int): The depth of the response schema. See `generate_definitions`.
+        unique (bool): Whether operations share no parameters or schemas. See `generate_swagger_spec`.
+    """
+
+    with open(filename, 'w') as f:
+        json.dump(generate_swagger_spec(operations, params_per_operation, ref_density, nesting_depth, unique), f, indent=2)
+
+def write_swagger_yaml(filename, operations, params_per_operation=4):
+    """
+    Writes a synthetic Swagger specification to disk as YAML.
+
+    Args:
+        filename (str): The file path where the specification will be saved.
+        operations (int): The number of operations to generate.
+        params_per_operation (int): The number of parameters attached to every operation.
+    """
+
+    import yaml
+
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    with open(filename, 'w') as f:
+        yaml.dump(generate_swagger_spec(operations, params_per_operation), f, Dumper=dumper, sort_keys=False)
+
+###------ Synthetic Test Files -----
+def generate_test_source(operations, tests=None):
+    """
+    Generates a deterministic Python test file exercising the operations of a synthetic spec, in the style
+    of `input/test_api.py`: URLs built from a module level BASE_URL and `requests.<method>` calls.
+
+    Args:
+        operations (int): The number of operations of the spec.
+        tests (int, optional): The number of tests, spread evenly over the operations. One per operation by default.
+
+    Returns:
+        str: The source of the test file.
+    """
+
+    tests = operations if tests is None else tests
+    lines = ["import requests\n", "\n", 'BASE_URL = "https://api.example.com/v1"\n']
+    for test_index in range(tests):
+        index = test_index * operations // max(tests, 1)
+        resource, _, method = operation_route(index)
+        lines += [
+            "\n\n",
+            f"def test_operation_{index}():\n",
+            f'    """\n    Test operation {index} on resource {resource}.\n\n'
+            f'    The endpoint is expected to return a 200 status code for an existing item.\n    """\n',
+            f"    item_id = {index}\n",
+            f'    url = f"{{BASE_URL}}/resource{resource}/{{item_id}}"\n',
+            f"    response = requests.{method}(url, params={{'field0': 'value'}})\n",
+            "    print(response.text)\n",
+            "    assert response.status_code == 200\n",
+        ]
+    return "".join(lines)
+
+def write_test_file(filename, operations, tests=None):
+    """
+    Writes a synthetic test file to disk.
+
+    Args:
+        filename (str): The file path where the test file will be saved.
+        operations (int): The number of operations of the spec.
+        tests (int, optional): The number of tests. See `generate_test_source`.
+    """
+
+    with open(filename, 'w') as f:
+        f.write(generate_test_source(operations, tests))
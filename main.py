@@ -1,11 +1,212 @@
-import requests, json, os, openai, ast, logging
-from dotenv import load_dotenv
-import google.generativeai as genai
+import array, json, os, html, urllib.parse, asyncio, importlib, sys, re, glob, fnmatch, time, random, hashlib, threading, functools, email.utils, contextlib, io, pickle, queue, collections, mmap, struct, tracemalloc, cProfile, pstats, ast, logging, argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
-# Load environment variables from .env file
-load_dotenv()
+# AI SDKs, `requests` and the .env file are loaded when an AI service is first used, see `load_ai_provider`
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+###------ Intermediate Representation -----
+class Parameter:
+    """
+    A parameter of an operation. Instances are shared between operations and must not be modified.
+    """
+
+    __slots__ = ('name', 'location', 'description', 'required', 'type', 'format')
+
+    def __init__(self, name, location, description='No description', required=False, type='N/A', format='N/A'):
+        self.name = name
+        self.location = location
+        self.description = description
+        self.required = required
+        self.type = type
+        self.format = format
+
+    def to_dict(self):
+        return {'name': self.name, 'in': self.location, 'description': self.description,
+                'required': self.required, 'type': self.type, 'format': self.format}
+
+class Response:
+    """
+    A response of an operation, with its raw schema if any. Instances are shared between operations and must not be modified.
+    """
+
+    __slots__ = ('status', 'description', 'schema')
+
+    def __init__(self, status, description='No description', schema=None):
+        self.status = status
+        self.description = description
+        self.schema = schema
+
+    def to_dict(self):
+        response = {'description': self.description}
+        if self.schema is not None:
+            response['schema'] = self.schema
+        return response
+
+class Operation:
+    """
+    A parsed operation: its description, tags, parameters and responses.
+    """
+
+    __slots__ = ('description', 'tags', 'parameters', 'responses')
+
+    def __init__(self, description='No description', tags=(), parameters=(), responses=()):
+        self.description = description
+        self.tags = tags
+        self.parameters = parameters
+        self.responses = responses
+
+    def to_dict(self):
+        """
+        Converts the operation to plain data, e.g. for fingerprints or JSON export.
+
+        Returns:
+            dict: The description, tags, parameters and responses (keyed by status) of the operation.
+        """
+
+        return {
+            'description': self.description,
+            'tags': list(self.tags),
+            'parameters': [param.to_dict() for param in self.parameters],
+            'responses': {response.status: response.to_dict() for response in self.responses}
+        }
+
+class IRInterner:
+    """
+    Deduplicates the strings, parameters and responses of a parsed document, so that operations
+    sharing a `$ref` target or repeating the same inline definition point to a single object.
+    """
+
+    def __init__(self):
+        self._parameters = {}
+        self._responses = {}
+        self._schemas = {}
+
+    def string(self, value):
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def parameter(self, name, location, description, required, type, format):
+        values = (self.string(name), self.string(location), self.string(description), required,
+                  self.string(type), self.string(format))
+        if values not in self._parameters:
+            self._parameters[values] = Parameter(*values)
+        return self._parameters[values]
+
+    def response(self, status, description, schema=None):
+        if isinstance(schema, dict) and len(schema) == 1 and '$ref' in schema:
+            # Schemas that only reference a definition are shared by their reference
+            schema = self._schemas.setdefault(schema['$ref'], schema)
+            schema_key = schema['$ref']
+        else:
+            schema_key = id(schema)
+        key = (self.string(status), self.string(description), schema_key)
+        if key not in self._responses:
+            self._responses[key] = Response(key[0], key[1], schema)
+        return self._responses[key]
+
+###------ Spec Loading -----
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+def is_yaml_file(swagger_file):
+    """
+    Detects whether a spec file is written in YAML, from its extension or, failing that, its first character.
+
+    Args:
+        swagger_file (str): The path to the spec file.
+
+    Returns:
+        bool: True for YAML, False for JSON.
+    """
+
+    if swagger_file.lower().endswith(YAML_EXTENSIONS):
+        return True
+    if swagger_file.lower().endswith('.json'):
+        return False
+    with open(swagger_file, 'r') as f:
+        for line in f:
+            if line.strip():
+                return not line.lstrip().startswith(('{', '['))
+    return False
+
+def load_swagger_document(swagger_file):
+    """
+    Loads a Swagger or OpenAPI document with the fastest parser available: orjson for JSON when installed,
+    and the libyaml-backed CSafeLoader for YAML when PyYAML was built with it.
+
+    Args:
+        swagger_file (str): The path to the JSON or YAML spec file.
+
+    Returns:
+        dict: The spec data.
+
+    Raises:
+        ValueError: If the file is not valid JSON or YAML.
+        ImportError: If the file is YAML and PyYAML is not installed.
+    """
+
+    if is_yaml_file(swagger_file):
+        if yaml is None:
+            raise ImportError("PyYAML is required to read YAML specs. Install it with 'pip install pyyaml'.")
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        with open(swagger_file, 'rb') as f:
+            try:
+                return yaml.load(f, Loader=loader)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in {swagger_file}: {e}") from e
+
+    if orjson is not None:
+        with open(swagger_file, 'rb') as f:
+            try:
+                return orjson.loads(f.read())
+            except orjson.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {swagger_file}: {e}") from e
+    with open(swagger_file, 'r') as f:
+        return json.load(f)
+
+def detect_spec_version(swagger_data):
+    """
+    Detects the specification a document follows.
+
+    Args:
+        swagger_data (dict): The spec data.
+
+    Returns:
+        tuple: The specification ('swagger' or 'openapi') and its version string.
+    """
+
+    if 'openapi' in swagger_data:
+        return 'openapi', str(swagger_data['openapi'])
+    return 'swagger', str(swagger_data.get('swagger', '2.0'))
+
+def iter_path_item(path_item, resolver):
+    """
+    Iterates over the operations of a path item, together with the parameters shared by all of them.
+
+    Args:
+        path_item (dict): The raw path item, which may itself be a `$ref`.
+        resolver (RefResolver): The resolver used for references.
+
+    Yields:
+        tuple: A (method, details, shared_parameters, document_uri) tuple for every HTTP method of the path item,
+               where `document_uri` is the document the path item comes from, None for the root document.
+    """
+
+    document_uri = None
+    if '$ref' in path_item:
+        path_item, document_uri = resolver.resolve_document(path_item['$ref'])
+    shared_parameters = path_item.get('parameters', [])
+    for method, details in path_item.items():
+        if method.lower() in HTTP_METHODS:
+            yield method, details, shared_parameters, document_uri
+
 ###------ Data Parsing -----
 def parse_swagger_metadata(swagger_data):
     """
@@ -16,7 +217,8 @@ def parse_swagger_metadata(swagger_data):
 
     Returns:
         dict: A dictionary containing extracted metadata, including title, version, 
-              description, termsOfService, contact, and license information.
+              description, termsOfService, contact, and license information, and the
+              definitions (or OpenAPI 3 component schemas) by name.
     """
 
     info = swagger_data.get('info', {})
@@ -26,417 +228,4842 @@ def parse_swagger_metadata(swagger_data):
         'description': info.get('description', 'No description provided'),
         'termsOfService': info.get('termsOfService', 'No terms provided'),
         'contact': info.get('contact', {}),
-        'license': info.get('license', {})
+        'license': info.get('license', {}),
+        'definitions': swagger_data.get('definitions') or swagger_data.get('components', {}).get('schemas') or {}
     }
     return metadata
 
-def parse_parameters(params, swagger_data):
+def parse_parameters(params, resolver, interner=None, document_uri=None):
     """
     Extracts parameter details from the Swagger data, resolving any references.
 
     Args:
         params (list): A list of parameter objects to be parsed.
-        swagger_data (dict): The entire Swagger data as a dictionary, used to resolve references.
+        resolver (RefResolver or dict): The resolver used for references, or the entire Swagger data as a dictionary.
+        interner (IRInterner, optional): The table sharing identical parameters across operations.
+        document_uri (str, optional): The document the parameters appear in. Defaults to the root document.
 
     Returns:
-        list: A list of dictionaries, each containing the following information for a parameter:
+        tuple: A tuple of Parameter objects, each containing the following information for a parameter:
             - name (str): The name of the parameter.
-            - in (str): The location of the parameter (e.g., 'query', 'header', 'path', etc.).
+            - location (str): The location of the parameter, its `in` field (e.g., 'query', 'header', 'path', etc.).
             - description (str): A description of the parameter, or 'No description' if not provided.
             - required (bool): Whether the parameter is required (default is False).
             - type (str): The data type of the parameter (default is 'N/A' if not provided).
             - format (str): The format of the parameter (default is 'N/A' if not provided).
     """
 
+    resolver = as_resolver(resolver)
+    interner = interner or IRInterner()
     parsed_params = []
     for param in params:
+        # References inside a parameter are relative to the document the parameter was found in
+        param_uri = document_uri
         if '$ref' in param:
-            param = resolve_ref(param['$ref'], swagger_data)
-
-        param_details = {
-            'name': param.get('name'),
-            'in': param.get('in'),
-            'description': param.get('description', 'No description'),
-            'required': param.get('required', False),
-            'type': param.get('type', 'N/A'),
-            'format': param.get('format', 'N/A')
-        }
-        parsed_params.append(param_details)
+            param, param_uri = resolver.resolve_document(param['$ref'], document_uri)
+
+        # OpenAPI 3 describes the type of non-body parameters with a schema
+        type_source = param
+        if 'type' not in param and 'schema' in param and param.get('in') != 'body':
+            type_source = param['schema']
+            if '$ref' in type_source:
+                type_source = resolver.resolve(type_source['$ref'], param_uri)
+
+        # Body parameters are typed by their schema, e.g. 'Pet' or 'array[Pet]'
+        param_type = schema_type_name(param.get('schema')) if param.get('in') == 'body' else schema_type(type_source)
+        parsed_params.append(interner.parameter(
+            param.get('name'),
+            param.get('in'),
+            param.get('description', 'No description'),
+            param.get('required', False),
+            param_type,
+            type_source.get('format', 'N/A')
+        ))
     
-    return parsed_params
+    return tuple(parsed_params)
 
+###------ Reference Resolution -----
+class RefResolver:
+    """
+    Resolves `$ref` pointers of a Swagger document, caching every resolved target.
 
-def resolve_ref(ref, swagger_data):
+    Each (document, pointer) pair is walked at most once. References whose target is itself a
+    `$ref` are followed, with cycle detection, and external file references are loaded once
+    into a document cache, relative to the document the reference appears in. Every target is
+    cached with the document it was found in, see `resolve_document`.
     """
-    Resolves a reference in the Swagger document to get the actual parameter or schema details.
 
-    Args:
-        ref (str): The reference string to resolve.
-        swagger_data (dict): The parsed Swagger data.
+    def __init__(self, swagger_data, base_uri=None):
+        self.base_uri = os.path.abspath(base_uri) if base_uri else ''
+        self._documents = {self.base_uri: swagger_data}
+        self._targets = {}
+        self.hits = 0
+        self.misses = 0
 
-    Returns:
-        dict: The resolved parameter or schema details.
-    """
+    def external_documents(self):
+        """
+        Lists the external documents loaded while resolving references.
 
-    if ref.startswith('#/'):
-        keys = ref[2:].split('/')
-        for key in keys:
-            swagger_data = swagger_data.get(key, {})
-        return swagger_data
-    else:
-        # Handle external references (implement as needed)
-        return {}
+        Returns:
+            list: The absolute paths of every loaded document other than the root document.
+        """
 
-def parse_swagger(swagger_file):
-    """
-    Parses the Swagger file and extracts relevant information.
+        return [uri for uri in self._documents if uri != self.base_uri]
 
-    Args:
-        swagger_file (str): The path to the Swagger file.
+    def stats(self):
+        """
+        Reports the cache counters of the resolver.
 
-    Returns:
-        tuple: A tuple containing metadata (dict) and parsed paths (dict).
-    """
+        Returns:
+            dict: The number of cache hits, misses, cached targets and loaded documents.
+        """
 
-    with open(swagger_file, 'r') as f:
-        swagger_data = json.load(f)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'targets': len(self._targets),
+            'documents': len(self._documents)
+        }
 
-    # Extract metadata
-    metadata = parse_swagger_metadata(swagger_data)
+    def _load_document(self, uri):
+        if uri not in self._documents:
+            self._documents[uri] = load_swagger_document(uri)
+        return self._documents[uri]
 
-    # Parse paths
-    paths = swagger_data.get('paths', {})
-    parsed_paths = {}
-    for path, methods in paths.items():
-        parsed_methods = {}
-        for method, details in methods.items():
-            parsed_params = []
-            if 'parameters' in details:
-                parsed_params = parse_parameters(details['parameters'], swagger_data)
-
-            parsed_methods[method] = {
-                'description': details.get('description', 'No description'),
-                'parameters': parsed_params,
-                'responses': details.get('responses', {})
-            }
-        parsed_paths[path] = parsed_methods
+    def _split(self, ref, document_uri):
+        location, _, pointer = ref.partition('#')
+        if location:
+            base_dir = os.path.dirname(document_uri) if document_uri else os.getcwd()
+            document_uri = os.path.normpath(os.path.join(base_dir, location))
+        return document_uri, pointer
 
-    return metadata, parsed_paths
+    def _walk(self, document, pointer):
+        node = document
+        for token in pointer.split('/')[1:]:
+            token = token.replace('~1', '/').replace('~0', '~')
+            if isinstance(node, list):
+                node = node[int(token)] if token.isdigit() and int(token) < len(node) else {}
+            elif isinstance(node, dict):
+                node = node.get(token, {})
+            else:
+                return {}
+        return node
 
-###------ Generate Intermediate Documentation -----
-def generate_documentation(metadata, paths):
-    """
-    Generates documentation from the parsed data.
+    def resolve(self, ref, document_uri=None):
+        """
+        Resolves a reference to get the actual parameter or schema details.
 
-    Args:
-        metadata (dict): The metadata containing title, version, and description.
-        paths (dict): The parsed paths and their corresponding methods.
+        Args:
+            ref (str): The reference string to resolve, either local (`#/...`) or external (`file.json#/...`).
+            document_uri (str, optional): The document the reference appears in. Defaults to the root document.
 
-    Returns:
-        str: A formatted string representing the generated documentation.
-    """
+        Returns:
+            dict: The resolved parameter or schema details, or an empty dict if the reference cannot be resolved.
+        """
 
-    documentation = f"# {metadata['title']} (v{metadata['version']})\n\n"
-    documentation += f"{metadata['description']}\n\n"
-
-    for path, methods in paths.items():
-        documentation += f"## Path: {path}\n"
-        for method, details in methods.items():
-            documentation += f"### Method: {method.upper()}\n"
-            documentation += f"Description: {details['description']}\n"
-            documentation += "Parameters:\n"
-            for param in details['parameters']:
-                documentation += f"- {param['name']} ({param['in']}): {param['description']} (Required: {param['required']}, Type: {param['type']}, Format: {param['format']})\n"
-            documentation += "Responses:\n"
-            for status, response in details['responses'].items():
-                documentation += f"- {status}: {response.get('description', 'No description')}\n"
-            documentation += "\n"
-    export_documentation(documentation,"output/intermediate.md")
-    return documentation
+        return self.resolve_document(ref, document_uri)[0]
 
+    def resolve_document(self, ref, document_uri=None):
+        """
+        Resolves a reference together with the document its target was found in, against which the
+        references nested in the target must be resolved.
 
-###------ Test_api File analysis code -----
+        Args:
+            ref (str): The reference string to resolve, either local (`#/...`) or external (`file.json#/...`).
+            document_uri (str, optional): The document the reference appears in. Defaults to the root document.
 
-def extract_test_info(test_file):
+        Returns:
+            tuple: The resolved target, or an empty dict, and the absolute path of its document.
+        """
+
+        key = self._split(ref, self.base_uri if document_uri is None else document_uri)
+        if key in self._targets:
+            self.hits += 1
+            return self._targets[key]
+        self.misses += 1
+
+        chain = []
+        target = ({}, key[0])
+        while True:
+            if key in self._targets:
+                target = self._targets[key]
+                break
+            if key in chain:
+                logging.warning("Circular reference detected while resolving %s", ref)
+                target = ({}, key[0])
+                break
+            chain.append(key)
+            try:
+                node = self._walk(self._load_document(key[0]), key[1])
+            except (OSError, ValueError, ImportError) as e:
+                logging.error(f"Error occurred while loading the reference {ref}: {e}")
+                node = {}
+            if isinstance(node, dict) and '$ref' in node:
+                key = self._split(node['$ref'], key[0])
+                continue
+            target = (node, key[0])
+            break
+
+        # Every pointer along the chain resolves to the same final target
+        for visited in chain:
+            self._targets[visited] = target
+        return target
+
+def as_resolver(resolver):
     """
-    Extracts test function names, descriptions (from docstrings), and expected outcomes
-    (assertions or print statements) from a Python test file.
+    Wraps raw Swagger data into a RefResolver, leaving existing resolvers untouched.
 
     Args:
-        test_file (str): The path to the Python file containing the test functions (e.g., 'test_api.py').
+        resolver (RefResolver or dict): A resolver or the parsed Swagger data.
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains the following information for a test function:
-            - name (str): The name of the test function (should start with 'test_').
-            - description (str): The docstring of the test function, or 'No description provided' if no docstring exists.
-            - expected_output (list): A list of expected outcomes, including assertions or print statements. If no assertions or print statements are present, it defaults to 'No explicit output provided'.
+        RefResolver: A resolver for the document.
     """
 
-    with open(test_file, 'r') as file:
-        file_content = file.read()
+    if isinstance(resolver, RefResolver):
+        return resolver
+    return RefResolver(resolver)
 
-    # Parse the file content into an abstract syntax tree (AST)
-    tree = ast.parse(file_content)
-    test_summaries = []
-
-    # Traverse the AST nodes
-    for node in ast.walk(tree):
-        # Look for function definitions
-        if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
-            test_name = node.name
-            docstring = ast.get_docstring(node) or "No description provided."
-
-            # Extract assertions or any print statements for expected output
-            expected_output = []
-            for sub_node in ast.walk(node):
-                if isinstance(sub_node, ast.Assert):
-                    expected_output.append(ast.dump(sub_node.test))
-                elif isinstance(sub_node, ast.Call) and isinstance(sub_node.func, ast.Name) and sub_node.func.id == 'print':
-                    # Capture print statement output for demonstration purposes
-                    expected_output.append(ast.dump(sub_node))
-
-            # Combine test details into a summary
-            summary = {
-                'name': test_name,
-                'description': docstring,
-                'expected_output': expected_output if expected_output else ["No explicit output provided."]
-            }
-            test_summaries.append(summary)
+def resolve_ref(ref, swagger_data):
+    """
+    Resolves a reference in the Swagger document to get the actual parameter or schema details.
 
-    return test_summaries
+    Args:
+        ref (str): The reference string to resolve.
+        swagger_data (RefResolver or dict): A resolver or the parsed Swagger data.
 
-def generate_test_summary_prompt(test_summaries):
+    Returns:
+        dict: The resolved parameter or schema details.
     """
-    Generates a formatted string summarizing the test functions and their expected behavior.
+
+    return as_resolver(swagger_data).resolve(ref)
+
+def media_type_schema(content):
+    """
+    Picks the schema of an OpenAPI 3 `content` map, preferring JSON.
 
     Args:
-        test_summaries (list): A list of dictionaries containing details about each test function.
-                               Each dictionary should include the test's name, description, and expected output.
+        content (dict): The media types of a request body or response.
 
     Returns:
-        str: A formatted string summarizing the test functions, including their names, descriptions, and expected outputs.
+        dict: The schema of the preferred media type, or None.
     """
 
-    prompt_summary = "\n### Unit Test Summary:\n\n"
-    
-    for test in test_summaries:
-        prompt_summary += f"- **{test['name']}**: {test['description']}\n"
-        prompt_summary += f"  - Expected output: {', '.join(test['expected_output'])}\n\n"
-    return prompt_summary.strip()
+    if not content:
+        return None
+    media_type = content.get('application/json') or next(iter(content.values()))
+    return media_type.get('schema') if isinstance(media_type, dict) else None
 
-def enhance_prompt_with_tests(test_file, original_prompt):
+def schema_type(schema, default='N/A'):
     """
-    Enhances the generated documentation by summarizing test cases.
+    Reads the `type` of a schema. OpenAPI 3.1 allows a list of types, which is joined into one name.
 
     Args:
-        test_file (str): The path to the test file.
-        documentation (str): The existing documentation string to enhance.
+        schema (dict): The raw schema or parameter.
+        default (str): The name returned if the schema has no type.
 
     Returns:
-        str: The enhanced documentation including test summaries.
+        str: The type, e.g. 'string' or 'string | null'.
     """
 
-    test_summaries = extract_test_info(test_file)
-    test_summary_prompt = generate_test_summary_prompt(test_summaries)
+    value = schema.get('type', default)
+    return ' | '.join(map(str, value)) if isinstance(value, list) else value
 
-    # Append the test summary to the original prompt
-    enhanced_prompt = f"{original_prompt}\n\n{test_summary_prompt}"
+def is_array_schema(schema):
+    """
+    Tells whether a schema is typed as an array, alone or among the list of types of OpenAPI 3.1.
 
-    return enhanced_prompt
+    Args:
+        schema (dict): The raw schema.
 
+    Returns:
+        bool: True if the schema is an array.
+    """
 
-###------ Improvise Documentation with GenAI -----
+    value = schema.get('type')
+    return value == 'array' or isinstance(value, list) and 'array' in value
 
-def openai_ai_component(prompt, documentation): ## Not tested
+def schema_type_name(schema):
     """
-    Processes the documentation through the OpenAI API for improvements.
+    Names the type of a body schema: the name of the referenced definition, an array of it, or its type.
 
     Args:
-        documentation (str): The documentation string to process.
-        model (str): The OpenAI model to use for processing.
+        schema (dict): The raw schema, or None.
 
     Returns:
-        str: The improved documentation generated by the AI model.
+        str: The type name, e.g. 'Pet', 'array[Pet]' or 'object', or 'N/A' if the schema is missing.
     """
 
-    try:
-        api_key = os.getenv('OPENAI_API_KEY')
-        
-        if not api_key:
-            print("API key not found. Please set the 'OPENAI_API_KEY' environment variable.")
-            return documentation
-        openai.api_key = api_key
+    if not isinstance(schema, dict):
+        return 'N/A'
+    if '$ref' in schema:
+        return schema['$ref'].rsplit('/', 1)[-1]
+    if is_array_schema(schema) and isinstance(schema.get('items'), dict):
+        return f"array[{schema_type_name(schema['items'])}]"
+    return schema_type(schema)
 
-        response = openai.Completion.create(
-                model="gpt-3.5-turbo", 
-                prompt=prompt,
-                max_tokens=1500,        # Adjust based on your needs
-                temperature=0.7,        # Control creativity
-                n=1,                    # Number of responses to return
-                stop=None             
-            )
+def parse_request_body(request_body, resolver, interner, document_uri=None):
+    """
+    Normalizes an OpenAPI 3 request body into a Swagger 2 style `body` parameter.
 
-        # Extract the content from the API response
-        improved_documentation = response['choices'][0]['message']['content']
-    
-        return improved_documentation.strip()  # Return the cleaned output
-    except:
-        logging.error("Error occured while running the OpenAI. Return default documentation")
-        return documentation
+    Args:
+        request_body (dict): The raw request body object.
+        resolver (RefResolver): The resolver used for references.
+        interner (IRInterner): The table sharing identical parameters across operations.
+        document_uri (str, optional): The document the request body appears in. Defaults to the root document.
 
-def gemini_ai_component(prompt, documentation):
+    Returns:
+        Parameter: The body parameter, typed with the name of the referenced schema or its type.
     """
-    Processes the documentation through the Gemini API for improvements.
+
+    if '$ref' in request_body:
+        request_body = resolver.resolve(request_body['$ref'], document_uri)
+    schema = media_type_schema(request_body.get('content'))
+    return interner.parameter('body', 'body', request_body.get('description', 'No description'),
+                              request_body.get('required', False), schema_type_name(schema), 'N/A')
+
+def parse_operation(details, resolver, interner=None, shared_parameters=(), document_uri=None):
+    """
+    Parses a single operation object of a path item, from a Swagger 2 or an OpenAPI 3 document.
 
     Args:
-        documentation (str): The documentation string to process.
+        details (dict): The raw operation object from the Swagger file.
+        resolver (RefResolver or dict): The resolver used for references, or the Swagger data.
+        interner (IRInterner, optional): The table sharing identical strings, parameters and responses across operations.
+        shared_parameters (list, optional): The parameters declared on the path item, which the operation may override.
+        document_uri (str, optional): The document the operation appears in. Defaults to the root document.
 
     Returns:
-        str: The improved documentation generated by the Gemini API.
+        Operation: The description, tags, parsed parameters and responses of the operation.
     """
 
-    try:
-        api_key = os.getenv('GEMINI_API_KEY')
-        
-        if not api_key:
-            print("API key not found. Please set the 'GEMINI_API_KEY' environment variable.")
-            return documentation
-        genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    resolver = as_resolver(resolver)
+    interner = interner or IRInterner()
+    params = details.get('parameters', [])
+    if shared_parameters:
+        # Operation parameters override path item parameters with the same name and location
+        merged = {}
+        for param in list(shared_parameters) + list(params):
+            # References are kept, so that parse_parameters resolves what they contain against their own document
+            target = resolver.resolve(param['$ref'], document_uri) if '$ref' in param else param
+            merged[(target.get('name'), target.get('in'))] = param
+        params = list(merged.values())
+    parsed_params = parse_parameters(params, resolver, interner, document_uri) if params else ()
+    if 'requestBody' in details:
+        parsed_params += (parse_request_body(details['requestBody'], resolver, interner, document_uri),)
 
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        improved_documentation = response.text
-        return improved_documentation.strip()  # Return the cleaned output
-    except Exception as e:
-        logging.error(f"Error occurred while running the Gemini API: {e}. Returning default documentation.")
-        return documentation
+    responses = []
+    for status, response in details.get('responses', {}).items():
+        if '$ref' in response:
+            response = resolver.resolve(response['$ref'], document_uri)
+        schema = response.get('schema') if 'content' not in response else media_type_schema(response['content'])
+        responses.append(interner.response(str(status), response.get('description', 'No description'), schema))
 
-def fynd_copilot_component(prompt, documentation): 
+    return Operation(
+        interner.string(details.get('description', 'No description')),
+        tuple(interner.string(tag) for tag in details.get('tags', ())),
+        parsed_params,
+        tuple(responses)
+    )
+
+def parse_swagger(swagger_file, cache=None):
     """
-    Processes the documentation through the Fynd Copilot API for enhancements.
+    Parses the Swagger file and extracts relevant information.
 
     Args:
-        documentation (str): The documentation string to process.
+        swagger_file (str): The path to the Swagger 2 or OpenAPI 3 file, in JSON or YAML.
+        cache (SpecCache, optional): The cache of parsed specs. On a hit, loading and reference resolution are skipped.
 
     Returns:
-        str: The enhanced documentation generated by the Fynd Copilot API.
+        tuple: A tuple containing metadata (dict) and parsed paths (dict mapping each path to its Operation objects by method).
     """
 
-    api_key = os.getenv("FYND_API_KEY") 
+    if cache is not None:
+        # Hashed once, for both the lookup and the store of a miss
+        key = file_digest(swagger_file)
+        cached = cache.get(swagger_file, key)
+        if cached is not None:
+            return cached
 
-    if not api_key:
-        return "API key is not set. Please check your .env file."
-    # Call Fynd Copilot API
-    try:
-        url = "https://api.fynd.com/copilot" 
-        headers = {
-            "Authorization": "Bearer {FYND_API_KEY}", 
-            "Content-Type": "application/json"
-        }
-        data = {
-            "prompt": prompt,
-            "max_tokens": 1500  # Adjust based on your needs
-        }
-        response = {'data':{'text':prompt}}
-        # response = requests.post(url, json=data, headers=headers)
+    swagger_data = load_swagger_document(swagger_file)
+    logging.debug("Loaded %s %s document", *detect_spec_version(swagger_data))
 
-        improved_documentation = response.get('data', {}).get('text', 'No improvement provided.')
-        return improved_documentation.strip()  # Return cleaned response
+    # Extract metadata
+    metadata = parse_swagger_metadata(swagger_data)
 
-    except Exception as e:
-        logging.error(f"An error occurred while calling the Fynd Copilot API: {str(e)}")
-        return documentation
+    # Parse paths
+    resolver = RefResolver(swagger_data, base_uri=swagger_file)
+    interner = IRInterner()
+    paths = swagger_data.get('paths', {})
+    parsed_paths = {}
+    for path, path_item in paths.items():
+        parsed_methods = {}
+        for method, details, shared_parameters, document_uri in iter_path_item(path_item, resolver):
+            parsed_methods[interner.string(method)] = parse_operation(details, resolver, interner, shared_parameters,
+                                                                      document_uri)
+        parsed_paths[path] = parsed_methods
+    logging.debug("Reference resolution stats: %s", resolver.stats())
+    if cache is not None:
+        cache.put(swagger_file, metadata, parsed_paths, resolver.external_documents(), key)
 
-def ai_component(documentation, ai):
-    """
-    Integrates AI processing for enhancing API documentation based on the user's choice of AI.
+    return metadata, parsed_paths
 
-    Args:
-        documentation (str): The existing API documentation to be improved.
-        ai (str): The AI service to be used for processing, such as 'OpenAI', 'Fynd', or 'Gemini'.
+###------ Streaming Data Parsing -----
+STREAM_CHUNK_SIZE = 1 << 16
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
 
-    Returns:
-        str: The improved API documentation or an error message if an invalid AI service is selected.
+class JsonObjectStream:
     """
+    Incrementally decodes the members of a JSON object from an open file, so that only
+    one member value has to be held in memory at a time.
 
-    prompt = (
-        """Please review and enhance the following API documentation with a focus on clarity, conciseness, and structure. Ensure the documentation includes the following elements:
+    `iter_members` yields the keys of the current object. Before asking for the next key the
+    caller must consume the member value, either with `read_value` or by streaming into it
+    with a nested `iter_members` call.
+    """
 
-        1.  **Purpose Explanation**: Begin with a brief overview of the module or feature, explaining its purpose and key functionalities. Keep this detailed.
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
 
-        2.  **Functionality Summary**: Summarize what the module or feature does based on unit tests, including any important behaviors or edge cases that should be highlighted.
+    def _read_more(self, size=None):
+        if self._eof:
+            return False
+        # Drop the consumed part of the buffer before growing it
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
 
-        3.  **Onboarding Guide**: Provide clear and concise explanations and guidance tailored for developers who are onboarding onto the project. Include any essential information or tips that can help them effectively understand and utilize the API.
-        
-        4.  **Key API Endpoints**: For each API endpoint, provide:
+    def _peek(self):
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                raise ValueError("Unexpected end of JSON document")
 
-            -   The endpoint path and HTTP method.
-            -   A brief description of its functionality.
-            -   A list of parameters, specifying:
-                -   The name, type, required status, and description of each parameter.
-            -   Possible responses with status codes and brief explanations.
-        5. **Information around status codes: 
-        6. Provide a proper ending note.
-        Make sure the final output is structured in a coherent and organized manne, to facilitate readability and integration into the existing documentation."""
-        f"{documentation}\n\n" + "\n\nPlease provide the entire improved documentation in markdown format, from start to end in a single markdown."
-    )
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in JSON document")
+        self._pos += 1
 
-    if ai.lower() == 'openai':
-        logging.info("Processing documentation using OpenAI...")
-        return openai_ai_component(prompt, documentation)
+    def read_value(self):
+        """
+        Decodes the next complete JSON value.
 
-    elif ai.lower() == 'gemini':
-        logging.info("Processing documentation using Gemini AI...")
-        return gemini_ai_component(prompt, documentation)
+        Returns:
+            The decoded value (dict, list, str, int, float, bool or None).
+        """
 
-    elif ai.lower() == 'fynd':
-        logging.info("Processing documentation using Fynd Copilot...")
-        return fynd_copilot_component(prompt, documentation)
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Grow the buffer geometrically so large values are decoded in linear time
+                if not self._read_more(max(self._chunk_size, len(self._buffer))):
+                    raise
+                continue
+            # A number ending exactly at the buffer boundary may continue in the next chunk
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._pos = end
+            return value
 
-    else:
-        logging.error(f"Unsupported AI service: {ai}")
-        return documentation
+    def iter_members(self):
+        """
+        Iterates over the keys of the JSON object starting at the current position.
 
-###------ Documentation Export -----
+        Yields:
+            str: The key of each member, positioned right before its value.
+        """
 
-def export_documentation(documentation, filename):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator}' in JSON document")
+
+def load_swagger_skeleton(swagger_file):
     """
-    Exports the final documentation to a specified markdown file.
+    Loads every top-level section of the Swagger file except `paths`, which is skipped one
+    path item at a time.
 
     Args:
-        documentation (str): The documentation string to export.
-        file_path (str): The file path where the documentation will be saved.
+        swagger_file (str): The path to the Swagger file.
+
+    Returns:
+        dict: The Swagger data without its paths, used for metadata and reference resolution.
     """
 
-    directory = os.path.dirname(filename)
-    
-    # Check if the directory exists, if not, create it
-    if directory and not os.path.exists(directory):
-        os.makedirs(directory)
+    skeleton = {}
+    with open(swagger_file, 'r') as f:
+        stream = JsonObjectStream(f)
+        for key in stream.iter_members():
+            if key == 'paths':
+                for _ in stream.iter_members():
+                    stream.read_value()
+            else:
+                skeleton[key] = stream.read_value()
+    return skeleton
 
-    # Open the file in write mode (creates the file if it doesn't exist)
-    with open(filename, 'w') as f:
-        f.write(documentation)
+def iter_swagger_operations(swagger_file, swagger_data=None):
+    """
+    Walks the `paths` of the Swagger file incrementally, decoding one path item at a time.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        swagger_data (dict, optional): The Swagger skeleton used to resolve references. Loaded with
+                                       `load_swagger_skeleton` when not provided.
+
+    Yields:
+        tuple: A (path, method, details) record for every operation, in file order.
+    """
+
+    if swagger_data is None:
+        swagger_data = load_swagger_skeleton(swagger_file)
+    resolver = RefResolver(swagger_data, base_uri=swagger_file)
+
+    with open(swagger_file, 'r') as f:
+        stream = JsonObjectStream(f)
+        for key in stream.iter_members():
+            if key != 'paths':
+                stream.read_value()
+                continue
+            for path in stream.iter_members():
+                path_item = stream.read_value()
+                # The interner is scoped to the path item: a document-wide one would keep every parameter,
+                # response and inline schema alive and memory would grow with the file again
+                interner = IRInterner()
+                for method, details, shared_parameters, document_uri in iter_path_item(path_item, resolver):
+                    yield path, interner.string(method), parse_operation(details, resolver, interner, shared_parameters,
+                                                                         document_uri)
+            logging.debug("Reference resolution stats: %s", resolver.stats())
+            return
+
+def parse_swagger_streaming(swagger_file):
+    """
+    Parses the Swagger file incrementally so that peak memory stays bounded by the largest path item
+    rather than the size of the whole file. YAML files cannot be walked incrementally and are parsed eagerly.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+
+    Returns:
+        tuple: A tuple containing metadata (dict) and a generator of (path, method, details) records.
+    """
+
+    if is_yaml_file(swagger_file):
+        logging.warning("The streaming parser only supports JSON, parsing %s eagerly", swagger_file)
+        metadata, paths = parse_swagger(swagger_file)
+        return metadata, iter_operations(paths)
+
+    swagger_data = load_swagger_skeleton(swagger_file)
+    metadata = parse_swagger_metadata(swagger_data)
+    return metadata, iter_swagger_operations(swagger_file, swagger_data)
+
+###------ Parsed Spec Cache -----
+PARSER_VERSION = 3 # Bump whenever the parser or the intermediate representation changes
+SPEC_CACHE_DIR = ".cache/specs"
+SPEC_CACHE_MAX_ENTRIES = 32
+SPEC_CACHE_TTL = 30 * 24 * 60 * 60
+
+def file_digest(filename):
+    """
+    Computes the SHA-256 of a file, reading it in blocks.
+
+    Args:
+        filename (str): The path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(functools.partial(f.read, STREAM_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class SpecCache:
+    """
+    On-disk cache of parsed specs, so that an unchanged spec is neither loaded nor resolved again.
+
+    Entries are pickles of the metadata and the intermediate representation, named after the parser
+    version and the SHA-256 of the spec. External documents reached through `$ref` are recorded with
+    their own digest and checked on every lookup. A hit refreshes the modification time of its entry,
+    which drives both policies: entries not used for `ttl` seconds expire, and beyond `max_entries`
+    the least recently used entries are removed, as are entries written by another parser version.
+    Pickles are only read from this directory, which must not be writable by untrusted users.
+    """
+
+    def __init__(self, directory=SPEC_CACHE_DIR, max_entries=SPEC_CACHE_MAX_ENTRIES, ttl=SPEC_CACHE_TTL):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"v{PARSER_VERSION}-{key}.pickle")
+
+    def _expired(self, mtime, now):
+        return bool(self.ttl) and now - mtime > self.ttl
+
+    def get(self, swagger_file, key=None):
+        """
+        Looks up the parsed form of a spec.
+
+        Args:
+            swagger_file (str): The path to the spec file.
+            key (str, optional): The digest of the spec file, computed if not provided.
+
+        Returns:
+            tuple: The metadata and parsed paths, or None on a miss.
+        """
+
+        key = key or file_digest(swagger_file)
+        path = self._path(key)
+        entry = None
+        try:
+            if self._expired(os.stat(path).st_mtime, time.time()):
+                self._remove(path)
+                self.evictions += 1
+            else:
+                with open(path, 'rb') as f:
+                    entry = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            logging.error(f"Error occurred while reading the spec cache entry {path}: {e}")
+            self._remove(path)
+
+        if entry is not None:
+            base_dir = os.path.dirname(os.path.abspath(swagger_file))
+            for document, digest in entry['dependencies'].items():
+                document = os.path.join(base_dir, document)
+                if not os.path.exists(document) or file_digest(document) != digest:
+                    logging.info("Spec cache entry %s is stale, %s changed", key[:12], document)
+                    entry = None
+                    break
+
+        if entry is None:
+            self.misses += 1
+            logging.info("Spec cache miss for %s", swagger_file)
+            return None
+        now = time.time()
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path, (now, now))
+        self.hits += 1
+        logging.info("Spec cache hit for %s", swagger_file)
+        return entry['metadata'], entry['paths']
+
+    def put(self, swagger_file, metadata, paths, dependencies=(), key=None):
+        """
+        Stores the parsed form of a spec, then applies the cleanup policy.
+
+        Args:
+            swagger_file (str): The path to the spec file.
+            metadata (dict): The parsed metadata.
+            paths (dict): The parsed paths.
+            dependencies (list, optional): The external documents the spec references.
+            key (str, optional): The digest of the spec file, computed if not provided.
+        """
+
+        base_dir = os.path.dirname(os.path.abspath(swagger_file))
+        entry = {
+            'source': os.path.abspath(swagger_file),
+            'dependencies': {os.path.relpath(document, base_dir): file_digest(document) for document in dependencies},
+            'metadata': metadata,
+            'paths': paths
+        }
+        path = self._path(key or file_digest(swagger_file))
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError) as e:
+            logging.error(f"Error occurred while writing the spec cache entry {path}: {e}")
+            self._remove(temp_path)
+            return
+        self.cleanup()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self):
+        """
+        Removes entries of other parser versions, expired entries and the least recently used
+        entries beyond `max_entries`.
+        """
+
+        current = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pickle'):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                # Removed by another worker of a batch
+                continue
+            if not entry.name.startswith(f"v{PARSER_VERSION}-") or self._expired(mtime, now):
+                self._remove(entry.path)
+                self.evictions += 1
+            else:
+                current.append((mtime, entry.path))
+        current.sort(reverse=True)
+        for _, path in current[self.max_entries:]:
+            self._remove(path)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every entry of the cache.
+        """
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pickle'):
+                self._remove(entry.path)
+
+    def stats(self):
+        """
+        Reports the usage of the cache.
+
+        Returns:
+            dict: The hit, miss and eviction counters.
+        """
+
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+###------ Search Index -----
+SEARCH_INDEX_FILE = "output/search.idx"
+SEARCH_INDEX_MAGIC = b'ATDIDX01'
+# Magic, size of the metadata blob, number of documents, number of terms, size of the terms blob, number of postings
+SEARCH_INDEX_HEADER = struct.Struct('<8sIIIII')
+# Offset and length of the term in the terms blob, offset and length of its postings
+SEARCH_TERM_ENTRY = struct.Struct('<IIII')
+# Offset and length of the document record in the documents blob
+SEARCH_DOC_ENTRY = struct.Struct('<II')
+SEARCH_DESCRIPTION_LENGTH = 160
+_WORD = re.compile(r'[A-Za-z0-9]+')
+_WORD_PART = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+')
+
+def index_terms(text):
+    """
+    Splits a text into lowercase search terms: every word, and the parts of camelCase words.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        set: The search terms, e.g. {'petid', 'pet', 'id'} for 'petId'.
+    """
+
+    terms = set()
+    for word in _WORD.findall(text):
+        terms.add(word.lower())
+        terms.update(part.lower() for part in _WORD_PART.findall(word))
+    return terms
+
+class SearchIndexBuilder:
+    """
+    Collects operations as they are rendered and writes a compact inverted index over their paths,
+    methods, parameter names, descriptions and tags.
+
+    Every word is indexed, as well as field-qualified terms (`method:get`, `path:pet`, `param:petid`,
+    `tag:pet`). The index is a single binary file with sorted fixed-size term entries, so `SearchIndex`
+    answers queries by binary search over a memory map without reading the whole file.
+    """
+
+    def __init__(self, source=None, service=None):
+        self.source = source
+        self.service = service
+        self.documents = []
+        # Postings are packed 32-bit document ids, so the index of a streamed spec stays close to its file size
+        self.postings = collections.defaultdict(lambda: array.array('I'))
+
+    def add(self, path, method, details, line=None):
+        """
+        Indexes one operation.
+
+        Args:
+            path (str): The path of the operation.
+            method (str): The HTTP method of the operation.
+            details (Operation): The parsed operation.
+            line (int, optional): The line of the operation in the source documentation.
+        """
+
+        doc_id = len(self.documents)
+        self.documents.append([method.upper(), path, details.description[:SEARCH_DESCRIPTION_LENGTH], line])
+        terms = index_terms(path) | index_terms(details.description)
+        terms.add(f"method:{method.lower()}")
+        terms.update(f"path:{term}" for term in index_terms(path))
+        for tag in details.tags:
+            terms |= index_terms(tag)
+            terms.add(f"tag:{tag.lower()}")
+        for param in details.parameters:
+            name = str(param.name)
+            terms |= index_terms(name) | index_terms(str(param.description))
+            terms.add(f"param:{name.lower()}")
+        for term in terms:
+            self.postings[term].append(doc_id)
+
+    def track(self, records):
+        """
+        Indexes (path, method, details) records as they flow to the renderer.
+
+        Args:
+            records (iterable): The records to index.
+
+        Yields:
+            tuple: The same records.
+        """
+
+        for path, method, details in records:
+            self.add(path, method, details)
+            yield path, method, details
+
+    def set_line(self, line):
+        """
+        Records the line of the last indexed operation in the source documentation.
+
+        Args:
+            line (int): The line number, starting at 1.
+        """
+
+        if self.documents:
+            self.documents[-1][3] = line
+
+    def write(self, filename):
+        """
+        Writes the index atomically.
+
+        Args:
+            filename (str): The path of the index file.
+
+        Returns:
+            str: The path of the index file.
+        """
+
+        terms = sorted(self.postings)
+        term_entries, term_blob, postings = [], [], array.array('I')
+        term_offset = 0
+        for term in terms:
+            encoded = term.encode('utf-8')
+            term_entries.append(SEARCH_TERM_ENTRY.pack(term_offset, len(encoded), len(postings), len(self.postings[term])))
+            term_blob.append(encoded)
+            term_offset += len(encoded)
+            postings.extend(self.postings[term])
+
+        doc_entries, doc_blob = [], []
+        doc_offset = 0
+        for document in self.documents:
+            encoded = json.dumps(document, separators=(',', ':')).encode('utf-8')
+            doc_entries.append(SEARCH_DOC_ENTRY.pack(doc_offset, len(encoded)))
+            doc_blob.append(encoded)
+            doc_offset += len(encoded)
+
+        # The service and source are shared by every document, so they are stored once
+        metadata = json.dumps({'service': self.service, 'source': self.source}).encode('utf-8')
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(SEARCH_INDEX_HEADER.pack(SEARCH_INDEX_MAGIC, len(metadata), len(self.documents), len(terms),
+                                             term_offset, len(postings)))
+            f.write(metadata)
+            f.writelines(term_entries)
+            f.writelines(doc_entries)
+            f.writelines(term_blob)
+            if sys.byteorder == 'big':
+                postings.byteswap()
+            f.write(postings.tobytes())
+            f.writelines(doc_blob)
+        os.replace(temp_file, filename)
+        return filename
+
+class SearchIndex:
+    """
+    Read-only view of an index written by `SearchIndexBuilder`, backed by a memory map.
+
+    Query terms are whitespace separated and all must match. A term ending with `*` matches every
+    indexed term with that prefix, and terms may be qualified with a field (`method:`, `path:`,
+    `param:` or `tag:`).
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, metadata_size, self.document_count, self.term_count, terms_size, postings_count = \
+            SEARCH_INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != SEARCH_INDEX_MAGIC:
+            self._map.close()
+            raise ValueError(f"{filename} is not a search index")
+        self.metadata = json.loads(self._map[SEARCH_INDEX_HEADER.size:SEARCH_INDEX_HEADER.size + metadata_size])
+        self._term_table = SEARCH_INDEX_HEADER.size + metadata_size
+        self._doc_table = self._term_table + self.term_count * SEARCH_TERM_ENTRY.size
+        self._terms = self._doc_table + self.document_count * SEARCH_DOC_ENTRY.size
+        self._postings = self._terms + terms_size
+        self._documents = self._postings + postings_count * 4
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _term(self, index):
+        offset, length, _, _ = SEARCH_TERM_ENTRY.unpack_from(self._map, self._term_table + index * SEARCH_TERM_ENTRY.size)
+        return self._map[self._terms + offset:self._terms + offset + length]
+
+    def _lower_bound(self, term):
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _postings_of(self, index):
+        _, _, offset, count = SEARCH_TERM_ENTRY.unpack_from(self._map, self._term_table + index * SEARCH_TERM_ENTRY.size)
+        return struct.unpack_from(f'<{count}I', self._map, self._postings + offset * 4)
+
+    def lookup(self, term):
+        """
+        Finds the documents containing a term, or any term with a given prefix if the term ends with `*`.
+
+        Args:
+            term (str): The lowercase search term.
+
+        Returns:
+            set: The ids of the matching documents.
+        """
+
+        prefix = term.endswith('*')
+        encoded = term.rstrip('*').encode('utf-8')
+        index = self._lower_bound(encoded)
+        matches = set()
+        while index < self.term_count:
+            current = self._term(index)
+            if current != encoded and not (prefix and current.startswith(encoded)):
+                break
+            matches.update(self._postings_of(index))
+            index += 1
+        return matches
+
+    def document(self, doc_id):
+        """
+        Reads the record of a document.
+
+        Args:
+            doc_id (int): The id of the document.
+
+        Returns:
+            dict: The service, method, path, description, source file and line of the operation.
+        """
+
+        offset, length = SEARCH_DOC_ENTRY.unpack_from(self._map, self._doc_table + doc_id * SEARCH_DOC_ENTRY.size)
+        method, path, description, line = json.loads(self._map[self._documents + offset:self._documents + offset + length])
+        return {'service': self.metadata['service'], 'method': method, 'path': path, 'description': description,
+                'source': self.metadata['source'], 'line': line}
+
+    def search(self, query, limit=20):
+        """
+        Answers a query.
+
+        Args:
+            query (str): The whitespace separated terms, e.g. 'method:get param:petId' or 'upload*'.
+            limit (int, optional): The maximum number of results. Unlimited if None.
+
+        Returns:
+            list: The records of the matching operations, in documentation order.
+        """
+
+        terms = query.lower().split()
+        if not terms:
+            return []
+        matches = None
+        for term in terms:
+            found = self.lookup(term)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        return [self.document(doc_id) for doc_id in sorted(matches)[:limit]]
+
+def search_indexes(patterns, query, limit=20):
+    """
+    Answers a query over several index files, e.g. the indexes of every service of a batch.
+
+    Args:
+        patterns (list): Paths or glob patterns of index files.
+        query (str): The query. See `SearchIndex.search`.
+        limit (int, optional): The maximum number of results. Unlimited if None.
+
+    Returns:
+        list: The records of the matching operations, index by index.
+    """
+
+    results = []
+    for filename in sorted({match for pattern in patterns for match in (glob.glob(pattern) or [pattern])}):
+        try:
+            with SearchIndex(filename) as index:
+                results += index.search(query, None if limit is None else limit - len(results))
+        except (OSError, ValueError, struct.error) as e:
+            logging.error(f"Error occurred while reading the search index {filename}: {e}")
+        if limit is not None and len(results) >= limit:
+            break
+    return results
+
+###------ Schema Rendering -----
+SCHEMA_DEPTH = 2
+MODELS_HEADING = "## Models"
+MODEL_PREFIX = "### Model: "
+
+def model_anchor(name):
+    """
+    Computes the anchor of the heading of a model, as GitHub and most Markdown renderers generate it.
+
+    Args:
+        name (str): The name of the definition.
+
+    Returns:
+        str: The anchor, e.g. 'model-pet' for `### Model: Pet`.
+    """
+
+    heading = f"{MODEL_PREFIX.lstrip('# ')}{name}".lower()
+    return re.sub(r'[^\w\- ]', '', heading).replace(' ', '-')
+
+class SchemaRenderer:
+    """
+    Renders the response and body schemas of operations, and the definitions they reference.
+
+    Operations only link to the definitions they use (`[Pet](#model-pet)`); every linked definition is
+    rendered once, in the Models section at the end of the documentation, however many operations share
+    it. Definitions are expanded `max_depth` levels deep from the operations: a reference or an inline
+    object one level deeper is shown by its name or type only. The labels of references and the models
+    are memoized by name, so rendering time and output size grow with the number of distinct definitions,
+    not with the number of times they are used. Inline schemas are not retained.
+    """
+
+    def __init__(self, definitions=None, max_depth=SCHEMA_DEPTH):
+        self.definitions = definitions or {}
+        self.max_depth = max_depth
+        self._depths = {}
+        self._order = []
+        self._labels = {}
+        self._types = {}
+        self._models = {}
+
+    def _reference(self, ref, depth):
+        name = ref.rsplit('/', 1)[-1]
+        if name not in self.definitions or depth > self.max_depth:
+            return name
+        if name not in self._depths:
+            self._order.append(name)
+        if depth < self._depths.get(name, depth + 1):
+            self._depths[name] = depth
+            self._models.pop(name, None)
+        return f"[{name}](#{model_anchor(name)})"
+
+    def label(self, schema, depth=1):
+        """
+        Describes the type of a schema in one line, linking the definitions it references.
+
+        Args:
+            schema (dict): The raw schema.
+            depth (int): The level of the schema below the operation, 1 for a response or body schema.
+
+        Returns:
+            str: The label, e.g. '[Pet](#model-pet)', 'array[string]' or 'map[string, integer]'.
+        """
+
+        if not isinstance(schema, dict):
+            return 'N/A'
+        if '$ref' in schema:
+            key = (schema['$ref'], depth)
+            if key not in self._labels:
+                self._labels[key] = self._reference(schema['$ref'], depth)
+            return self._labels[key]
+        if is_array_schema(schema) or 'items' in schema:
+            label = f"array[{self.label(schema.get('items'), depth)}]"
+        elif any(keyword in schema for keyword in ('allOf', 'oneOf', 'anyOf')):
+            keyword = next(keyword for keyword in ('allOf', 'oneOf', 'anyOf') if keyword in schema)
+            label = (' & ' if keyword == 'allOf' else ' | ').join(self.label(part, depth) for part in schema[keyword])
+        elif isinstance(schema.get('additionalProperties'), dict):
+            label = f"map[string, {self.label(schema['additionalProperties'], depth)}]"
+        else:
+            label = schema_type(schema, 'object' if 'properties' in schema else 'N/A')
+        return label
+
+    def iter_properties(self, schema, depth, indent=""):
+        """
+        Renders the properties of an object schema, expanding inline objects while the depth allows it.
+
+        Args:
+            schema (dict): The raw object schema.
+            depth (int): The level of the schema; its properties are one level deeper.
+            indent (str): The indentation of the property lines.
+
+        Yields:
+            str: One Markdown line per property.
+        """
+
+        parts = [schema] + [part for part in schema.get('allOf', ()) if isinstance(part, dict) and '$ref' not in part]
+        for part in parts:
+            required = set(part.get('required', ()))
+            for name, prop in part.get('properties', {}).items():
+                prop = prop if isinstance(prop, dict) else {}
+                details = f"Required: {name in required}, Type: {self.label(prop, depth + 1)}, Format: {prop.get('format', 'N/A')}"
+                if 'enum' in prop:
+                    details += f", Enum: {', '.join(map(str, prop['enum']))}"
+                yield f"{indent}- {name}: {prop.get('description', 'No description')} ({details})\n"
+                if '$ref' not in prop and 'properties' in prop and depth + 1 <= self.max_depth:
+                    yield from self.iter_properties(prop, depth + 1, indent + "  ")
+
+    def render_response(self, response):
+        """
+        Renders a response with the label of its schema, and the properties of an inline object schema.
+
+        Args:
+            response (Response): The parsed response.
+
+        Returns:
+            str: The Markdown lines of the response.
+        """
+
+        # Only the label of a referenced definition is memoized: inline schemas are rarely shared, and
+        # retaining them would make memory grow with the spec
+        text = f"- {response.status}: {response.description}"
+        label = self.label(response.schema)
+        if label != 'N/A':
+            text += f" (Schema: {label})"
+        text += "\n"
+        if isinstance(response.schema, dict) and '$ref' not in response.schema:
+            text += "".join(self.iter_properties(response.schema, 1, "  "))
+        return text
+
+    def parameter_type(self, param):
+        """
+        Links the type of a body parameter, e.g. 'Pet' or 'array[User]', to the definitions it names.
+
+        Args:
+            param (Parameter): The parsed parameter.
+
+        Returns:
+            str: The type of the parameter, with links for body parameters.
+        """
+
+        if param.location != 'body' or not isinstance(param.type, str):
+            return param.type
+        if param.type not in self._types:
+            self._types[param.type] = re.sub(r'[A-Za-z_][\w.-]*',
+                                             lambda match: self._reference(match.group(), 1), param.type)
+        return self._types[param.type]
+
+    def render_model(self, name):
+        """
+        Renders a definition under its anchor.
+
+        Args:
+            name (str): The name of a definition linked by `label` or `parameter_type`.
+
+        Returns:
+            str: The Markdown section of the model.
+        """
+
+        if name not in self._models:
+            description, label, properties = self.model_parts(name)
+            lines = [f"{MODEL_PREFIX}{name}\n", f"Description: {description}\n", f"Type: {label}\n"]
+            if properties:
+                lines.append("Properties:\n")
+                lines += properties
+            lines.append("\n")
+            self._models[name] = "".join(lines)
+        return self._models[name]
+
+    def model_parts(self, name):
+        """
+        Describes a definition, for renderers other than Markdown.
+
+        Args:
+            name (str): The name of a definition linked by `label` or `parameter_type`.
+
+        Returns:
+            tuple: The description, the type label and the Markdown lines of the properties of the model.
+        """
+
+        schema = self.definitions[name] if isinstance(self.definitions[name], dict) else {}
+        depth = self._depths[name]
+        return schema.get('description', 'No description'), self.label(schema, depth), list(self.iter_properties(schema, depth))
+
+    def linked_models(self, operations=()):
+        """
+        Links the schemas of `operations`, then the definitions that the linked models link in turn.
+
+        Args:
+            operations (iterable, optional): (path, method, details) records whose schemas are linked first.
+
+        Returns:
+            list: The names of every model linked so far, sorted.
+        """
+
+        for _, _, details in operations:
+            for response in details.responses:
+                self.render_response(response)
+            for param in details.parameters:
+                self.parameter_type(param)
+        # Rendering a model may link further models, which are appended to the order
+        index = 0
+        while index < len(self._order):
+            self.render_model(self._order[index])
+            index += 1
+        return sorted(self._order)
+
+    def iter_models(self, operations=()):
+        """
+        Renders the Models section: every definition linked so far and the definitions they link, by name.
+
+        The section does not depend on the order in which operations were rendered.
+
+        Args:
+            operations (iterable, optional): (path, method, details) records whose schemas are linked first,
+                                             e.g. operations whose sections were rendered by an earlier run.
+
+        Yields:
+            str: The heading of the section, then one fragment per model. Nothing if no definition is linked.
+        """
+
+        names = self.linked_models(operations)
+        if not names:
+            return
+        yield f"{MODELS_HEADING}\n\n"
+        for name in names:
+            yield self.render_model(name)
+
+def schema_renderer(metadata, max_depth=SCHEMA_DEPTH):
+    """
+    Creates the schema renderer of a parsed spec.
+
+    Args:
+        metadata (dict): The metadata returned by `parse_swagger`, with the definitions of the spec.
+        max_depth (int): The depth of the expanded definitions. Schemas are not rendered if 0.
+
+    Returns:
+        SchemaRenderer: The renderer, or None if schemas are not rendered.
+    """
+
+    return SchemaRenderer(metadata.get('definitions'), max_depth) if max_depth > 0 else None
+
+###------ Generate Intermediate Documentation -----
+def iter_operations(paths):
+    """
+    Flattens parsed paths into (path, method, details) records.
+
+    Args:
+        paths (dict or iterable): Either the parsed paths returned by `parse_swagger`, or an iterable of
+                                  (path, method, details) records such as `iter_swagger_operations`.
+
+    Yields:
+        tuple: A (path, method, details) record for every operation.
+    """
+
+    if isinstance(paths, dict):
+        for path, methods in paths.items():
+            for method, details in methods.items():
+                yield path, method, details
+    else:
+        yield from paths
+
+def generate_documentation(metadata, paths, index_file=SEARCH_INDEX_FILE, schema_depth=SCHEMA_DEPTH):
+    """
+    Generates documentation from the parsed data, together with its search index.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths and their corresponding methods, or a generator of
+                                  (path, method, details) records from `parse_swagger_streaming`.
+        index_file (str, optional): The path of the search index written alongside. No index is written if None.
+        schema_depth (int, optional): The depth of the expanded definitions. Schemas are not rendered if 0.
+
+    Returns:
+        str: A formatted string representing the generated documentation.
+    """
+
+    if index_file:
+        builder = SearchIndexBuilder(source="output/intermediate.md", service=metadata['title'])
+        documentation = "".join(iter_indexed_documentation(metadata, paths, builder, schema_depth))
+    else:
+        documentation = "".join(iter_documentation(metadata, paths, schema_depth))
+    export_documentation(documentation,"output/intermediate.md")
+    if index_file:
+        builder.write(index_file)
+    return documentation
+
+def write_documentation(metadata, paths, filename, schema_depth=SCHEMA_DEPTH, index_file=None):
+    """
+    Writes the documentation straight to a file as it is rendered, without holding it in memory.
+
+    Combined with `parse_swagger_streaming`, memory stays bounded by the largest path item.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths and their corresponding methods, or a generator of
+                                  (path, method, details) records from `parse_swagger_streaming`.
+        filename (str): The file path where the documentation will be saved.
+        schema_depth (int, optional): The depth of the expanded definitions. Schemas are not rendered if 0.
+        index_file (str, optional): The path of the search index written alongside. No index is written if None.
+    """
+
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(filename, 'w') as f:
+        if index_file:
+            builder = SearchIndexBuilder(source=filename, service=metadata['title'])
+            f.writelines(iter_indexed_documentation(metadata, paths, builder, schema_depth))
+        else:
+            f.writelines(iter_documentation(metadata, paths, schema_depth))
+    if index_file:
+        builder.write(index_file)
+
+def iter_documentation(metadata, paths, schema_depth=SCHEMA_DEPTH):
+    """
+    Renders the documentation piece by piece.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+        schema_depth (int, optional): The depth of the expanded definitions. Schemas are not rendered if 0.
+
+    Yields:
+        str: Consecutive fragments of the Markdown documentation, ending with the models the operations link to.
+    """
+
+    schemas = schema_renderer(metadata, schema_depth)
+    yield render_header(metadata)
+    yield from iter_operation_sections(iter_operations(paths), schemas)
+    if schemas:
+        yield from schemas.iter_models()
+
+def iter_indexed_documentation(metadata, paths, builder, schema_depth=SCHEMA_DEPTH):
+    """
+    Renders the documentation piece by piece, indexing every operation with its line as it is rendered.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+        builder (SearchIndexBuilder): The index receiving the operations.
+        schema_depth (int, optional): The depth of the expanded definitions. Schemas are not rendered if 0.
+
+    Yields:
+        str: Consecutive fragments of the Markdown documentation, ending with the models the operations link to.
+    """
+
+    schemas = schema_renderer(metadata, schema_depth)
+    header = render_header(metadata)
+    yield header
+    line = header.count("\n") + 1
+    for section in iter_operation_sections(builder.track(iter_operations(paths)), schemas):
+        builder.set_line(line)
+        line += section.count("\n")
+        yield section
+    if schemas:
+        yield from schemas.iter_models()
+
+def render_header(metadata):
+    """
+    Renders the title and description of the documentation.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+
+    Returns:
+        str: The Markdown header.
+    """
+
+    return f"# {metadata['title']} (v{metadata['version']})\n\n{metadata['description']}\n\n"
+
+def iter_operation_sections(operations, schemas=None):
+    """
+    Renders a sequence of operations, starting a new path section whenever the path changes.
+
+    Args:
+        operations (iterable): The (path, method, details) records to render.
+        schemas (SchemaRenderer, optional): The renderer linking response and body schemas to their models.
+                                            Only the status and description of responses are rendered if None.
+
+    Yields:
+        str: The Markdown section of every operation, preceded by its path heading when the path changes.
+    """
+
+    current_path = None
+    for path, method, details in operations:
+        lines = []
+        if path != current_path:
+            lines.append(f"## Path: {path}\n")
+            current_path = path
+        lines.append(f"### Method: {method.upper()}\n")
+        lines.append(f"Description: {details.description}\n")
+        lines.append("Parameters:\n")
+        for param in details.parameters:
+            param_type = schemas.parameter_type(param) if schemas else param.type
+            lines.append(f"- {param.name} ({param.location}): {param.description} (Required: {param.required}, Type: {param_type}, Format: {param.format})\n")
+        lines.append("Responses:\n")
+        for response in details.responses:
+            lines.append(schemas.render_response(response) if schemas else f"- {response.status}: {response.description}\n")
+        lines.append("\n")
+        yield "".join(lines)
+
+def render_operations(operations, schemas=None):
+    """
+    Renders the sections of a sequence of operations.
+
+    Args:
+        operations (iterable): The (path, method, details) records to render.
+        schemas (SchemaRenderer, optional): The renderer linking response and body schemas to their models.
+
+    Returns:
+        str: The Markdown sections of the operations.
+    """
+
+    return "".join(iter_operation_sections(operations, schemas))
+
+
+
+###------ Test_api File analysis code -----
+
+TEST_INFO_CACHE_FILE = ".cache/test_info.json"
+TEST_INFO_VERSION = 2 # Bump whenever the extracted test information changes
+TEST_FILE_PATTERNS = ('test_*.py', '*_test.py')
+
+class TestInfoVisitor(ast.NodeVisitor):
+    """
+    Collects test functions, including methods of `Test*` classes, together with their assertions,
+    print calls and HTTP requests, in a single pass over the AST.
+
+    The URL of a request is resolved statically from string literals, f-strings, concatenations and
+    the module and local variables they reference; the parts that cannot be resolved become `{}`.
+    """
+
+    def __init__(self):
+        self.test_summaries = []
+        self._class_name = None
+        self._expected_output = None
+        self._requests = None
+        self._module_strings = {}
+        self._locals = None
+
+    def visit_Module(self, node):
+        # Module constants such as BASE_URL are used by every test, whatever their position in the file
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name):
+                self._module_strings[statement.targets[0].id] = statement.value
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        outer_class = self._class_name
+        self._class_name = node.name if node.name.startswith("Test") else None
+        self.generic_visit(node)
+        self._class_name = outer_class
+
+    def visit_FunctionDef(self, node):
+        if not node.name.startswith("test_"):
+            self.generic_visit(node)
+            return
+
+        outer_output, outer_requests, outer_locals = self._expected_output, self._requests, self._locals
+        self._expected_output, self._requests, self._locals = [], [], dict(outer_locals or {})
+        self.generic_visit(node)
+        expected_output, requests_made = self._expected_output, self._requests
+        self._expected_output, self._requests, self._locals = outer_output, outer_requests, outer_locals
+        # Assertions and requests of a nested test also describe the test that contains it
+        if outer_output is not None:
+            outer_output.extend(expected_output)
+            outer_requests.extend(requests_made)
+
+        self.test_summaries.append({
+            'name': f"{self._class_name}.{node.name}" if self._class_name else node.name,
+            'description': ast.get_docstring(node) or "No description provided.",
+            'expected_output': expected_output if expected_output else ["No explicit output provided."],
+            'requests': requests_made
+        })
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Assert(self, node):
+        if self._expected_output is not None:
+            self._expected_output.append(ast.unparse(node.test))
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        if self._locals is not None and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            self._locals[node.targets[0].id] = node.value
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if self._expected_output is not None and isinstance(node.func, ast.Name) and node.func.id == 'print':
+            # Capture print statement output for demonstration purposes
+            self._expected_output.append(ast.unparse(node))
+        if self._requests is not None and isinstance(node.func, ast.Attribute):
+            self._record_request(node)
+        self.generic_visit(node)
+
+    def _record_request(self, node):
+        attribute = node.func.attr.lower()
+        arguments = list(node.args)
+        if attribute == 'request' and arguments and isinstance(arguments[0], ast.Constant):
+            method = str(arguments.pop(0).value).upper()
+        elif attribute in HTTP_METHODS:
+            method = attribute.upper()
+        else:
+            return
+        url_node = arguments[0] if arguments else next((keyword.value for keyword in node.keywords if keyword.arg == 'url'), None)
+        url = self._url_pattern(url_node) if url_node is not None else None
+        receiver = node.func.value
+        # Any client's get/post/... qualifies if its URL looks like a path, which rules out e.g. dict.get('key')
+        if url and (isinstance(receiver, ast.Name) and receiver.id == 'requests' or '/' in url):
+            self._requests.append({'method': method, 'url': url})
+
+    def _url_pattern(self, node, depth=0):
+        if depth > 10:
+            return '{}'
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return re.sub(r'\{[^{}]*\}', '{}', node.value)
+        if isinstance(node, ast.JoinedStr):
+            return "".join(self._url_pattern(value.value if isinstance(value, ast.FormattedValue) else value, depth + 1)
+                           for value in node.values)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return self._url_pattern(node.left, depth + 1) + self._url_pattern(node.right, depth + 1)
+        if isinstance(node, ast.Name):
+            value = (self._locals or {}).get(node.id, self._module_strings.get(node.id))
+            if value is not None:
+                return self._url_pattern(value, depth + 1)
+        return '{}'
+
+def extract_test_info(test_file):
+    """
+    Extracts test function names, descriptions (from docstrings), and expected outcomes
+    (assertions or print statements) from a Python test file, or from every test file of a directory.
+
+    Args:
+        test_file (str): The path to the Python file containing the test functions (e.g., 'test_api.py'),
+                         or to a directory of test files. See `extract_test_directory`.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains the following information for a test function:
+            - name (str): The name of the test function (should start with 'test_'), prefixed with its class for methods of `Test*` classes.
+            - description (str): The docstring of the test function, or 'No description provided' if no docstring exists.
+            - expected_output (list): A list of expected outcomes, including assertions or print statements rendered as source code. If no assertions or print statements are present, it defaults to 'No explicit output provided'.
+    """
+
+    if os.path.isdir(test_file):
+        return extract_test_directory(test_file)
+
+    with open(test_file, 'r') as file:
+        file_content = file.read()
+
+    # Parse the file content into an abstract syntax tree (AST) and visit it once
+    visitor = TestInfoVisitor()
+    visitor.visit(ast.parse(file_content))
+    return visitor.test_summaries
+
+def find_test_files(test_dir):
+    """
+    Lists the test files of a directory.
+
+    Args:
+        test_dir (str): The directory searched recursively for `test_*.py` and `*_test.py` files.
+
+    Returns:
+        list: The paths of the test files, sorted.
+    """
+
+    return sorted({
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(test_dir)
+        for pattern in TEST_FILE_PATTERNS
+        for filename in fnmatch.filter(filenames, pattern)
+    })
+
+def extract_test_file(test_file):
+    """
+    Extracts the test information of one file of a directory, reporting errors instead of raising them,
+    so that one broken file does not abort the extraction of the others.
+
+    Args:
+        test_file (str): The path to the test file.
+
+    Returns:
+        list: The test summaries of the file, or an empty list if it cannot be read or parsed.
+    """
+
+    try:
+        return extract_test_info(test_file)
+    except (OSError, SyntaxError, ValueError, RecursionError) as e:
+        logging.error(f"Error occurred while extracting tests from {test_file}, skipping it: {e}")
+        return []
+
+def extract_test_directory(test_dir, workers=None, cache_file=TEST_INFO_CACHE_FILE):
+    """
+    Extracts the test information of every test file of a directory, in parallel.
+
+    Files are only parsed again if their modification time or size changed since they were cached. Files
+    that cannot be read or parsed are reported and cached without tests until they change.
+
+    Args:
+        test_dir (str): The directory searched recursively for `test_*.py` and `*_test.py` files.
+        workers (int, optional): The number of worker processes. Defaults to the number of available cores.
+        cache_file (str, optional): The path of the per-file cache. No cache is used if not provided.
+
+    Returns:
+        list: The test summaries of every file, ordered by file path. See `extract_test_info`.
+    """
+
+    test_files = find_test_files(test_dir)
+
+    cache = {}
+    if cache_file:
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    stamps = {}
+    stale = []
+    for test_file in test_files:
+        stat = os.stat(test_file)
+        stamps[test_file] = [TEST_INFO_VERSION, stat.st_mtime_ns, stat.st_size]
+        if cache.get(test_file, {}).get('stamp') != stamps[test_file]:
+            stale.append(test_file)
+
+    if len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers or available_cores(), len(stale))) as executor:
+            parsed = list(executor.map(extract_test_file, stale, chunksize=max(1, len(stale) // 64)))
+    else:
+        parsed = [extract_test_file(test_file) for test_file in stale]
+    for test_file, test_summaries in zip(stale, parsed):
+        cache[test_file] = {'stamp': stamps[test_file], 'tests': test_summaries}
+    logging.info(f"Extracted tests from {len(test_files)} files ({len(stale)} parsed, {len(test_files) - len(stale)} cached)")
+
+    if cache_file and stale:
+        directory = os.path.dirname(cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Entries of deleted files are dropped when the cache is written back
+        cache = {test_file: cache[test_file] for test_file in test_files}
+        with open(f"{cache_file}.tmp", 'w') as f:
+            json.dump(cache, f)
+        os.replace(f"{cache_file}.tmp", cache_file)
+
+    return [test for test_file in test_files for test in cache[test_file]['tests']]
+
+def generate_test_summary_prompt(test_summaries):
+    """
+    Generates a formatted string summarizing the test functions and their expected behavior.
+
+    Args:
+        test_summaries (list): A list of dictionaries containing details about each test function.
+                               Each dictionary should include the test's name, description, and expected output.
+
+    Returns:
+        str: A formatted string summarizing the test functions, including their names, descriptions, and expected outputs.
+    """
+
+    lines = ["\n### Unit Test Summary:\n\n"]
+    for test in test_summaries:
+        lines.append(f"- **{test['name']}**: {test['description']}\n")
+        lines.append(f"  - Expected output: {', '.join(test['expected_output'])}\n\n")
+    return "".join(lines).strip()
+
+def summarize_docstring(docstring, first_sentence=False):
+    """
+    Shortens a test docstring to its first paragraph, dropping sections such as `Args:`.
+
+    Args:
+        docstring (str): The docstring of the test.
+        first_sentence (bool): Whether to keep only the first sentence of the paragraph.
+
+    Returns:
+        str: The shortened docstring on a single line.
+    """
+
+    summary = " ".join(docstring.strip().split("\n\n", 1)[0].split())
+    if first_sentence:
+        summary = summary.split(". ", 1)[0].rstrip(".") + "."
+    return summary
+
+def pack_test_summary_prompt(test_summaries, token_budget=None):
+    """
+    Generates a compact test summary that fits a token budget.
+
+    Expected outputs shared by most tests are listed once instead of under every test, duplicates are
+    removed and docstrings are shortened to their first paragraph. If the summary still exceeds the
+    budget, docstrings are cut to their first sentence and, as a last resort, trailing tests are omitted.
+
+    Args:
+        test_summaries (list): The test summaries returned by `extract_test_info`.
+        token_budget (int, optional): The maximum number of tokens of the summary. Unlimited if not provided.
+
+    Returns:
+        str: The compact test summary, or an empty string if not even the shared expectations fit the budget.
+    """
+
+    counts = {}
+    for test in test_summaries:
+        for output in dict.fromkeys(test['expected_output']):
+            counts[output] = counts.get(output, 0) + 1
+    threshold = max(2, (len(test_summaries) + 1) // 2)
+    shared = [output for output, count in counts.items() if count >= threshold and output != "No explicit output provided."]
+
+    def render(first_sentence, limit):
+        lines = ["### Unit Test Summary:\n\n"]
+        if shared:
+            lines.append(f"Expected in most tests: {', '.join(shared)}\n\n")
+        for test in test_summaries[:limit]:
+            lines.append(f"- **{test['name']}**: {summarize_docstring(test['description'], first_sentence)}\n")
+            expected_output = [output for output in dict.fromkeys(test['expected_output']) if output not in shared]
+            if expected_output:
+                lines.append(f"  - Expected output: {', '.join(expected_output)}\n")
+        if limit < len(test_summaries):
+            lines.append(f"- ... {len(test_summaries) - limit} more tests omitted to fit the token budget.\n")
+        return "".join(lines).strip()
+
+    summary = render(False, len(test_summaries))
+    if token_budget is None or estimate_tokens(summary) <= token_budget:
+        return summary
+    summary = render(True, len(test_summaries))
+    if estimate_tokens(summary) <= token_budget:
+        return summary
+
+    # Find the largest number of tests that fits the budget
+    low, high = 0, len(test_summaries)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(render(True, middle)) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    summary = render(True, low)
+    return summary if estimate_tokens(summary) <= token_budget else ""
+
+def enhance_prompt_with_tests(test_file, original_prompt, token_budget=None):
+    """
+    Enhances the generated documentation by summarizing test cases.
+
+    Args:
+        test_file (str): The path to the test file.
+        documentation (str): The existing documentation string to enhance.
+        token_budget (int, optional): The maximum number of tokens of the final AI prompt. If provided, the test
+                                      summary is compacted with `pack_test_summary_prompt` to fit the tokens left
+                                      by the documentation and the instructions.
+
+    Returns:
+        str: The enhanced documentation including test summaries.
+    """
+
+    return append_test_summaries(extract_test_info(test_file), original_prompt, token_budget)
+
+def append_test_summaries(test_summaries, original_prompt, token_budget=None):
+    """
+    Appends already extracted test summaries to the generated documentation.
+
+    Args:
+        test_summaries (list): The test summaries returned by `extract_test_info`.
+        original_prompt (str): The existing documentation string to enhance.
+        token_budget (int, optional): The maximum number of tokens of the final AI prompt. See `enhance_prompt_with_tests`.
+
+    Returns:
+        str: The enhanced documentation including test summaries.
+    """
+
+    prompt_tokens = estimate_tokens(build_ai_prompt(original_prompt)) if token_budget is not None else 0
+    test_summary_prompt = fit_test_summaries(test_summaries, prompt_tokens, token_budget)
+    if test_summary_prompt is None:
+        return original_prompt
+
+    # Append the test summary to the original prompt
+    enhanced_prompt = f"{original_prompt}\n\n{test_summary_prompt}"
+
+    return enhanced_prompt
+
+def fit_test_summaries(test_summaries, prompt_tokens, token_budget=None):
+    """
+    Renders the test summary, compacted to fit the tokens the prompt leaves in the budget.
+
+    Args:
+        test_summaries (list): The test summaries returned by `extract_test_info`.
+        prompt_tokens (int): The tokens of the AI prompt built from the documentation alone.
+        token_budget (int, optional): The maximum number of tokens of the final AI prompt. The summary is not compacted if None.
+
+    Returns:
+        str: The test summary, or None if no test fits the budget.
+    """
+
+    test_summary_prompt = generate_test_summary_prompt(test_summaries)
+    if token_budget is None:
+        return test_summary_prompt
+    available = token_budget - prompt_tokens
+    if available <= 0:
+        logging.warning(f"The documentation alone exceeds the token budget of {token_budget}, test summaries are omitted")
+    packed_prompt = pack_test_summary_prompt(test_summaries, max(available, 0))
+    full_tokens = estimate_tokens(test_summary_prompt)
+    packed_tokens = estimate_tokens(packed_prompt) if packed_prompt else 0
+    logging.info(f"Test summary compacted from {full_tokens} to {packed_tokens} tokens (saved {full_tokens - packed_tokens})")
+    return packed_prompt or None
+
+
+###------ Endpoint Test Linking -----
+
+class EndpointMatcher:
+    """
+    Matches the URLs requested by tests against the path templates of the spec.
+
+    The templates are compiled into a trie of path segments, with one child per literal segment and a single
+    child for every `{parameter}` segment, so a URL is matched in time proportional to its length rather than
+    to the number of paths. A URL may carry a scheme, host and base path (`https://host/v2/pet/{}`): every
+    suffix of its segments is tried and only complete matches count. Segments the test builds at runtime
+    (`{}`) match parameters, or literals at a lower score.
+    """
+
+    def __init__(self, paths):
+        self._root = self._node()
+        self._matches = {}
+        for path in paths:
+            node = self._root
+            for segment in path.strip('/').split('/'):
+                if not segment:
+                    continue
+                if '{' in segment:
+                    node['param'] = node['param'] or self._node()
+                    node = node['param']
+                else:
+                    node = node['literals'].setdefault(segment, self._node())
+            node['path'] = path
+
+    @staticmethod
+    def _node():
+        return {'literals': {}, 'param': None, 'path': None}
+
+    def _walk(self, node, segments, index, literals, params, found):
+        if index == len(segments):
+            if node['path'] is not None:
+                found.append(((literals, params), node['path']))
+            return
+        segment = segments[index]
+        runtime = '{}' in segment
+        if runtime:
+            for child in node['literals'].values():
+                self._walk(child, segments, index + 1, literals, params, found)
+        elif segment in node['literals']:
+            self._walk(node['literals'][segment], segments, index + 1, literals + 1, params, found)
+        if node['param'] is not None:
+            self._walk(node['param'], segments, index + 1, literals, params + runtime, found)
+
+    def match(self, url):
+        """
+        Finds the path templates a URL requests.
+
+        Args:
+            url (str): The URL pattern extracted from a test, e.g. 'https://petstore.swagger.io/v2/pet/{}/uploadImage'.
+
+        Returns:
+            list: The best matching path templates, usually one. Empty if no template matches a literal
+                  segment of the URL.
+        """
+
+        if url not in self._matches:
+            path = urllib.parse.urlsplit(url).path if '://' in url else url.split('?')[0].split('#')[0]
+            segments = [segment for segment in path.split('/') if segment]
+            found = []
+            for start in range(len(segments)):
+                self._walk(self._root, segments, start, 0, 0, found)
+            # Matching literal segments count first, then runtime segments matching parameters
+            best = max((score for score, _ in found), default=(0, 0))
+            self._matches[url] = list(dict.fromkeys(template for score, template in found if score == best)) if best[0] else []
+        return self._matches[url]
+
+def link_tests(paths, test_summaries):
+    """
+    Links every test to the operations it requests, using the URLs and methods extracted by `TestInfoVisitor`.
+
+    Args:
+        paths (dict): The parsed paths.
+        test_summaries (list): The test summaries returned by `extract_test_info`.
+
+    Returns:
+        tuple: A dict mapping (path, method) to the summaries of the tests requesting the operation, and the
+               list of the tests linked to no operation.
+    """
+
+    matcher = EndpointMatcher(paths)
+    links = {}
+    unlinked = []
+    for test in test_summaries:
+        linked = False
+        for request in test.get('requests', ()):
+            for path in matcher.match(request['url']):
+                methods = {method.lower(): method for method in paths[path]}
+                method = methods.get(request['method'].lower())
+                if method is None:
+                    continue
+                tests = links.setdefault((path, method), [])
+                if test not in tests:
+                    tests.append(test)
+                linked = True
+        if not linked:
+            unlinked.append(test)
+    logging.info(f"Linked {len(test_summaries) - len(unlinked)} of {len(test_summaries)} tests to {len(links)} operations")
+    return links, unlinked
+
+def attach_tests(chunk, tests):
+    """
+    Appends the summaries of the tests of a documentation chunk to the chunk.
+
+    Args:
+        chunk (str): The documentation of one or more operations.
+        tests (list): The summaries of the tests linked to the operations.
+
+    Returns:
+        str: The chunk followed by the test summary, or the chunk alone if no test is linked.
+    """
+
+    return f"{chunk}\n\n{generate_test_summary_prompt(tests)}" if tests else chunk
+
+def group_tests(test_links, group_by='prefix'):
+    """
+    Collects the tests linked to the operations of every endpoint group.
+
+    Args:
+        test_links (dict): The links returned by `link_tests`.
+        group_by (str): How endpoints are grouped, 'prefix' or 'path'. See `group_key`.
+
+    Returns:
+        dict: The summaries of the linked tests by group, each test once.
+    """
+
+    groups = {}
+    for (path, _), tests in test_links.items():
+        group = groups.setdefault(group_key(path, group_by), [])
+        group.extend(test for test in tests if test not in group)
+    return groups
+
+###------ Provider HTTP Client -----
+HTTP_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class RateLimitError(Exception):
+    """
+    Raised by an AI component when the service answers with HTTP 429.
+
+    Attributes:
+        retry_after (float): The number of seconds the service asked to wait, if any.
+    """
+
+    def __init__(self, message="Rate limit exceeded", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """
+    Parses a `Retry-After` header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value, or None.
+
+    Returns:
+        float: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class ProviderHTTPClient:
+    """
+    HTTP client shared by the AI components.
+
+    A single `requests.Session` keeps connections alive across calls and threads. Requests answered
+    with 5xx, and connection errors or timeouts, are retried with exponential backoff and full jitter,
+    waiting for `Retry-After` instead when the service sends it. A 429 raises `RateLimitError` at once:
+    `call_ai_provider_with_retry` backs off rate-limited requests through the shared token bucket, and
+    retrying them here as well would multiply the attempts. `retry` applies the same policy to the
+    requests of the OpenAI and Gemini SDKs.
+    """
+
+    def __init__(self, max_retries=4, backoff=0.5, max_backoff=30.0, timeout=(5, 120), pool_size=16):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        import requests
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def post(self, url, **kwargs):
+        """
+        Sends a POST request, retrying transient server and connection failures.
+
+        Args:
+            url (str): The URL of the request.
+            **kwargs: The arguments of `requests.Session.post`. `timeout` defaults to the client timeout.
+
+        Returns:
+            requests.Response: The successful response.
+
+        Raises:
+            RateLimitError: If the service answers 429, with the delay of its `Retry-After` header.
+            requests.RequestException: If the request keeps failing for any other reason.
+        """
+
+        import requests
+
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"Request to {url} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in HTTP_RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    response.content
+                    raise RateLimitError(f"Rate limit exceeded for {url}", retry_after=retry_after)
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                # Read the body so the connection goes back to the pool
+                response.content
+                logging.warning(f"Request to {url} answered {response.status_code}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def retry(self, send, transient, label):
+        """
+        Sends a request through an SDK, retrying the transient failures the SDK reports.
+
+        Args:
+            send (callable): Sends the request and returns its response. It raises `RateLimitError` on HTTP 429.
+            transient (callable): Tells whether an exception raised by `send` is a server or connection failure.
+            label (str): The name of the service, used in log messages.
+
+        Returns:
+            The response returned by `send`.
+
+        Raises:
+            RateLimitError: If the service rate limits the request, so the caller backs off.
+            Exception: The error of the last attempt, or any error that is not transient.
+        """
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return send()
+            except RateLimitError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries or not transient(e):
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"Request to {label} failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client():
+    """
+    Returns the HTTP client shared by the AI components, creating it on first use.
+
+    Returns:
+        ProviderHTTPClient: The shared client.
+    """
+
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = ProviderHTTPClient()
+        return _http_client
+
+###------ Improvise Documentation with GenAI -----
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_PARAMETERS = {'max_tokens': 1500, 'temperature': 0.7}
+GEMINI_MODEL = "gemini-1.5-flash"
+FYND_API_URL = "https://api.fynd.com/copilot" # Overridden by the FYND_API_URL environment variable
+FYND_PARAMETERS = {'max_tokens': 1500}
+# Seconds an OpenAI or Gemini request may take, instead of the SDK defaults (10 minutes for OpenAI)
+SDK_REQUEST_TIMEOUT = 120
+_configured_api_keys = {}
+_configure_lock = threading.Lock()
+
+def configure_provider(provider, api_key, configure):
+    """
+    Configures an SDK once per API key instead of on every call.
+
+    Args:
+        provider (str): The name of the AI service.
+        api_key (str): The API key of the service.
+        configure (callable): The function configuring the SDK with the API key.
+    """
+
+    with _configure_lock:
+        if _configured_api_keys.get(provider) != api_key:
+            configure(api_key)
+            _configured_api_keys[provider] = api_key
+
+def configure_openai(api_key):
+    """
+    Configures the OpenAI SDK.
+
+    Args:
+        api_key (str): The OpenAI API key.
+    """
+
+    import openai
+
+    openai.api_key = api_key
+    # Let the OpenAI SDK reuse the pooled session of the shared HTTP client
+    openai.requestssession = get_http_client().session
+
+def configure_gemini(api_key):
+    """
+    Configures the Gemini SDK.
+
+    Args:
+        api_key (str): The Gemini API key.
+    """
+
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+
+@functools.lru_cache(maxsize=None)
+def get_gemini_model(model_name):
+    """
+    Returns a Gemini model, reused across calls so its underlying channel stays open.
+
+    Args:
+        model_name (str): The name of the Gemini model.
+
+    Returns:
+        genai.GenerativeModel: The model.
+    """
+
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(model_name)
+
+def openai_ai_component(prompt, documentation): ## Not tested
+    """
+    Processes the documentation through the OpenAI API for improvements.
+
+    Args:
+        documentation (str): The documentation string to process.
+        model (str): The OpenAI model to use for processing.
+
+    Returns:
+        str: The improved documentation generated by the AI model.
+    """
+
+    try:
+        api_key = os.getenv('OPENAI_API_KEY')
+        
+        if not api_key:
+            print("API key not found. Please set the 'OPENAI_API_KEY' environment variable.")
+            return documentation
+        configure_provider('openai', api_key, configure_openai)
+        import openai
+
+        def send():
+            try:
+                return openai.Completion.create(
+                        model=OPENAI_MODEL, 
+                        prompt=prompt,
+                        max_tokens=OPENAI_PARAMETERS['max_tokens'],      # Adjust based on your needs
+                        temperature=OPENAI_PARAMETERS['temperature'],    # Control creativity
+                        n=1,                    # Number of responses to return
+                        stop=None,
+                        request_timeout=SDK_REQUEST_TIMEOUT
+                    )
+            except openai.error.RateLimitError as e:
+                raise RateLimitError(f"Rate limit exceeded for OpenAI: {e}",
+                                     retry_after=parse_retry_after((e.headers or {}).get('retry-after'))) from e
+
+        transient = lambda e: (isinstance(e, (openai.error.Timeout, openai.error.APIConnectionError,
+                                              openai.error.ServiceUnavailableError, openai.error.TryAgain))
+                               or isinstance(e, openai.error.APIError) and (e.http_status or 500) >= 500)
+        response = get_http_client().retry(send, transient, 'OpenAI')
+
+        # Extract the content from the API response
+        improved_documentation = response['choices'][0]['message']['content']
+    
+        return improved_documentation.strip()  # Return the cleaned output
+    except RateLimitError:
+        # Let the caller back off and retry the whole request
+        raise
+    except Exception as e:
+        logging.error(f"Error occurred while running the OpenAI API: {e}. Returning default documentation.")
+        return documentation
+
+def gemini_ai_component(prompt, documentation):
+    """
+    Processes the documentation through the Gemini API for improvements.
+
+    Args:
+        documentation (str): The documentation string to process.
+
+    Returns:
+        str: The improved documentation generated by the Gemini API.
+    """
+
+    try:
+        api_key = os.getenv('GEMINI_API_KEY')
+        
+        if not api_key:
+            print("API key not found. Please set the 'GEMINI_API_KEY' environment variable.")
+            return documentation
+        configure_provider('gemini', api_key, configure_gemini)
+
+        from google.api_core import exceptions
+
+        model = get_gemini_model(GEMINI_MODEL)
+        def send():
+            try:
+                return model.generate_content(prompt, request_options={'timeout': SDK_REQUEST_TIMEOUT})
+            except exceptions.ResourceExhausted as e:
+                raise RateLimitError(f"Rate limit exceeded for Gemini: {e}") from e
+
+        # Server errors include the 503 and 504 (deadline exceeded) answers
+        response = get_http_client().retry(send, lambda e: isinstance(e, exceptions.ServerError), 'Gemini')
+        improved_documentation = response.text
+        return improved_documentation.strip()  # Return the cleaned output
+    except RateLimitError:
+        # Let the caller back off and retry the whole request
+        raise
+    except Exception as e:
+        logging.error(f"Error occurred while running the Gemini API: {e}. Returning default documentation.")
+        return documentation
+
+def fynd_copilot_component(prompt, documentation): 
+    """
+    Processes the documentation through the Fynd Copilot API for enhancements.
+
+    Args:
+        documentation (str): The documentation string to process.
+
+    Returns:
+        str: The enhanced documentation generated by the Fynd Copilot API.
+    """
+
+    api_key = os.getenv("FYND_API_KEY") 
+
+    if not api_key:
+        print("API key not found. Please set the 'FYND_API_KEY' environment variable.")
+        return documentation
+    # Call Fynd Copilot API
+    try:
+        headers = {
+            "Authorization": f"Bearer {api_key}", 
+            "Content-Type": "application/json"
+        }
+        data = {
+            "prompt": prompt,
+            "max_tokens": FYND_PARAMETERS['max_tokens']  # Adjust based on your needs
+        }
+        response = get_http_client().post(os.getenv("FYND_API_URL", FYND_API_URL), json=data, headers=headers).json()
+
+        improved_documentation = response.get('data', {}).get('text', 'No improvement provided.')
+        return improved_documentation.strip()  # Return cleaned response
+
+    except RateLimitError:
+        # Let the caller back off and retry the whole request
+        raise
+    except Exception as e:
+        logging.error(f"An error occurred while calling the Fynd Copilot API: {str(e)}")
+        return documentation
+
+def openai_ai_stream(prompt):
+    """
+    Streams the improved documentation from the OpenAI chat API.
+
+    Args:
+        prompt (str): The full prompt.
+
+    Yields:
+        str: The text fragments of the response as they are generated.
+    """
+
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise RuntimeError("API key not found. Please set the 'OPENAI_API_KEY' environment variable.")
+    configure_provider('openai', api_key, configure_openai)
+    import openai
+
+    response = openai.ChatCompletion.create(
+            model=OPENAI_MODEL,
+            messages=[{'role': 'user', 'content': prompt}],
+            max_tokens=OPENAI_PARAMETERS['max_tokens'],
+            temperature=OPENAI_PARAMETERS['temperature'],
+            stream=True,
+            request_timeout=SDK_REQUEST_TIMEOUT
+        )
+    for chunk in response:
+        text = chunk['choices'][0].get('delta', {}).get('content')
+        if text:
+            yield text
+
+def gemini_ai_stream(prompt):
+    """
+    Streams the improved documentation from the Gemini API.
+
+    Args:
+        prompt (str): The full prompt.
+
+    Yields:
+        str: The text fragments of the response as they are generated.
+    """
+
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise RuntimeError("API key not found. Please set the 'GEMINI_API_KEY' environment variable.")
+    configure_provider('gemini', api_key, configure_gemini)
+
+    for chunk in get_gemini_model(GEMINI_MODEL).generate_content(prompt, stream=True,
+                                                                        request_options={'timeout': SDK_REQUEST_TIMEOUT}):
+        if chunk.text:
+            yield chunk.text
+
+AI_PROVIDERS = {
+    'openai': {'label': 'OpenAI', 'component': openai_ai_component, 'stream': openai_ai_stream,
+               'model': OPENAI_MODEL, 'parameters': OPENAI_PARAMETERS, 'sdk': 'openai'},
+    'gemini': {'label': 'Gemini AI', 'component': gemini_ai_component, 'stream': gemini_ai_stream,
+               'model': GEMINI_MODEL, 'parameters': {}, 'sdk': 'google.generativeai'},
+    'fynd': {'label': 'Fynd Copilot', 'component': fynd_copilot_component, 'stream': None,
+             'model': None, 'parameters': FYND_PARAMETERS, 'sdk': 'requests'}
+}
+_loaded_providers = set()
+_environment_loaded = False
+
+def load_environment():
+    """
+    Loads the environment variables of the `.env` file, once.
+    """
+
+    global _environment_loaded
+    with _configure_lock:
+        if not _environment_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _environment_loaded = True
+
+def load_ai_provider(name):
+    """
+    Looks up an AI service in the registry, loading the `.env` file and importing the SDK of the service
+    the first time it is selected.
+
+    Importing the SDKs lazily keeps `import main` cheap for callers that never enhance documentation,
+    e.g. batch workers that only parse, or `--no-ai` runs: the Gemini SDK alone pulls in grpc and protobuf.
+
+    Args:
+        name (str): The name of the AI service (case-insensitive).
+
+    Returns:
+        dict: The registry entry of the service, or None if the service is not registered.
+    """
+
+    name = name.lower()
+    provider = AI_PROVIDERS.get(name)
+    if provider is None or name in _loaded_providers:
+        return provider
+    load_environment()
+    if provider.get('sdk'):
+        try:
+            importlib.import_module(provider['sdk'])
+        except ImportError as e:
+            # The component fails on its first call and returns the documentation unchanged, like any other error
+            logging.error(f"The SDK of {provider['label']} ({provider['sdk']}) could not be imported: {e}")
+    _loaded_providers.add(name)
+    return provider
+
+def register_ai_provider(name, component, label=None, model=None, parameters=None, stream=None):
+    """
+    Registers an AI component so it can be selected by name, e.g. a local fake provider.
+
+    Args:
+        name (str): The name used to select the provider (case-insensitive).
+        component (callable): A function taking (prompt, documentation) and returning the improved documentation.
+        label (str, optional): The name used in log messages. Defaults to `name`.
+        model (str, optional): The model used by the component, part of the response cache key.
+        parameters (dict, optional): The generation parameters of the component, part of the response cache key.
+        stream (callable, optional): A function taking a prompt and yielding the response text as it is generated.
+    """
+
+    AI_PROVIDERS[name.lower()] = {'label': label or name, 'component': component, 'stream': stream,
+                                  'model': model, 'parameters': parameters or {}}
+
+def build_ai_prompt(documentation):
+    """
+    Wraps the documentation into the instruction prompt sent to the AI service.
+
+    Args:
+        documentation (str): The existing API documentation to be improved.
+
+    Returns:
+        str: The full prompt.
+    """
+
+    return (
+        """Please review and enhance the following API documentation with a focus on clarity, conciseness, and structure. Ensure the documentation includes the following elements:
+
+        1.  **Purpose Explanation**: Begin with a brief overview of the module or feature, explaining its purpose and key functionalities. Keep this detailed.
+
+        2.  **Functionality Summary**: Summarize what the module or feature does based on unit tests, including any important behaviors or edge cases that should be highlighted.
+
+        3.  **Onboarding Guide**: Provide clear and concise explanations and guidance tailored for developers who are onboarding onto the project. Include any essential information or tips that can help them effectively understand and utilize the API.
+        
+        4.  **Key API Endpoints**: For each API endpoint, provide:
+
+            -   The endpoint path and HTTP method.
+            -   A brief description of its functionality.
+            -   A list of parameters, specifying:
+                -   The name, type, required status, and description of each parameter.
+            -   Possible responses with status codes and brief explanations.
+        5. **Information around status codes: 
+        6. Provide a proper ending note.
+        Make sure the final output is structured in a coherent and organized manne, to facilitate readability and integration into the existing documentation."""
+        f"{documentation}\n\n" + "\n\nPlease provide the entire improved documentation in markdown format, from start to end in a single markdown."
+    )
+
+def call_ai_provider(ai, prompt, documentation, cache=None, on_send=None):
+    """
+    Sends a prompt to the selected AI service.
+
+    Args:
+        ai (str): The AI service to be used for processing, such as 'OpenAI', 'Fynd', or 'Gemini'.
+        prompt (str): The full prompt.
+        documentation (str): The documentation returned unchanged if the AI service fails.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        on_send (callable, optional): Called with the prompt whenever it is actually sent, i.e. not answered by the cache.
+
+    Returns:
+        str: The improved documentation, or the original documentation if the AI service is not supported.
+    """
+
+    provider = load_ai_provider(ai)
+    if provider is None:
+        logging.error(f"Unsupported AI service: {ai}")
+        return documentation
+
+    key = None
+    if cache is not None:
+        key = cache.make_key(ai.lower(), provider['model'], prompt, provider['parameters'])
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    logging.info(f"Processing documentation using {provider['label']}...")
+    if on_send:
+        on_send(prompt)
+    improved_documentation = provider['component'](prompt, documentation)
+    # Components return the documentation unchanged on failure, which must not be cached
+    if key is not None and improved_documentation != documentation:
+        cache.put(key, improved_documentation)
+    return improved_documentation
+
+def ai_component(documentation, ai, cache=None):
+    """
+    Integrates AI processing for enhancing API documentation based on the user's choice of AI.
+
+    Args:
+        documentation (str): The existing API documentation to be improved.
+        ai (str or ProviderRouter): The AI service to be used for processing, such as 'OpenAI', 'Fynd', or 'Gemini',
+                                    or a comma-separated fallback chain such as 'gemini,openai'.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+
+    Returns:
+        str: The improved API documentation or an error message if an invalid AI service is selected.
+    """
+
+    return as_router(ai).call(build_ai_prompt(documentation), documentation, cache=cache)
+
+###------ AI Response Cache -----
+AI_CACHE_DIR = ".cache/ai"
+AI_CACHE_MAX_BYTES = 256 * 1024 * 1024
+AI_CACHE_TTL = 7 * 24 * 3600
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of AI responses.
+
+    Entries are JSON files named after the SHA-256 of the provider, model, prompt and parameters.
+    The modification time of an entry records its last use: lookups refresh it, and the least
+    recently used entries are evicted once the cache grows beyond `max_bytes`. Entries older
+    than `ttl` seconds are treated as misses and removed.
+    """
+
+    def __init__(self, directory=AI_CACHE_DIR, max_bytes=AI_CACHE_MAX_BYTES, ttl=AI_CACHE_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Index of key -> [size, last use] so eviction never has to rescan the directory
+        self._entries = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                self._entries[entry.name[:-5]] = [stat.st_size, stat.st_mtime]
+
+    @staticmethod
+    def make_key(provider, model, prompt, parameters=None):
+        """
+        Computes the content address of a request.
+
+        Args:
+            provider (str): The name of the AI service.
+            model (str): The model used by the AI service.
+            prompt (str): The full prompt.
+            parameters (dict, optional): The generation parameters.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest identifying the request.
+        """
+
+        payload = json.dumps([provider, model, prompt, parameters or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        """
+        Looks up a cached response.
+
+        Args:
+            key (str): The key returned by `make_key`.
+
+        Returns:
+            str: The cached response, or None on a miss.
+        """
+
+        with self._lock:
+            try:
+                with open(self._path(key), 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                logging.info("AI cache miss for %s", key[:12])
+                return None
+
+            now = time.time()
+            if self.ttl and now - entry['created'] > self.ttl:
+                self._remove(key)
+                self.expired += 1
+                self.misses += 1
+                logging.info("AI cache entry %s expired", key[:12])
+                return None
+
+            # Another process may have evicted the entry since it was read
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(self._path(key), (now, now))
+            if key in self._entries:
+                self._entries[key][1] = now
+            self.hits += 1
+            logging.info("AI cache hit for %s", key[:12])
+            return entry['response']
+
+    def put(self, key, response):
+        """
+        Stores a response, evicting the least recently used entries if the cache grows too large.
+
+        A failed write (a full disk, a read-only directory) is logged and the response is simply not cached,
+        so that it never turns a successful AI call into a failure.
+
+        Args:
+            key (str): The key returned by `make_key`.
+            response (str): The response of the AI service.
+        """
+
+        data = json.dumps({'created': time.time(), 'response': response})
+        with self._lock:
+            temp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, 'w') as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+            except OSError as e:
+                logging.warning(f"Could not write the AI cache entry {key[:12]}: {e}")
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+                return
+            self._entries[key] = [len(data.encode('utf-8')), time.time()]
+            self._evict()
+
+    def _evict(self):
+        total = sum(size for size, _ in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every entry of the cache.
+        """
+
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self):
+        """
+        Reports the usage of the cache.
+
+        Returns:
+            dict: The hit, miss, expiry and eviction counters, and the number and total size of the entries.
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': sum(size for size, _ in self._entries.values())
+            }
+
+###------ Chunked GenAI Enhancement -----
+PATH_SECTION_PREFIX = "## Path: "
+TEST_SUMMARY_HEADING = "### Unit Test Summary:"
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens of a text using the common four-characters-per-token heuristic.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+class TokenBucket:
+    """
+    Thread-safe limiter on the number of prompt tokens sent per minute.
+
+    `acquire` blocks until the requested tokens are available. A request larger than the bucket
+    capacity is allowed once the bucket is full, so oversized chunks never dead-lock.
+    """
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = float(tokens_per_minute)
+        self._tokens = self.capacity
+        self._rate = self.capacity / 60.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens):
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self._rate
+            time.sleep(wait)
+
+def split_documentation(documentation, group_by='prefix'):
+    """
+    Splits the intermediate documentation into an overview and endpoint groups.
+
+    Args:
+        documentation (str): The documentation produced by `generate_documentation`, optionally followed by
+                             the test summary added by `enhance_prompt_with_tests`.
+        group_by (str): 'prefix' to group paths by their first segment (e.g. `/pet`), or 'path' to keep
+                        one group per path.
+
+    Returns:
+        tuple: The overview text (title, description, models and test summary) and a list of (group, text)
+               tuples in the order the groups first appear.
+    """
+
+    body, _, tests = documentation.partition(TEST_SUMMARY_HEADING)
+    body, models_marker, models = body.partition(f"\n{MODELS_HEADING}\n")
+    header, marker, sections = body.partition(PATH_SECTION_PREFIX)
+    overview = header.strip()
+    if models_marker:
+        overview += f"\n\n{MODELS_HEADING}\n{models.rstrip()}"
+    if tests:
+        overview += f"\n\n{TEST_SUMMARY_HEADING}{tests.rstrip()}"
+
+    groups = {}
+    if marker:
+        for section in sections.split(f"\n{PATH_SECTION_PREFIX}"):
+            path = section.split("\n", 1)[0].strip()
+            groups.setdefault(group_key(path, group_by), []).append(PATH_SECTION_PREFIX + section.strip("\n"))
+    return overview, [(key, "\n\n".join(texts)) for key, texts in groups.items()]
+
+def group_key(path, group_by='prefix'):
+    """
+    Computes the endpoint group of a path.
+
+    Args:
+        path (str): The path template, e.g. `/pet/{petId}`.
+        group_by (str): 'prefix' to group by the first path segment, or 'path' to keep one group per path.
+
+    Returns:
+        str: The group of the path.
+    """
+
+    if group_by == 'path':
+        return path
+    return '/' + path.strip('/').split('/', 1)[0]
+
+def build_chunk_prompt(group, chunk):
+    """
+    Wraps an endpoint group into the instruction prompt sent to the AI service.
+
+    Args:
+        group (str): The path prefix or path of the group.
+        chunk (str): The documentation of the endpoints in the group.
+
+    Returns:
+        str: The full prompt.
+    """
+
+    return (
+        f"""Please review and enhance the following section of an API documentation, covering the endpoints under `{group}`, with a focus on clarity, conciseness, and structure. For each API endpoint, provide:
+
+            -   The endpoint path and HTTP method.
+            -   A brief description of its functionality.
+            -   A list of parameters, specifying:
+                -   The name, type, required status, and description of each parameter.
+            -   Possible responses with status codes and brief explanations.
+        This section will be merged with the other sections of the documentation, so do not add an introduction or an ending note."""
+        f"{chunk}\n\n" + "\n\nPlease provide the improved section in markdown format."
+    )
+
+def call_ai_provider_with_retry(ai, prompt, documentation, limiter=None, max_retries=5, backoff=1.0, cache=None,
+                                on_send=None):
+    """
+    Sends a prompt to the selected AI service, waiting for the rate limiter and retrying on HTTP 429.
+
+    Args:
+        ai (str): The AI service to be used for processing.
+        prompt (str): The full prompt.
+        documentation (str): The documentation returned unchanged if the AI service keeps failing.
+        limiter (TokenBucket, optional): The tokens-per-minute limiter shared by all requests.
+        max_retries (int): The number of retries after a rate-limited request.
+        backoff (float): The initial delay in seconds, doubled after every retry unless the service sent `retry_after`.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        on_send (callable, optional): Called with the prompt on every attempt actually sent. See `call_ai_provider`.
+
+    Returns:
+        str: The improved documentation, or the original documentation if every attempt was rate limited.
+    """
+
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire(estimate_tokens(prompt))
+        try:
+            return call_ai_provider(ai, prompt, documentation, cache, on_send)
+        except RateLimitError as e:
+            if attempt == max_retries:
+                logging.error(f"AI service {ai} is still rate limited after {max_retries} retries. Returning default documentation.")
+                return documentation
+            delay = e.retry_after if e.retry_after is not None else backoff * (2 ** attempt)
+            logging.warning(f"AI service {ai} rate limited the request, retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+def ai_component_chunked(documentation, ai, max_concurrency=4, tokens_per_minute=None, group_by='prefix', cache=None,
+                         test_links=None):
+    """
+    Enhances the documentation by sending the overview and every endpoint group to the AI service concurrently.
+
+    Args:
+        documentation (str): The existing API documentation to be improved, optionally followed by the summary
+                             of the tests linked to no operation, which stays with the overview.
+        ai (str or ProviderRouter): The AI service, or chain of AI services, to be used for processing.
+        max_concurrency (int): The maximum number of requests in flight.
+        tokens_per_minute (int, optional): The maximum number of prompt tokens sent per minute. Unlimited if not provided.
+        group_by (str): How endpoints are grouped into chunks, 'prefix' or 'path'. See `split_documentation`.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        test_links (dict, optional): The tests linked to every operation, see `link_tests`. Every endpoint group
+                                     is sent with the summaries of its own tests only.
+
+    Returns:
+        str: The improved documentation, with the overview first and the endpoint groups in their original order.
+    """
+
+    overview, groups = split_documentation(documentation, group_by)
+    section_tests = group_tests(test_links or {}, group_by)
+    groups = [(group, attach_tests(chunk, section_tests.get(group))) for group, chunk in groups]
+    chunk_requests = [(build_ai_prompt(overview), overview)]
+    chunk_requests += [(build_chunk_prompt(group, chunk), chunk) for group, chunk in groups]
+    return "\n\n".join(enhance_chunks(ai, chunk_requests, max_concurrency, tokens_per_minute, cache))
+
+def enhance_chunks(ai, chunk_requests, max_concurrency=4, tokens_per_minute=None, cache=None):
+    """
+    Sends prompts to the AI service concurrently.
+
+    Args:
+        ai (str or ProviderRouter): The AI service, or chain of AI services, to be used for processing.
+        chunk_requests (list): A list of (prompt, documentation) tuples.
+        max_concurrency (int): The maximum number of requests in flight.
+        tokens_per_minute (int, optional): The maximum number of prompt tokens sent per minute. Unlimited if not provided.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+
+    Returns:
+        list: The improved documentation of every request, in the order of `chunk_requests`.
+    """
+
+    if not chunk_requests:
+        return []
+    limiter = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+    # A single router is shared by every chunk so that latencies and circuit breakers are too
+    router = as_router(ai)
+    logging.info(f"Sending {len(chunk_requests)} documentation chunks with a concurrency of {max_concurrency}")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = [executor.submit(router.call, prompt, chunk, limiter, cache)
+                   for prompt, chunk in chunk_requests]
+        # Results are collected in submission order so the output is deterministic
+        return [future.result() for future in futures]
+
+###------ Operation Deduplication -----
+PATH_PLACEHOLDER = "{{PATH}}"
+DESCRIPTION_PLACEHOLDER = "{{DESCRIPTION}}"
+
+def operation_shape(method, details):
+    """
+    Computes the shape of an operation: everything the documentation shows except its path and description.
+
+    Args:
+        method (str): The HTTP method of the operation.
+        details (Operation): The parsed operation.
+
+    Returns:
+        str: The fingerprint of the method, parameters and responses of the operation.
+    """
+
+    return fingerprint(method.lower(),
+                       [param.to_dict() for param in details.parameters],
+                       [[response.status, response.to_dict()] for response in details.responses])
+
+def group_duplicate_operations(paths):
+    """
+    Groups the operations that share the same shape, e.g. the repeated CRUD operations of similar resources.
+
+    Args:
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+
+    Returns:
+        list: Lists of (path, method, details) records, in the order the groups first appear. The first
+              record of every group is its representative.
+    """
+
+    groups = {}
+    for record in iter_operations(paths):
+        groups.setdefault(operation_shape(record[1], record[2]), []).append(record)
+    return list(groups.values())
+
+def build_operation_prompt(record, schemas=None, template=False):
+    """
+    Builds the prompt enhancing the section of a single operation.
+
+    Args:
+        record (tuple): The (path, method, details) record of the operation.
+        schemas (SchemaRenderer, optional): The renderer linking response and body schemas to their models.
+        template (bool): Whether to render the path and description as placeholders, so that the enhanced
+                         section can be reused for every operation with the same shape. See `expand_section`.
+
+    Returns:
+        tuple: The prompt and the rendered section of the operation.
+    """
+
+    path, method, details = record
+    if template:
+        path = PATH_PLACEHOLDER
+        details = Operation(DESCRIPTION_PLACEHOLDER, details.tags, details.parameters, details.responses)
+    section = render_operations([(path, method, details)], schemas).strip("\n")
+    prompt = build_chunk_prompt(f"{method.upper()} {path}", section)
+    if template:
+        prompt += (f"\n\nThis section is a template shared by several endpoints. Keep {PATH_PLACEHOLDER} and "
+                   f"{DESCRIPTION_PLACEHOLDER} verbatim wherever the path and the description of the endpoint belong, "
+                   f"and do not describe the endpoint beyond what its parameters and responses show.")
+    return prompt, section
+
+def deduplication_report(groups, schemas=None, requests=None):
+    """
+    Measures the prompt tokens saved by sending one representative per group of duplicate operations.
+
+    Args:
+        groups (list): The groups returned by `group_duplicate_operations`.
+        schemas (SchemaRenderer, optional): The renderer the prompts are built with.
+        requests (list, optional): The (prompt, section) requests of the representatives, one per group, as
+                                   returned by `build_operation_prompt`. Built from `groups` if not provided.
+
+    Returns:
+        dict: The number of operations and groups, and the estimated prompt tokens with one prompt per
+              operation and with one prompt per group.
+    """
+
+    if requests is None:
+        requests = [build_operation_prompt(group[0], schemas, template=len(group) > 1) for group in groups]
+    # The prompt of a single operation is the one it would get without deduplication, so only groups are rendered again
+    return {
+        'operations': sum(len(group) for group in groups),
+        'groups': len(groups),
+        'prompt_tokens': sum(estimate_tokens(prompt) if len(group) == 1 else
+                             sum(estimate_tokens(build_operation_prompt(record, schemas)[0]) for record in group)
+                             for group, (prompt, _) in zip(groups, requests)),
+        'deduplicated_prompt_tokens': sum(estimate_tokens(prompt) for prompt, _ in requests)
+    }
+
+def expand_section(text, member, schemas=None):
+    """
+    Fills the enhanced template section of a group of operations in for one member of the group.
+
+    Args:
+        text (str): The enhanced section of the template, see `build_operation_prompt`.
+        member (tuple): The (path, method, details) record of the member.
+        schemas (SchemaRenderer, optional): The renderer linking response and body schemas to their models.
+
+    Returns:
+        str: The section of the member. If the AI service dropped a placeholder, the enhanced text would
+             carry no path or no description of its own, so the intermediate section of the member is used.
+    """
+
+    if PATH_PLACEHOLDER not in text or DESCRIPTION_PLACEHOLDER not in text:
+        return render_operations([member], schemas).strip("\n")
+    return text.replace(PATH_PLACEHOLDER, member[0]).replace(DESCRIPTION_PLACEHOLDER, member[2].description)
+
+def ai_component_deduplicated(documentation, paths, ai, max_concurrency=4, tokens_per_minute=None, cache=None,
+                              schemas=None):
+    """
+    Enhances the documentation operation by operation, sending a single representative of every group of
+    operations with the same parameters and responses, and expanding its enhanced section to the other members.
+
+    Args:
+        documentation (str): The documentation produced by `generate_documentation`, optionally followed by
+                             the test summary, whose overview is enhanced separately.
+        paths (dict): The parsed paths.
+        ai (str or ProviderRouter): The AI service, or chain of AI services, to be used for processing.
+        max_concurrency (int): The maximum number of requests in flight.
+        tokens_per_minute (int, optional): The maximum number of prompt tokens sent per minute. Unlimited if not provided.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        schemas (SchemaRenderer, optional): The renderer linking the operations to the models of the overview.
+
+    Returns:
+        tuple: The improved documentation, with the overview first and the operations in their original order,
+               and the report of the prompt tokens saved, see `deduplication_report`.
+    """
+
+    overview, _ = split_documentation(documentation)
+    groups = group_duplicate_operations(paths)
+    # Groups of several operations are sent as a template; single operations are sent as they are
+    operation_requests = [build_operation_prompt(group[0], schemas, template=len(group) > 1) for group in groups]
+    report = deduplication_report(groups, schemas, operation_requests)
+    saved = report['prompt_tokens'] - report['deduplicated_prompt_tokens']
+    logging.info(f"Deduplicated {report['operations']} operations into {report['groups']} groups, prompt tokens "
+                 f"{report['prompt_tokens']} -> {report['deduplicated_prompt_tokens']} "
+                 f"(saved {saved}, {saved / max(report['prompt_tokens'], 1):.0%})")
+
+    chunk_requests = [(build_ai_prompt(overview), overview)] + operation_requests
+    enhanced = enhance_chunks(ai, chunk_requests, max_concurrency, tokens_per_minute, cache)
+
+    sections = {}
+    for group, text in zip(groups, enhanced[1:]):
+        if len(group) == 1:
+            sections[group[0][0], group[0][1]] = text
+            continue
+        for member in group:
+            sections[member[0], member[1]] = expand_section(text, member, schemas)
+        if PATH_PLACEHOLDER not in text or DESCRIPTION_PLACEHOLDER not in text:
+            logging.warning(f"The enhanced template of {group[0][1].upper()} {group[0][0]} and {len(group) - 1} similar "
+                            f"operations lost its placeholders, their intermediate sections are used")
+    ordered = [sections[path, method] for path, method, _ in iter_operations(paths)]
+    return "\n\n".join([enhanced[0]] + ordered), report
+
+###------ Provider Routing -----
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+LATENCY_WINDOW = 200
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and the provider is skipped.
+    Once `reset_timeout` seconds have passed, a single trial request is let through (half-open):
+    a success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Decides whether a request may be sent to the provider.
+
+        Returns:
+            bool: False while the circuit is open, or while the half-open trial request is in flight.
+        """
+
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return True
+            return False
+
+    def record(self, success):
+        """
+        Records the outcome of a request.
+
+        Args:
+            success (bool): Whether the provider improved the documentation.
+        """
+
+        with self._lock:
+            if success:
+                self.state = 'closed'
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+class ProviderRouter:
+    """
+    Sends a prompt through an ordered chain of AI services.
+
+    Providers are tried in order: a failure (an exception, or the documentation coming back unchanged)
+    falls back to the next provider whose circuit is not open. With `hedge_after` set, a request that
+    is still running after the p95 latency observed for its provider (or `hedge_after` seconds until
+    `HEDGE_MIN_SAMPLES` latencies were measured) is hedged by firing the next provider as well; the
+    first improved documentation wins and the slower request is abandoned. The estimated tokens of
+    every request actually sent are counted: cache hits are not, while retries, fallbacks and hedges are.
+    """
+
+    def __init__(self, providers, hedge_after=None, failure_threshold=3, reset_timeout=60.0):
+        self.providers = [name.strip().lower() for name in providers if name.strip()]
+        self.hedge_after = hedge_after
+        self.breakers = {name: CircuitBreaker(failure_threshold, reset_timeout) for name in self.providers}
+        self.latencies = {name: collections.deque(maxlen=LATENCY_WINDOW) for name in self.providers}
+        self.counters = {'requests': 0, 'prompt_tokens': 0, 'fallbacks': 0, 'hedges': 0, 'short_circuits': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return ",".join(self.providers)
+
+    def fallbacks(self):
+        """
+        Builds the router of the providers after the first one, sharing circuit breakers, latencies and counters.
+
+        Returns:
+            ProviderRouter: The router of the remaining providers.
+        """
+
+        router = ProviderRouter(self.providers[1:], self.hedge_after)
+        router.breakers = {name: self.breakers[name] for name in router.providers}
+        router.latencies = {name: self.latencies[name] for name in router.providers}
+        router.counters = self.counters
+        router._lock = self._lock
+        return router
+
+    def hedge_delay(self, name):
+        """
+        Computes how long a request to a provider may run before it is hedged.
+
+        Args:
+            name (str): The name of the AI service.
+
+        Returns:
+            float: The delay in seconds, or None if hedging is disabled.
+        """
+
+        if self.hedge_after is None:
+            return None
+        with self._lock:
+            samples = sorted(self.latencies[name])
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return self.hedge_after
+        return samples[int(HEDGE_PERCENTILE * (len(samples) - 1))]
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def count_prompt(self, prompt):
+        """
+        Counts the estimated tokens of a prompt sent to an AI service.
+
+        Args:
+            prompt (str): The prompt sent.
+        """
+
+        self._count('prompt_tokens', estimate_tokens(prompt))
+
+    def _attempt(self, name, prompt, documentation, limiter, cache):
+        start = time.perf_counter()
+        try:
+            result = call_ai_provider_with_retry(name, prompt, documentation, limiter, cache=cache, on_send=self.count_prompt)
+        except Exception as e:
+            logging.error(f"Error occurred while calling {name}: {e}")
+            result = documentation
+        success = result != documentation
+        self.breakers[name].record(success)
+        if success:
+            with self._lock:
+                self.latencies[name].append(time.perf_counter() - start)
+        else:
+            self._count('failures')
+        return result, success
+
+    def call(self, prompt, documentation, limiter=None, cache=None):
+        """
+        Sends a prompt through the chain of AI services.
+
+        Args:
+            prompt (str): The full prompt.
+            documentation (str): The documentation returned unchanged if every AI service fails.
+            limiter (TokenBucket, optional): The tokens-per-minute limiter shared by all requests.
+            cache (ResponseCache, optional): The response cache consulted before calling the AI services.
+
+        Returns:
+            str: The first improved documentation, or the original documentation if every AI service failed.
+        """
+
+        self._count('requests')
+        remaining = iter(self.providers)
+        def next_provider():
+            # Circuits are checked lazily, so a half-open trial is only granted to a provider that is called
+            for name in remaining:
+                if self.breakers[name].allow():
+                    return name
+                logging.warning(f"Circuit of AI service {name} is open, skipping it")
+                self._count('short_circuits')
+            return None
+
+        name = next_provider()
+        if name is None:
+            logging.error(f"No AI service of {self} is available. Returning default documentation.")
+            return documentation
+        if self.hedge_after is None:
+            while name is not None:
+                result, success = self._attempt(name, prompt, documentation, limiter, cache)
+                if success:
+                    return result
+                failed, name = name, next_provider()
+                if name is not None:
+                    logging.warning(f"AI service {failed} failed, falling back to {name}")
+                    self._count('fallbacks')
+            if len(self.providers) > 1:
+                logging.error(f"Every AI service of {self} failed. Returning default documentation.")
+            return documentation
+
+        # Requests run on daemon threads, so an abandoned hedge never delays the caller or the exit
+        results = queue.Queue()
+        launched = []
+        def launch(name):
+            launched.append(name)
+            threading.Thread(target=lambda: results.put((name, *self._attempt(name, prompt, documentation, limiter, cache))),
+                             daemon=True).start()
+
+        launch(name)
+        pending = 1
+        exhausted = False
+        while pending:
+            timeout = None if exhausted else self.hedge_delay(launched[-1])
+            try:
+                name, result, success = results.get(timeout=timeout)
+            except queue.Empty:
+                hedge = next_provider()
+                if hedge is None:
+                    exhausted = True
+                    continue
+                logging.warning(f"AI service {launched[-1]} is slower than {timeout:.2f}s, hedging with {hedge}")
+                self._count('hedges')
+                launch(hedge)
+                pending += 1
+                continue
+            pending -= 1
+            if success:
+                return result
+            fallback = None if exhausted else next_provider()
+            if fallback is None:
+                exhausted = True
+            else:
+                logging.warning(f"AI service {name} failed, falling back to {fallback}")
+                self._count('fallbacks')
+                launch(fallback)
+                pending += 1
+
+        logging.error(f"Every AI service of {self} failed. Returning default documentation.")
+        return documentation
+
+    def stats(self):
+        """
+        Reports the routing counters and the state of every circuit.
+
+        Returns:
+            dict: The request, prompt token, fallback, hedge, short circuit and failure counters, and the circuit
+                  state per provider.
+        """
+
+        with self._lock:
+            stats = dict(self.counters)
+        stats['circuits'] = {name: breaker.state for name, breaker in self.breakers.items()}
+        return stats
+
+def as_router(ai):
+    """
+    Wraps the name of an AI service, or a comma-separated chain of names, in a router.
+
+    Args:
+        ai (str or ProviderRouter): The AI service or chain of AI services.
+
+    Returns:
+        ProviderRouter: The router, returned as is if one was given.
+    """
+
+    if isinstance(ai, ProviderRouter):
+        return ai
+    return ProviderRouter(ai.split(','))
+
+###------ Incremental Regeneration -----
+MANIFEST_VERSION = 2
+
+def fingerprint(*values):
+    """
+    Computes a stable fingerprint of JSON-serializable values.
+
+    Args:
+        *values: The values to fingerprint.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the values.
+    """
+
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_manifest(manifest_file):
+    """
+    Loads the manifest of a previous incremental run.
+
+    Args:
+        manifest_file (str): The path to the manifest.
+
+    Returns:
+        dict: The manifest, or an empty manifest if the file is missing, unreadable or from another version.
+    """
+
+    empty = {'version': MANIFEST_VERSION, 'overview': {}, 'sections': {}}
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    return manifest
+
+def save_manifest(manifest, manifest_file):
+    """
+    Writes the manifest atomically, so an interrupted run never leaves a truncated manifest behind.
+
+    Args:
+        manifest (dict): The manifest to write.
+        manifest_file (str): The path to the manifest.
+    """
+
+    directory = os.path.dirname(manifest_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_file = f"{manifest_file}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_file, manifest_file)
+
+def generate_incremental(metadata, paths, test_file, ai, manifest_file="output/manifest.json", group_by='prefix',
+                         max_concurrency=4, tokens_per_minute=None, cache=None, token_budget=None, schema_depth=SCHEMA_DEPTH):
+    """
+    Regenerates only the documentation sections whose operations or linked tests changed since the previous run.
+
+    Every operation is fingerprinted from its parsed details and the tests linked to it (see `link_tests`). A
+    section (an endpoint group, see `group_key`) is rendered and enhanced again, with the summaries of its own
+    tests, only if the fingerprints of its operations changed; otherwise the enhanced text stored in the manifest
+    is spliced back into the output. Tests linked to no operation go to the overview. Sections the AI service
+    failed to enhance are not recorded, so they are sent again on the next run.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+        test_file (str): The path to the test file.
+        ai (str or ProviderRouter): The AI service, or chain of AI services, to be used for processing.
+        manifest_file (str): The path to the manifest of fingerprints and enhanced sections.
+        group_by (str): How endpoints are grouped into sections, 'prefix' or 'path'.
+        max_concurrency (int): The maximum number of AI requests in flight.
+        tokens_per_minute (int, optional): The maximum number of prompt tokens sent per minute.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        token_budget (int, optional): The maximum number of tokens of the overview prompt. The summary of the
+                                      unlinked tests is compacted to fit it. See `pack_test_summary_prompt`.
+        schema_depth (int, optional): The depth of the models rendered in the overview. Schemas are not rendered if 0.
+
+    Returns:
+        str: The improved documentation.
+    """
+
+    paths = collect_paths(paths)
+    schemas = schema_renderer(metadata, schema_depth)
+    test_links, unlinked = link_tests(paths, extract_test_info(test_file))
+    section_tests = group_tests(test_links, group_by)
+    previous = load_manifest(manifest_file)
+    manifest = {'version': MANIFEST_VERSION, 'overview': {}, 'sections': {}}
+
+    groups = {}
+    for path, method, details in iter_operations(paths):
+        operation_fingerprint = fingerprint(path, method, details.to_dict(), test_links.get((path, method), []))
+        group = groups.setdefault(group_key(path, group_by), {'operations': [], 'fingerprints': []})
+        group['operations'].append((path, method, details))
+        group['fingerprints'].append(operation_fingerprint)
+
+    header = render_header(metadata)
+    # The models of every operation are rendered, including those of the sections reused below
+    models = "".join(schemas.iter_models(iter_operations(paths))) if schemas else ""
+    overview = f"{header.strip()}\n\n{models.rstrip()}" if models else header.strip()
+    if not unlinked:
+        test_summary_prompt = ""
+    elif token_budget is None:
+        test_summary_prompt = generate_test_summary_prompt(unlinked)
+    else:
+        available = token_budget - estimate_tokens(build_ai_prompt(overview))
+        test_summary_prompt = pack_test_summary_prompt(unlinked, max(available, 0))
+    if test_summary_prompt:
+        overview = f"{overview}\n\n{test_summary_prompt}"
+    overview_fingerprint = fingerprint(ai, overview)
+
+    chunk_requests = []
+    pending = []
+    if previous['overview'].get('fingerprint') == overview_fingerprint:
+        manifest['overview'] = previous['overview']
+    else:
+        chunk_requests.append((build_ai_prompt(overview), overview))
+        pending.append(None)
+
+    # Sections link to the models by name, so they are rendered again when the set of definitions changes
+    schema_fingerprint = fingerprint(schema_depth, sorted(schemas.definitions)) if schemas else None
+    reused = 0
+    for key, group in groups.items():
+        section_fingerprint = fingerprint(ai, schema_fingerprint, group['fingerprints'])
+        cached = previous['sections'].get(key)
+        if cached and cached['fingerprint'] == section_fingerprint:
+            manifest['sections'][key] = cached
+            reused += 1
+            continue
+        chunk = render_operations(group['operations'], schemas).strip("\n")
+        manifest['sections'][key] = {'fingerprint': section_fingerprint, 'intermediate': chunk}
+        prompt_chunk = attach_tests(chunk, section_tests.get(key))
+        chunk_requests.append((build_chunk_prompt(key, prompt_chunk), prompt_chunk))
+        pending.append(key)
+
+    # A section the AI service failed on is exported unenhanced but left out of the manifest, so the next run retries it
+    failed = set()
+    results = enhance_chunks(ai, chunk_requests, max_concurrency, tokens_per_minute, cache)
+    for key, (_, prompt_chunk), enhanced in zip(pending, chunk_requests, results):
+        if enhanced == prompt_chunk:
+            failed.add(key)
+        if key is None:
+            manifest['overview'] = {'fingerprint': overview_fingerprint, 'text': enhanced}
+        else:
+            manifest['sections'][key]['text'] = enhanced
+    if failed:
+        logging.warning(f"Incremental regeneration: {len(failed)} sections could not be enhanced and will be retried next run")
+
+    regenerated = len(groups) - reused
+    regenerated_operations = sum(len(groups[key]['operations']) for key in pending if key is not None)
+    total_operations = sum(len(group['operations']) for group in groups.values())
+    logging.info(f"Incremental regeneration: reused {reused} sections, regenerated {regenerated} sections "
+                 f"covering {regenerated_operations} of {total_operations} operations")
+
+    sections = [manifest['sections'][key] for key in groups]
+    export_documentation(header + "\n\n".join(section['intermediate'] for section in sections) + "\n\n" + models,
+                         "output/intermediate.md")
+    save_manifest({'version': manifest['version'],
+                   'overview': {} if None in failed else manifest['overview'],
+                   'sections': {key: section for key, section in manifest['sections'].items() if key not in failed}},
+                  manifest_file)
+    return "\n\n".join([manifest['overview']['text']] + [section['text'] for section in sections])
+
+###------ Documentation Export -----
+
+def export_documentation(documentation, filename):
+    """
+    Exports the final documentation to a specified markdown file.
+
+    Args:
+        documentation (str): The documentation string to export.
+        file_path (str): The file path where the documentation will be saved.
+    """
+
+    directory = os.path.dirname(filename)
+    
+    # Check if the directory exists, if not, create it
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    # Open the file in write mode (creates the file if it doesn't exist)
+    with open(filename, 'w') as f:
+        f.write(documentation)
+
+def export_documentation_file(source_file, filename, suffix=""):
+    """
+    Exports documentation already rendered to a file, followed by a suffix, copying it block by block
+    so that it is never held in memory.
+
+    Args:
+        source_file (str): The file holding the rendered documentation, e.g. `output/intermediate.md`.
+        filename (str): The file path where the documentation will be saved.
+        suffix (str, optional): The text appended to the documentation, e.g. the test summary.
+    """
+
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(source_file, 'r') as source, open(filename, 'w') as f:
+        while block := source.read(STREAM_CHUNK_SIZE):
+            f.write(block)
+        f.write(suffix)
+
+###------ Streaming Documentation Export -----
+
+def stream_documentation(documentation, ai, filename, cache=None):
+    """
+    Streams the improved documentation from the AI service straight into a file.
+
+    Fragments are appended to `<filename>.partial` as they arrive, so progress can be followed while the
+    model is generating, and the file is atomically renamed to `filename` once the response is complete.
+    If the AI service cannot stream, or fails, the documentation is exported the usual way instead.
+
+    Args:
+        documentation (str): The existing API documentation to be improved.
+        ai (str or ProviderRouter): The AI service to be used for processing, such as 'OpenAI' or 'Gemini'. With a chain,
+                                    the first service streams and the others are fallbacks.
+        filename (str): The file path where the documentation will be saved.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+
+    Returns:
+        dict: The time to first token and total time in seconds, the number of estimated tokens, the
+              tokens per second, and whether the response was streamed.
+    """
+
+    stats = {'streamed': False, 'time_to_first_token': None, 'seconds': 0.0, 'tokens': 0, 'tokens_per_second': None}
+    router = as_router(ai)
+    name = router.providers[0] if router.providers else ''
+    provider = load_ai_provider(name)
+    prompt = build_ai_prompt(documentation)
+    key = cache.make_key(name, provider['model'], prompt, provider['parameters']) if cache and provider else None
+    cached = cache.get(key) if key else None
+    if provider is None or not provider.get('stream') or cached is not None:
+        export_documentation(cached if cached is not None else ai_component(documentation, ai, cache=cache), filename)
+        return stats
+
+    def fall_back():
+        # The remaining services of the chain answer without streaming
+        fallbacks = router.fallbacks()
+        export_documentation(ai_component(documentation, fallbacks, cache=cache) if fallbacks.providers else documentation, filename)
+        return stats
+
+    if not router.breakers[name].allow():
+        logging.warning(f"Circuit of AI service {name} is open, skipping it")
+        router._count('short_circuits')
+        return fall_back()
+
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    partial_file = f"{filename}.partial"
+    logging.info(f"Streaming documentation from {provider['label']} into {partial_file}...")
+
+    start = time.perf_counter()
+    characters = 0
+    try:
+        with open(partial_file, 'w') as f:
+            router.count_prompt(prompt)
+            for text in provider['stream'](prompt):
+                if stats['time_to_first_token'] is None:
+                    stats['time_to_first_token'] = time.perf_counter() - start
+                    # The non-streaming components strip the response, so do the same with its start
+                    text = text.lstrip()
+                f.write(text)
+                f.flush()
+                characters += len(text)
+    except Exception as e:
+        logging.error(f"Error occurred while streaming from {provider['label']}: {e}.")
+        characters = 0
+
+    if characters == 0:
+        os.remove(partial_file)
+        router.breakers[name].record(False)
+        router._count('failures')
+        return fall_back()
+    os.replace(partial_file, filename)
+    router.breakers[name].record(True)
+
+    stats['streamed'] = True
+    stats['seconds'] = time.perf_counter() - start
+    stats['tokens'] = characters // CHARS_PER_TOKEN
+    generation_time = stats['seconds'] - stats['time_to_first_token']
+    stats['tokens_per_second'] = stats['tokens'] / generation_time if generation_time > 0 else None
+    logging.info(f"Streamed {stats['tokens']} tokens in {stats['seconds']:.2f}s "
+                 f"(time to first token {stats['time_to_first_token']:.2f}s"
+                 + (f", {stats['tokens_per_second']:.1f} tokens/s)" if stats['tokens_per_second'] else ")"))
+    if key:
+        with open(filename, 'r') as f:
+            cache.put(key, f.read())
+    return stats
+
+###------ Multi-Format Export -----
+EXPORT_FORMATS = ('markdown', 'html', 'json', 'site')
+EXPORT_FILENAMES = {'markdown': "api.md", 'html': "api.html", 'json': "api.json"}
+SITE_PAGE_OPERATIONS = 500
+# Page slugs never start with an underscore, so the models page cannot collide with a group
+SITE_MODELS_PAGE = "_models.html"
+HTML_STYLE = ("body{font-family:sans-serif;max-width:960px;margin:auto;padding:1em}"
+              "table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:.3em .6em}"
+              "code{background:#f4f4f4;padding:0 .2em}")
+
+def write_atomic(filename, fragments):
+    """
+    Writes fragments to a temporary file next to `filename`, then renames it over `filename`,
+    so readers never see a partial file and the whole content never has to be held in memory.
+
+    Args:
+        filename (str): The file path where the content will be saved.
+        fragments (iterable): The consecutive strings of the content.
+
+    Returns:
+        str: The file path.
+    """
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_file = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for fragment in fragments:
+                f.write(fragment)
+        os.replace(temp_file, filename)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_file)
+        raise
+    return filename
+
+def collect_paths(paths):
+    """
+    Materializes parsed paths, so that several formats can be rendered from them.
+
+    Args:
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+
+    Returns:
+        dict: The parsed paths, mapping each path to its Operation objects by method.
+    """
+
+    if isinstance(paths, dict):
+        return paths
+    collected = {}
+    for path, method, details in paths:
+        collected.setdefault(path, {})[method] = details
+    return collected
+
+def slugify(text):
+    """
+    Turns a path, tag or operation into a lowercase identifier usable as an anchor or a file name.
+
+    Args:
+        text (str): The text to convert.
+
+    Returns:
+        str: The identifier, e.g. 'get-pet-petid' for 'GET /pet/{petId}'.
+    """
+
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'root'
+
+def iter_json_documentation(metadata, paths):
+    """
+    Renders the documentation as JSON, one path at a time.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict): The parsed paths.
+
+    Yields:
+        str: Consecutive fragments of the JSON document, with the definitions of the spec after the paths.
+    """
+
+    info = {key: value for key, value in metadata.items() if key != 'definitions'}
+    yield '{"info": ' + json.dumps(info) + ', "paths": {'
+    for index, (path, methods) in enumerate(paths.items()):
+        operations = {method: details.to_dict() for method, details in methods.items()}
+        yield (', ' if index else '') + json.dumps(path) + ': ' + json.dumps(operations)
+    yield '}, "definitions": ' + json.dumps(metadata.get('definitions', {})) + '}\n'
+
+_MARKDOWN_LINK = re.compile(r'\[([^\[\]]+)\]\(#([^)]+)\)')
+
+def html_schema_text(text, models_page=""):
+    """
+    Escapes a line rendered by `SchemaRenderer`, turning its links to models into HTML links.
+
+    Args:
+        text (str): The Markdown text, e.g. 'array[[Pet](#model-pet)]'.
+        models_page (str, optional): The page holding the models, e.g. 'models.html'. Defaults to the current page.
+
+    Returns:
+        str: The HTML text.
+    """
+
+    return _MARKDOWN_LINK.sub(lambda match: f'<a href="{models_page}#{match.group(2)}">{match.group(1)}</a>', html.escape(text))
+
+def render_html_properties(lines, models_page=""):
+    """
+    Renders the property lines of `SchemaRenderer.iter_properties` as nested HTML lists.
+
+    Args:
+        lines (list): The Markdown lines, indented by two spaces per level.
+        models_page (str, optional): The page holding the models. See `html_schema_text`.
+
+    Returns:
+        str: The HTML lists, or an empty string if there are no properties.
+    """
+
+    parts = []
+    level = 0
+    for line in lines:
+        depth = (len(line) - len(line.lstrip(' '))) // 2 + 1
+        parts.append("<ul>\n" * (depth - level) + "</ul>\n" * (level - depth))
+        level = depth
+        parts.append(f"<li>{html_schema_text(line.strip()[2:], models_page)}</li>\n")
+    parts.append("</ul>\n" * level)
+    return "".join(parts)
+
+def iter_html_models(schemas, models_page=""):
+    """
+    Renders the models linked by the operations rendered so far, and the models they link.
+
+    Args:
+        schemas (SchemaRenderer): The renderer that linked the models.
+        models_page (str, optional): The page holding the models. See `html_schema_text`.
+
+    Yields:
+        str: The heading of the section, then one HTML section per model, anchored like the Markdown headings.
+    """
+
+    names = schemas.linked_models()
+    if not names:
+        return
+    yield f'<h2 id="models">{html.escape(MODELS_HEADING.lstrip("# "))}</h2>\n'
+    for name in names:
+        description, label, properties = schemas.model_parts(name)
+        yield (f'<section id="{model_anchor(name)}">\n<h3>{html.escape(MODEL_PREFIX.lstrip("# ") + name)}</h3>\n'
+               f"<p>Description: {html.escape(description)}</p>\n<p>Type: {html_schema_text(label, models_page)}</p>\n"
+               f"{render_html_properties(properties, models_page)}</section>\n")
+
+def render_html_operation(path, method, details, schemas=None, models_page=""):
+    """
+    Renders one operation as an HTML section.
+
+    Args:
+        path (str): The path of the operation.
+        method (str): The HTTP method of the operation.
+        details (Operation): The parsed operation.
+        schemas (SchemaRenderer, optional): The renderer linking response and body schemas to the models.
+                                            Schemas are not rendered if not provided.
+        models_page (str, optional): The page holding the models. See `html_schema_text`.
+
+    Returns:
+        str: The HTML section, anchored by `slugify` of the method and path.
+    """
+
+    escape = html.escape
+    lines = [f'<section id="{slugify(f"{method} {path}")}">\n',
+             f"<h3><code>{method.upper()}</code> {escape(path)}</h3>\n",
+             f"<p>{escape(details.description)}</p>\n"]
+    if details.parameters:
+        lines.append("<table>\n<tr><th>Name</th><th>In</th><th>Description</th><th>Required</th><th>Type</th><th>Format</th></tr>\n")
+        for param in details.parameters:
+            param_type = html_schema_text(schemas.parameter_type(param), models_page) if schemas else escape(str(param.type))
+            lines.append(f"<tr><td>{escape(str(param.name))}</td><td>{escape(str(param.location))}</td>"
+                         f"<td>{escape(str(param.description))}</td><td>{param.required}</td>"
+                         f"<td>{param_type}</td><td>{escape(str(param.format))}</td></tr>\n")
+        lines.append("</table>\n")
+    lines.append("<ul>\n")
+    for response in details.responses:
+        text = f"<code>{escape(response.status)}</code>: {escape(response.description)}"
+        if schemas:
+            label = schemas.label(response.schema)
+            if label != 'N/A':
+                text += f" (Schema: {html_schema_text(label, models_page)})"
+            if isinstance(response.schema, dict) and '$ref' not in response.schema:
+                text += "\n" + render_html_properties(list(schemas.iter_properties(response.schema, 1, "  ")), models_page)
+        lines.append(f"<li>{text}</li>\n")
+    lines.append("</ul>\n</section>\n")
+    return "".join(lines)
+
+def iter_html_page(title, operations, navigation="", schemas=None, models_page=None):
+    """
+    Renders a standalone HTML page from a sequence of operations.
+
+    Args:
+        title (str): The title of the page.
+        operations (iterable): The (path, method, details) records to render.
+        navigation (str, optional): HTML inserted before the operations, e.g. a link back to the index.
+        schemas (SchemaRenderer, optional): The renderer linking schemas to the models. Schemas are not rendered if not provided.
+        models_page (str, optional): The page the models are rendered on. If not provided, the models linked by the
+                                     operations are rendered at the end of this page.
+
+    Yields:
+        str: Consecutive fragments of the HTML page.
+    """
+
+    yield (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{html.escape(title)}</title>\n'
+           f"<style>{HTML_STYLE}</style>\n</head>\n<body>\n{navigation}")
+    current_path = None
+    for path, method, details in operations:
+        if path != current_path:
+            yield f'<h2 id="{slugify(path)}">{html.escape(path)}</h2>\n'
+            current_path = path
+        yield render_html_operation(path, method, details, schemas, models_page or "")
+    if schemas and models_page is None:
+        yield from iter_html_models(schemas)
+    yield "</body>\n</html>\n"
+
+def iter_html_documentation(metadata, paths, schema_depth=SCHEMA_DEPTH):
+    """
+    Renders the documentation as a single HTML page.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict): The parsed paths.
+        schema_depth (int, optional): The depth of the expanded definitions. Schemas are not rendered if 0.
+
+    Yields:
+        str: Consecutive fragments of the HTML page.
+    """
+
+    title = f"{metadata['title']} (v{metadata['version']})"
+    header = f"<h1>{html.escape(title)}</h1>\n<p>{html.escape(metadata['description'])}</p>\n"
+    yield from iter_html_page(title, iter_operations(paths), header, schema_renderer(metadata, schema_depth))
+
+def plan_site_pages(paths, group_by='tag', page_operations=SITE_PAGE_OPERATIONS):
+    """
+    Groups the operations into the pages of the static site, sharding large groups.
+
+    Args:
+        paths (dict): The parsed paths.
+        group_by (str): 'tag' for one page per first tag of the operations, or 'path' for one page per path.
+        page_operations (int): The maximum number of operations per page. Larger groups are split into
+                               `<group>-2.html`, `<group>-3.html`, ...
+
+    Returns:
+        list: (file name, title, operations) tuples, in the order groups first appear in the spec.
+    """
+
+    groups = {}
+    for path, method, details in iter_operations(paths):
+        group = path if group_by == 'path' else (details.tags[0] if details.tags else 'default')
+        groups.setdefault(group, []).append((path, method, details))
+
+    pages = []
+    used = set()
+    for group, operations in groups.items():
+        starts = range(0, len(operations), page_operations)
+        slug = slugify(group)
+        names = [f"{slug}-{shard}" if shard > 1 else slug for shard in range(1, len(starts) + 1)]
+        if used.intersection(names):
+            # Groups such as '/a/b' and '/a-b' share a slug and must not overwrite each other's pages
+            slug = f"{slug}-{hashlib.sha256(group.encode('utf-8')).hexdigest()[:8]}"
+            names = [f"{slug}-{shard}" if shard > 1 else slug for shard in range(1, len(starts) + 1)]
+        used.update(names)
+        for shard, (name, start) in enumerate(zip(names, starts), start=1):
+            pages.append((f"{name}.html", f"{group}{f' ({shard})' if shard > 1 else ''}",
+                          operations[start:start + page_operations]))
+    return pages
+
+def iter_site_index(metadata, pages, models=False):
+    """
+    Renders the index page of the static site.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        pages (list): The pages returned by `plan_site_pages`.
+        models (bool, optional): Whether to link the page of the models.
+
+    Yields:
+        str: Consecutive fragments of the index page.
+    """
+
+    title = f"{metadata['title']} (v{metadata['version']})"
+    yield (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{html.escape(title)}</title>\n'
+           f"<style>{HTML_STYLE}</style>\n</head>\n<body>\n<h1>{html.escape(title)}</h1>\n"
+           f"<p>{html.escape(metadata['description'])}</p>\n<ul>\n")
+    for filename, page_title, operations in pages:
+        yield f'<li><a href="{filename}">{html.escape(page_title)}</a> ({len(operations)} operations)</li>\n'
+    if models:
+        yield f'<li><a href="{SITE_MODELS_PAGE}">Models</a></li>\n'
+    yield "</ul>\n</body>\n</html>\n"
+
+def export_formats(metadata, paths, formats, output_dir="output/export", group_by='tag',
+                   page_operations=SITE_PAGE_OPERATIONS, workers=None, schema_depth=SCHEMA_DEPTH):
+    """
+    Renders the requested formats from the same parsed model and writes every file atomically, in parallel.
+
+    Every file (and every page of the static site) is rendered and written by its own task, fragment by
+    fragment, so no format or page is ever held in memory as a single string.
+
+    Args:
+        metadata (dict): The metadata containing title, version, and description.
+        paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+        formats (list): The formats to export, among 'markdown', 'html', 'json' and 'site'.
+        output_dir (str): The directory of the exported files. The site is written to `<output_dir>/site`.
+        group_by (str): How operations are grouped into site pages, 'tag' or 'path'. See `plan_site_pages`.
+        page_operations (int): The maximum number of operations per site page.
+        workers (int, optional): The number of writer threads. Defaults to the number of available cores.
+        schema_depth (int, optional): The depth of the models linked by the Markdown, HTML and site exports.
+                                      Schemas are not rendered if 0. The JSON export always holds every definition.
+
+    Returns:
+        list: The paths of the written files.
+    """
+
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported export formats: {', '.join(sorted(unknown))}")
+    paths = collect_paths(paths)
+    renderers = {'markdown': functools.partial(iter_documentation, schema_depth=schema_depth),
+                 'html': functools.partial(iter_html_documentation, schema_depth=schema_depth),
+                 'json': iter_json_documentation}
+
+    jobs = [(os.path.join(output_dir, EXPORT_FILENAMES[name]), functools.partial(renderers[name], metadata, paths))
+            for name in formats if name in renderers]
+    if 'site' in formats:
+        site_dir = os.path.join(output_dir, "site")
+        pages = plan_site_pages(paths, group_by, page_operations)
+        navigation = '<p><a href="index.html">Index</a></p>\n'
+        # Every page links to the shared models page, which renders every model linked by any operation
+        models = schema_renderer(metadata, schema_depth)
+        has_models = bool(models and models.linked_models(iter_operations(paths)))
+        jobs.append((os.path.join(site_dir, "index.html"), functools.partial(iter_site_index, metadata, pages, has_models)))
+        # Renderers are not thread-safe, so every page gets its own
+        jobs += [(os.path.join(site_dir, filename),
+                  functools.partial(iter_html_page, title, operations, navigation, schema_renderer(metadata, schema_depth),
+                                    SITE_MODELS_PAGE))
+                 for filename, title, operations in pages]
+        if has_models:
+            jobs.append((os.path.join(site_dir, SITE_MODELS_PAGE),
+                         functools.partial(iter_html_page, "Models", (), navigation, models)))
+
+    with ThreadPoolExecutor(max_workers=workers or available_cores()) as executor:
+        written = list(executor.map(lambda job: write_atomic(job[0], job[1]()), jobs))
+    logging.info(f"Exported {', '.join(formats)} into {output_dir} ({len(written)} files)")
+    return written
+
+###------ Async Pipeline -----
+ASYNC_QUEUE_SIZE = 8
+
+async def generate_documentation_async(swagger_file, test_file, ai, output_file, group_by='prefix', max_concurrency=4,
+                                       queue_size=ASYNC_QUEUE_SIZE, tokens_per_minute=None, cache=None,
+                                       spec_cache=None, token_budget=None, schema_depth=SCHEMA_DEPTH):
+    """
+    Runs the pipeline with overlapping stages, producing the same documentation as chunked mode.
+
+    The spec is parsed while the tests are analyzed. Endpoint groups are then rendered one at a time and
+    handed to `max_concurrency` AI workers through a bounded queue, so the first groups are being enhanced
+    while later ones are still rendering. Enhanced sections are written to the output file as soon as every
+    section before them is done. At most `queue_size` sections wait beyond the requests in flight, which bounds
+    memory whatever the size of the spec. The intermediate documentation and search index are written in the
+    background.
+
+    Args:
+        swagger_file (str): The path to the Swagger file.
+        test_file (str): The path to the test file, or to a directory of test files.
+        ai (str or ProviderRouter): The AI service, or chain of AI services, to be used for processing.
+        output_file (str): The file path where the documentation will be saved. It is written to a temporary
+                           file and renamed once complete.
+        group_by (str): How endpoints are grouped into sections, 'prefix' or 'path'. See `group_key`.
+        max_concurrency (int): The maximum number of AI requests in flight.
+        queue_size (int): The maximum number of sections rendered but not yet exported.
+        tokens_per_minute (int, optional): The maximum number of prompt tokens sent per minute. Unlimited if not provided.
+        cache (ResponseCache, optional): The response cache consulted before calling the AI service.
+        spec_cache (SpecCache, optional): The cache of parsed specs.
+        token_budget (int, optional): The maximum number of tokens of the overview prompt. The summary of the
+                                      unlinked tests is compacted to fit it.
+        schema_depth (int, optional): The depth of the models rendered in the overview. Schemas are not rendered if 0.
+
+    Returns:
+        int: The number of sections written, including the overview.
+    """
+
+    loop = asyncio.get_running_loop()
+    router = as_router(ai)
+    limiter = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+    # Two threads for the CPU-bound stages, the others for the requests in flight
+    executor = ThreadPoolExecutor(max_workers=max_concurrency + 2)
+    run = lambda function, *args: loop.run_in_executor(executor, functools.partial(function, *args))
+
+    try:
+        (metadata, paths), test_summaries = await asyncio.gather(run(parse_swagger, swagger_file, spec_cache),
+                                                                 run(extract_test_info, test_file))
+        paths = collect_paths(paths)
+        intermediate = run(generate_documentation, metadata, paths, SEARCH_INDEX_FILE, schema_depth)
+        test_links, unlinked = link_tests(paths, test_summaries)
+        section_tests = group_tests(test_links, group_by)
+        schemas = schema_renderer(metadata, schema_depth)
+        overview = render_header(metadata).strip()
+        # The overview lists the models of every operation, so they are rendered before the first section
+        models = "".join(schemas.iter_models(iter_operations(paths))) if schemas else ""
+        if models:
+            overview += f"\n\n{models.rstrip()}"
+        if unlinked:
+            overview = append_test_summaries(unlinked, overview, token_budget)
+        groups = {}
+        for record in iter_operations(paths):
+            groups.setdefault(group_key(record[0], group_by), []).append(record)
+
+        sections = asyncio.Queue(maxsize=queue_size)
+        enhanced = asyncio.Queue()
+        # Sections being enhanced do not count against the queue, so every worker can stay busy
+        window = asyncio.Semaphore(queue_size + max_concurrency)
+        total = len(groups) + 1
+
+        async def render():
+            # Every section waits for a slot of the window, freed when an earlier section is exported
+            await window.acquire()
+            await sections.put((0, build_ai_prompt(overview), overview))
+            for index, (key, records) in enumerate(groups.items(), start=1):
+                await window.acquire()
+                chunk = attach_tests(render_operations(records, schemas).strip("\n"), section_tests.get(key))
+                await sections.put((index, build_chunk_prompt(key, chunk), chunk))
+            for _ in range(max_concurrency):
+                await sections.put(None)
+
+        async def enhance():
+            while (item := await sections.get()) is not None:
+                index, prompt, chunk = item
+                await enhanced.put((index, await run(router.call, prompt, chunk, limiter, cache)))
+
+        async def export():
+            directory = os.path.dirname(output_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_file = f"{output_file}.{os.getpid()}.tmp"
+            pending, written = {}, 0
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    while written < total:
+                        index, text = await enhanced.get()
+                        pending[index] = text
+                        # Sections are written in order, as soon as every section before them is done
+                        while written in pending:
+                            f.write(("\n\n" if written else "") + pending.pop(written))
+                            written += 1
+                            window.release()
+                os.replace(temp_file, output_file)
+            except BaseException:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(temp_file)
+                raise
+
+        tasks = [asyncio.ensure_future(task) for task in [render(), export()] + [enhance() for _ in range(max_concurrency)]]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        await intermediate
+        return total
+    finally:
+        executor.shutdown(wait=False)
+
+def run_async_pipeline(*args, **kwargs):
+    """
+    Runs `generate_documentation_async` to completion from synchronous code.
+
+    Args:
+        *args: The positional arguments of `generate_documentation_async`.
+        **kwargs: The keyword arguments of `generate_documentation_async`.
+
+    Returns:
+        int: The number of sections written, including the overview.
+    """
+
+    return asyncio.run(generate_documentation_async(*args, **kwargs))
+
+###------ Pipeline Metrics -----
+
+class PipelineMetrics:
+    """
+    Records the duration and peak memory of every pipeline stage, and counters such as the number of
+    operations, parameters and prompt tokens.
+
+    Peak memory is measured with tracemalloc, which slows allocations down, so it is only enabled
+    with `trace_memory`.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Times a stage of the pipeline.
+
+        Args:
+            name (str): The name of the stage, e.g. 'parse'.
+        """
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'seconds': time.perf_counter() - start}
+            if self.trace_memory:
+                record['peak_memory_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            self.stages[name] = record
+            logging.info(f"Stage {name} finished in {record['seconds']:.3f}s"
+                         + (f" (peak {record['peak_memory_bytes'] / (1024 * 1024):.1f} MB)" if self.trace_memory else ""))
+
+    def count(self, name, value=1):
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The name of the counter, e.g. 'operations'.
+            value (int): The amount added to the counter.
+        """
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_operations(self, paths):
+        """
+        Counts the operations and parameters of parsed paths as they are consumed.
+
+        Args:
+            paths (dict or iterable): The parsed paths, or a generator of (path, method, details) records.
+
+        Returns:
+            The parsed paths if they are a dict, otherwise a generator yielding the same records.
+        """
+
+        if isinstance(paths, dict):
+            for _, _, details in iter_operations(paths):
+                self.count('operations')
+                self.count('parameters', len(details.parameters))
+            return paths
+        return self._count_records(paths)
+
+    def _count_records(self, records):
+        for path, method, details in records:
+            self.count('operations')
+            self.count('parameters', len(details.parameters))
+            yield path, method, details
+
+    def stop(self):
+        """
+        Stops memory tracing and records the total duration of the run.
+        """
+
+        self.total_seconds = time.perf_counter() - self._start
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self):
+        """
+        Builds the metrics report.
+
+        Returns:
+            dict: The stages, counters and total duration in seconds.
+        """
+
+        return {
+            'total_seconds': getattr(self, 'total_seconds', time.perf_counter() - self._start),
+            'stages': self.stages,
+            'counters': self.counters
+        }
+
+    def to_prometheus(self, prefix='docgen'):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of every metric name.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+
+        report = self.report()
+        lines = [f"# TYPE {prefix}_run_seconds gauge\n", f"{prefix}_run_seconds {report['total_seconds']:.6f}\n",
+                 f"# TYPE {prefix}_stage_seconds gauge\n"]
+        for name, record in report['stages'].items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {record["seconds"]:.6f}\n')
+        if self.trace_memory:
+            lines.append(f"# TYPE {prefix}_stage_peak_memory_bytes gauge\n")
+            for name, record in report['stages'].items():
+                lines.append(f'{prefix}_stage_peak_memory_bytes{{stage="{name}"}} {record["peak_memory_bytes"]}\n')
+        for name, value in sorted(report['counters'].items()):
+            metric = re.sub(r'[^a-zA-Z0-9_]', '_', f"{prefix}_{name}")
+            lines.append(f"# TYPE {metric} gauge\n{metric} {value}\n")
+        return "".join(lines)
+
+###------ Batch Documentation -----
+
+def available_cores():
+    """
+    Counts the CPU cores this process is allowed to run on.
+
+    Returns:
+        int: The number of available cores.
+    """
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+SERVICE_SPEC_FILES = ('swagger.json', 'swagger.yaml', 'swagger.yml', 'openapi.json', 'openapi.yaml', 'openapi.yml')
+
+def discover_services(pattern):
+    """
+    Finds the Swagger files of a batch and pairs each of them with its test file.
+
+    A directory is searched for `<name>.json`, `<name>.yaml` and `<name>.yml` files, paired with
+    `test_<name>.py`, and for `<service>/swagger.json` files (or `swagger.yaml`, `openapi.json`,
+    `openapi.yaml`...), paired with `<service>/test_api.py` like the `input/` layout. A service found
+    in several formats is documented once, preferring JSON. Any other pattern is expanded as a glob
+    of Swagger files.
+
+    Every service writes `<service>.md`, so services sharing a name (`pets.json` next to `pets/swagger.json`,
+    or `a/x.json` and `b/x.json`) are renamed after their path, e.g. `pets-swagger` or `a-x`.
+
+    Args:
+        pattern (str): A directory or a glob of Swagger files.
+
+    Returns:
+        list: A sorted list of (service, swagger_file, test_file) tuples. `test_file` is None if no test file was found.
+    """
+
+    if os.path.isdir(pattern):
+        swagger_files = [swagger_file for extension in ('.json',) + YAML_EXTENSIONS
+                         for swagger_file in glob.glob(os.path.join(pattern, f"*{extension}"))]
+        swagger_files += [swagger_file for filename in SERVICE_SPEC_FILES
+                          for swagger_file in glob.glob(os.path.join(pattern, '*', filename))]
+    else:
+        swagger_files = glob.glob(pattern)
+
+    # JSON first, so that it wins over a YAML copy of the same service
+    preference = lambda swagger_file: (os.path.splitext(swagger_file)[1].lower() != '.json', swagger_file)
+    services = {}
+    for swagger_file in sorted(swagger_files, key=preference):
+        directory, filename = os.path.split(swagger_file)
+        if filename in SERVICE_SPEC_FILES:
+            service = os.path.basename(directory) or os.path.splitext(filename)[0]
+            test_file = os.path.join(directory, 'test_api.py')
+        else:
+            service = os.path.splitext(filename)[0]
+            test_file = os.path.join(directory, f"test_{service}.py")
+        if (directory, service) in services:
+            logging.warning(f"Skipping {swagger_file}, service {service} is already documented from {services[directory, service][1]}")
+            continue
+        services[directory, service] = (service, swagger_file, test_file if os.path.exists(test_file) else None)
+    services = sorted(services.values(), key=lambda entry: entry[1])
+
+    names = collections.Counter(service for service, _, _ in services)
+    if all(count == 1 for count in names.values()):
+        return services
+    root = pattern if os.path.isdir(pattern) else os.path.commonpath([os.path.dirname(os.path.abspath(swagger_file))
+                                                                       for _, swagger_file, _ in services])
+    unique = []
+    for service, swagger_file, test_file in services:
+        if names[service] > 1:
+            qualified = os.path.splitext(os.path.relpath(os.path.abspath(swagger_file), os.path.abspath(root)))[0]
+            service = qualified.replace(os.sep, '-')
+        if any(service == other for other, _, _ in unique):
+            logging.error(f"Skipping {swagger_file}, another service of the batch is already named {service}")
+            continue
+        unique.append((service, swagger_file, test_file))
+    return unique
+
+def document_service(service, swagger_file, test_file, output_dir, ai=None, cache_dir=None, spec_cache_dir=None):
+    """
+    Runs the documentation pipeline for one service of a batch. Errors are reported, never raised,
+    so that one bad spec does not abort the batch.
+
+    Args:
+        service (str): The name of the service.
+        swagger_file (str): The path to the Swagger file.
+        test_file (str): The path to the test file, or None.
+        output_dir (str): The directory where `<service>.md` is written.
+        ai (str, optional): The AI service used to improve the documentation. Skipped if not provided.
+        cache_dir (str, optional): The directory of the AI response cache. No cache is used if not provided.
+        spec_cache_dir (str, optional): The directory of the parsed spec cache. No cache is used if not provided.
+
+    Returns:
+        dict: The service, its output file, title, version, number of operations, duration in seconds and error, if any.
+    """
+
+    start = time.perf_counter()
+    result = {'service': service, 'swagger_file': swagger_file, 'output_file': None, 'title': service,
+              'version': None, 'operations': 0, 'seconds': 0.0, 'error': None}
+    try:
+        metadata, paths = parse_swagger(swagger_file, cache=SpecCache(spec_cache_dir) if spec_cache_dir else None)
+        result['title'], result['version'] = metadata['title'], metadata['version']
+        result['operations'] = sum(len(methods) for methods in paths.values())
+        builder = SearchIndexBuilder(source=f"{service}.md", service=service)
+        if ai:
+            # The AI service rewrites the documentation, so line numbers would not match
+            documentation = "".join(iter_documentation(metadata, builder.track(iter_operations(paths))))
+        else:
+            documentation = "".join(iter_indexed_documentation(metadata, paths, builder))
+        builder.write(os.path.join(output_dir, f"{service}.idx"))
+        if test_file:
+            documentation = enhance_prompt_with_tests(test_file, documentation)
+        if ai:
+            cache = ResponseCache(cache_dir) if cache_dir else None
+            documentation = ai_component(documentation, ai, cache=cache)
+        result['output_file'] = os.path.join(output_dir, f"{service}.md")
+        export_documentation(documentation, result['output_file'])
+    except Exception as e:
+        logging.error(f"Error occurred while documenting {service} ({swagger_file}): {e}")
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def generate_index(results, output_dir):
+    """
+    Writes the index page linking to the documentation of every service of a batch.
+
+    Args:
+        results (list): The results returned by `document_service`.
+        output_dir (str): The directory where `index.md` is written.
+
+    Returns:
+        str: The path of the index page.
+    """
+
+    lines = ["# API Documentation Index\n\n",
+             "| Service | API | Version | Operations | Time (s) | Status |\n",
+             "|---|---|---|---|---|---|\n"]
+    for result in results:
+        if result['error']:
+            service, status = result['service'], f"Failed: {result['error']}".replace('|', '\\|')
+        else:
+            service, status = f"[{result['service']}]({result['service']}.md)", "OK"
+        lines.append(f"| {service} | {result['title']} | {result['version'] or '-'} | {result['operations']} | "
+                     f"{result['seconds']:.3f} | {status} |\n")
+    index_file = os.path.join(output_dir, "index.md")
+    export_documentation("".join(lines), index_file)
+    return index_file
+
+def run_batch(pattern, output_dir="output/batch", ai=None, workers=None, cache_dir=None, spec_cache_dir=None):
+    """
+    Documents every service of a batch across a process pool and writes an index page.
+
+    Args:
+        pattern (str): A directory or a glob of Swagger files. See `discover_services`.
+        output_dir (str): The directory of the generated documentation.
+        ai (str, optional): The AI service used to improve the documentation. Skipped if not provided.
+        workers (int, optional): The number of worker processes. Defaults to the number of available cores.
+        cache_dir (str, optional): The directory of the AI response cache.
+        spec_cache_dir (str, optional): The directory of the parsed spec cache.
+
+    Returns:
+        list: The result of every service, in the order of `discover_services`.
+    """
+
+    services = discover_services(pattern)
+    if not services:
+        logging.error(f"No Swagger files found for {pattern}")
+        return []
+
+    workers = min(workers or available_cores(), len(services))
+    logging.info(f"Documenting {len(services)} services with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(document_service, service, swagger_file, test_file, output_dir, ai, cache_dir, spec_cache_dir)
+                   for service, swagger_file, test_file in services]
+        results = []
+        for (service, swagger_file, _), future in zip(services, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker itself died (e.g. out of memory), the other services still complete
+                logging.error(f"Worker failed while documenting {service}: {e}")
+                results.append({'service': service, 'swagger_file': swagger_file, 'output_file': None, 'title': service,
+                                'version': None, 'operations': 0, 'seconds': 0.0, 'error': f"{type(e).__name__}: {e}"})
+
+    for result in results:
+        logging.info(f"{result['service']}: {result['operations']} operations in {result['seconds']:.3f}s"
+                     + (f" (failed: {result['error']})" if result['error'] else ""))
+    failed = sum(1 for result in results if result['error'])
+    index_file = generate_index(results, output_dir)
+    logging.info(f"Batch complete: {len(results) - failed} documented, {failed} failed. Index stored in {index_file}")
+    return results
+
+###------ Watch Mode -----
+WATCH_DEBOUNCE = 0.3
+WATCH_POLL_INTERVAL = 0.1
+
+class DocumentationWatcher:
+    """
+    Keeps the parsed spec, the test summaries and the rendered path sections in memory, and
+    regenerates the documentation preview when the Swagger or test files change.
+
+    Only the modified file is parsed again, and only the path sections whose operations changed are
+    rendered again. Files are polled for their modification time and size, and a burst of changes
+    (e.g. an editor writing a temporary file, then renaming it) triggers a single regeneration once
+    no change was seen for `debounce` seconds. The AI stage is skipped so that previews stay fast.
+    """
+
+    def __init__(self, swagger_file, test_file, output_file, debounce=WATCH_DEBOUNCE,
+                 poll_interval=WATCH_POLL_INTERVAL, token_budget=None, schema_depth=SCHEMA_DEPTH):
+        self.swagger_file = swagger_file
+        self.test_file = test_file
+        self.output_file = output_file
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.token_budget = token_budget
+        self.schema_depth = schema_depth
+        self.schemas = None
+        self.metadata = None
+        self.paths = {}
+        self.test_summaries = []
+        # Path -> (fingerprint of its operations, rendered section)
+        self.sections = {}
+        self.regenerations = 0
+
+    def _snapshot(self):
+        files = [self.swagger_file]
+        if self.test_file:
+            files += find_test_files(self.test_file) if os.path.isdir(self.test_file) else [self.test_file]
+        snapshot = {}
+        for filename in files:
+            try:
+                stat = os.stat(filename)
+                snapshot[filename] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                snapshot[filename] = None
+        return snapshot
+
+    def load_spec(self):
+        """
+        Parses the Swagger file again and renders the path sections whose operations changed.
+
+        Returns:
+            int: The number of path sections rendered again.
+        """
+
+        self.metadata, self.paths = parse_swagger(self.swagger_file)
+        self.schemas = schema_renderer(self.metadata, self.schema_depth)
+        schema_fingerprint = fingerprint(sorted(self.schemas.definitions)) if self.schemas else None
+        sections = {}
+        rendered = 0
+        for path, methods in self.paths.items():
+            path_fingerprint = fingerprint(schema_fingerprint, [[method, operation.to_dict()] for method, operation in methods.items()])
+            previous = self.sections.get(path)
+            if previous is not None and previous[0] == path_fingerprint:
+                sections[path] = previous
+            else:
+                sections[path] = (path_fingerprint, render_operations(((path, method, operation) for method, operation in methods.items()),
+                                                                      self.schemas))
+                rendered += 1
+        self.sections = sections
+        return rendered
+
+    def load_tests(self):
+        """
+        Extracts the test summaries again.
+        """
+
+        self.test_summaries = extract_test_info(self.test_file) if self.test_file else []
+
+    def render(self):
+        """
+        Assembles the preview from the sections in memory and writes it to the output file.
+
+        Returns:
+            str: The documentation preview.
+        """
+
+        documentation = render_header(self.metadata) + "".join(section for _, section in self.sections.values())
+        if self.schemas:
+            documentation += "".join(self.schemas.iter_models(iter_operations(self.paths)))
+        if self.test_summaries:
+            documentation = append_test_summaries(self.test_summaries, documentation, self.token_budget)
+        export_documentation(documentation, self.output_file)
+        return documentation
+
+    def regenerate(self, changed):
+        """
+        Reloads the changed files and writes the preview. A file that fails to load (e.g. while it is
+        being saved) is reported and the previous state is kept.
+
+        Args:
+            changed (set): The changed files.
+
+        Returns:
+            bool: True if the preview was written.
+        """
+
+        start = time.perf_counter()
+        rendered = 0
+        if self.metadata is None or self.swagger_file in changed:
+            try:
+                rendered = self.load_spec()
+            except (OSError, ValueError, ImportError) as e:
+                logging.error(f"Error occurred while reloading {self.swagger_file}: {e}")
+        if self.test_file and changed - {self.swagger_file}:
+            try:
+                self.load_tests()
+            except (OSError, ValueError, SyntaxError) as e:
+                logging.error(f"Error occurred while reloading {self.test_file}: {e}")
+        if self.metadata is None:
+            return False
+        self.render()
+        self.regenerations += 1
+        logging.info(f"Documentation preview regenerated in {time.perf_counter() - start:.3f}s "
+                     f"({rendered} of {len(self.sections)} path sections rendered)")
+        return True
+
+    def watch(self, max_regenerations=None):
+        """
+        Generates the preview, then regenerates it on every debounced burst of changes until interrupted.
+
+        Args:
+            max_regenerations (int, optional): Stop after this many regenerations, including the first one.
+        """
+
+        snapshot = self._snapshot()
+        self.regenerate(set(snapshot))
+        logging.info(f"Watching {', '.join(snapshot)} for changes. Press Ctrl+C to stop.")
+        changed = set()
+        last_change = None
+        try:
+            while max_regenerations is None or self.regenerations < max_regenerations:
+                time.sleep(self.poll_interval)
+                current = self._snapshot()
+                modified = {filename for filename in current.keys() | snapshot.keys()
+                            if current.get(filename) != snapshot.get(filename)}
+                snapshot = current
+                if modified:
+                    changed |= modified
+                    last_change = time.monotonic()
+                elif changed and time.monotonic() - last_change >= self.debounce:
+                    self.regenerate(changed)
+                    changed = set()
+        except KeyboardInterrupt:
+            logging.info("Watch mode stopped")
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Generate API documentation from a Swagger file and its tests.")
+    parser.add_argument('--swagger', default="input/swagger.json", help="Path to the Swagger file.")
+    parser.add_argument('--tests', default="input/test_api.py", help="Path to the Python test file, or to a directory of test files.")
+    parser.add_argument('--output', default="output/documentation.md", help="Path of the generated documentation.")
+    parser.add_argument('--ai', default="gemini",
+                        help="AI service used to improve the documentation (openai, gemini or fynd), or a comma-separated "
+                             "fallback chain such as 'gemini,openai,fynd'.")
+    parser.add_argument('--no-ai', action='store_true',
+                        help="Skip AI enhancement and write the documentation with its test summaries as is. "
+                             "No AI SDK is imported.")
+    parser.add_argument('--hedge-after', type=float,
+                        help="Hedge a request with the next service of the --ai chain once it runs longer than the p95 latency "
+                             "of its service, using this many seconds until enough latencies were measured.")
+    parser.add_argument('--breaker-threshold', type=int, default=3,
+                        help="Consecutive failures after which an AI service is skipped by the --ai chain.")
+    parser.add_argument('--breaker-reset', type=float, default=60.0,
+                        help="Seconds after which a skipped AI service is tried again.")
+    parser.add_argument('--search', metavar='QUERY',
+                        help="Look up endpoints in the search index instead of generating documentation, e.g. "
+                             "'method:get param:petId' or 'upload*'.")
+    parser.add_argument('--index', nargs='+', default=[SEARCH_INDEX_FILE],
+                        help="Search index files or globs queried by --search, e.g. 'output/batch/*.idx'.")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum number of --search results.")
+    parser.add_argument('--formats',
+                        help="Comma-separated formats also exported from the parsed spec: markdown, html, json and site "
+                             "(a static site with one page per tag or path).")
+    parser.add_argument('--export-dir', default="output/export", help="Directory of the files written by --formats.")
+    parser.add_argument('--site-group-by', choices=['tag', 'path'], default='tag', help="How operations are grouped into site pages.")
+    parser.add_argument('--site-page-size', type=int, default=SITE_PAGE_OPERATIONS,
+                        help="Maximum number of operations per site page. Larger groups are split into several pages.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and regenerate the documentation preview (without AI) whenever the Swagger or test files change.")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help="Seconds without further changes before watch mode regenerates the preview.")
+    parser.add_argument('--batch', help="Directory or glob of Swagger files to document in parallel, one output per service.")
+    parser.add_argument('--output-dir', default="output/batch", help="Directory of the generated documentation in batch mode.")
+    parser.add_argument('--workers', type=int, help="Number of worker processes in batch mode. Defaults to the number of available cores.")
+    parser.add_argument('--streaming-parser', action='store_true',
+                        help="Parse the Swagger file incrementally to bound memory on very large specs.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream the AI response into the output file as it is generated (single-prompt mode).")
+    parser.add_argument('--chunked', action='store_true',
+                        help="Send the documentation to the AI service in concurrent chunks grouped by path prefix.")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Enhance the documentation operation by operation, sending one representative of every group of "
+                             "operations with the same parameters and responses, and reusing its section for the others.")
+    parser.add_argument('--group-by', choices=['prefix', 'path'], default='prefix', help="How endpoints are grouped in chunked mode.")
+    parser.add_argument('--max-concurrency', type=int, default=4, help="Maximum number of concurrent AI requests in chunked mode.")
+    parser.add_argument('--tokens-per-minute', type=int, help="Maximum number of prompt tokens sent per minute in chunked mode.")
+    parser.add_argument('--async-pipeline', action='store_true',
+                        help="Overlap parsing, test analysis, rendering, AI enhancement and export, writing the endpoint "
+                             "groups to the output as they are enhanced. Produces the same documentation as --chunked.")
+    parser.add_argument('--queue-size', type=int, default=ASYNC_QUEUE_SIZE,
+                        help="Maximum number of sections rendered ahead of the export with --async-pipeline.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only regenerate the sections whose operations or related tests changed since the previous run.")
+    parser.add_argument('--manifest', default="output/manifest.json", help="Path of the manifest used by incremental mode.")
+    parser.add_argument('--token-budget', type=int,
+                        help="Maximum number of tokens of a prompt. Test summaries are compacted to fit it.")
+    parser.add_argument('--schema-depth', type=int, default=SCHEMA_DEPTH,
+                        help="Depth of the response and body schemas expanded into the Models section, whose models "
+                             "endpoints link to. 0 renders the status and description of responses only.")
+    parser.add_argument('--metrics', help="Write a JSON report of stage durations, peak memory and counters to this file.")
+    parser.add_argument('--prometheus', help="Write the metrics in the Prometheus text format to this file.")
+    parser.add_argument('--profile', help="Run the pipeline under cProfile and write the profile to this file.")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the AI response cache.")
+    parser.add_argument('--clear-cache', action='store_true', help="Remove every entry of the AI response cache before running.")
+    parser.add_argument('--cache-dir', default=AI_CACHE_DIR, help="Directory of the AI response cache.")
+    parser.add_argument('--cache-max-size', type=int, default=AI_CACHE_MAX_BYTES, help="Maximum size of the AI response cache in bytes.")
+    parser.add_argument('--cache-ttl', type=int, default=AI_CACHE_TTL, help="Time to live of AI response cache entries in seconds.")
+    parser.add_argument('--no-spec-cache', action='store_true', help="Parse the Swagger file again instead of reading the parsed spec cache.")
+    parser.add_argument('--clear-spec-cache', action='store_true', help="Remove every entry of the parsed spec cache before running.")
+    parser.add_argument('--spec-cache-dir', default=SPEC_CACHE_DIR, help="Directory of the parsed spec cache.")
+    args = parser.parse_args(argv)
+    if args.formats:
+        unknown = {name.strip().lower() for name in args.formats.split(',') if name.strip()} - set(EXPORT_FORMATS)
+        if unknown:
+            parser.error(f"unsupported --formats {', '.join(sorted(unknown))} (choose from {', '.join(EXPORT_FORMATS)})")
+    if args.no_ai:
+        modes = [flag for flag, enabled in (('--chunked', args.chunked), ('--dedup', args.dedup), ('--stream', args.stream),
+                                            ('--incremental', args.incremental), ('--async-pipeline', args.async_pipeline))
+                 if enabled]
+        if modes:
+            parser.error(f"--no-ai cannot be combined with {', '.join(modes)}")
+    return args
+
+def main(argv=None):
+    """
+    Runs the documentation pipeline: parse, render, test analysis, AI enhancement and export.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to `sys.argv[1:]`.
+    """
+
+    args = parse_args(argv)
+    if args.search is not None:
+        start = time.perf_counter()
+        results = search_indexes(args.index, args.search, args.limit)
+        for record in results:
+            location = f"{record['source']}:{record['line']}" if record['line'] else record['source']
+            print(f"{record['method']} {record['path']}  {location}  [{record['service']}]  {record['description']}")
+        logging.info(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.2f} ms")
+        return
+    if args.batch:
+        run_batch(args.batch, args.output_dir, ai=None if args.no_ai else args.ai, workers=args.workers,
+                  cache_dir=None if args.no_cache else args.cache_dir,
+                  spec_cache_dir=None if args.no_spec_cache else args.spec_cache_dir)
+        return
+
+    if args.watch:
+        DocumentationWatcher(args.swagger, args.tests, args.output, debounce=args.debounce,
+                             token_budget=args.token_budget, schema_depth=args.schema_depth).watch()
+        return
+
+    # tracemalloc slows every allocation, which would skew the profile, so peaks are not measured under --profile
+    metrics = PipelineMetrics(trace_memory=bool((args.metrics or args.prometheus) and not args.profile))
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(run_pipeline, args, metrics)
+        profiler.dump_stats(args.profile)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+        logging.info("Profile stored in %s\n%s", args.profile, stream.getvalue())
+    else:
+        run_pipeline(args, metrics)
+
+    metrics.stop()
+    if args.metrics:
+        export_documentation(json.dumps(metrics.report(), indent=2), args.metrics)
+        logging.info("Metrics stored in %s", args.metrics)
+    if args.prometheus:
+        export_documentation(metrics.to_prometheus(), args.prometheus)
+        logging.info("Prometheus metrics stored in %s", args.prometheus)
+
+def record_ai_stats(router, cache, metrics):
+    """
+    Logs the routing and response cache statistics of a run and records them as metrics.
+
+    Args:
+        router (ProviderRouter): The router used by the run.
+        cache (ResponseCache, optional): The response cache used by the run.
+        metrics (PipelineMetrics): The metrics recorder of the run.
+    """
+
+    routing_stats = router.stats()
+    logging.info("AI routing stats: %s", routing_stats)
+    # The prompts of the chunks, templates or changed groups actually sent, whatever the mode
+    metrics.count('prompt_tokens', routing_stats['prompt_tokens'])
+    for name in ('fallbacks', 'hedges', 'short_circuits', 'failures'):
+        metrics.count(f"ai_{name}", routing_stats[name])
+    if cache is not None:
+        logging.info("AI response cache stats: %s", cache.stats())
+        for name, value in cache.stats().items():
+            metrics.count(f"ai_cache_{name}", value)
+
+def run_pipeline(args, metrics):
+    """
+    Runs the documentation pipeline for a single Swagger file, timing every stage.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        metrics (PipelineMetrics): The metrics recorder of the run.
+    """
 
-if __name__ == "__main__":
     # Define file paths for the Swagger and test files
-    swagger_file = "input/swagger.json"
-    test_file = "input/test_api.py"
-    output_file = "output/documentation.md"
+    swagger_file = args.swagger
+    test_file = args.tests
+    output_file = args.output
     # Parse Swagger file and generate initial documentation
-    metadata, paths = parse_swagger(swagger_file)
+    spec_cache = None
+    if not args.no_spec_cache or args.clear_spec_cache:
+        spec_cache = SpecCache(args.spec_cache_dir)
+        if args.clear_spec_cache:
+            spec_cache.clear()
+            logging.info("Parsed spec cache cleared")
+        if args.no_spec_cache:
+            spec_cache = None
+    router = None
+    if not args.no_ai:
+        router = ProviderRouter(args.ai.split(','), hedge_after=args.hedge_after,
+                                failure_threshold=args.breaker_threshold, reset_timeout=args.breaker_reset)
+    cache = None
+    if not args.no_ai and (not args.no_cache or args.clear_cache):
+        cache = ResponseCache(args.cache_dir, max_bytes=args.cache_max_size, ttl=args.cache_ttl)
+        if args.clear_cache:
+            cache.clear()
+            logging.info("AI response cache cleared")
+        if args.no_cache:
+            cache = None
+    if args.async_pipeline:
+        # Parsing, test analysis, rendering, AI enhancement and export overlap, so they are timed as one stage
+        with metrics.stage('pipeline'):
+            sections = run_async_pipeline(swagger_file, test_file, router, output_file, group_by=args.group_by,
+                                          max_concurrency=args.max_concurrency, queue_size=args.queue_size,
+                                          tokens_per_minute=args.tokens_per_minute, cache=cache,
+                                          spec_cache=spec_cache, token_budget=args.token_budget,
+                                          schema_depth=args.schema_depth)
+        metrics.count('sections', sections)
+        record_ai_stats(router, cache, metrics)
+        logging.info("Documentation stored in %s", output_file)
+        return
+    with metrics.stage('parse'):
+        if args.streaming_parser:
+            # The streaming parser bounds memory by never materializing the whole spec, so it is not cached
+            metadata, paths = parse_swagger_streaming(swagger_file)
+        else:
+            metadata, paths = parse_swagger(swagger_file, cache=spec_cache)
     logging.info("Swagger File Parsed")
-    documentation = generate_documentation(metadata, paths)
-    logging.info("Base Documentation Generated")
-    # Enhance documentation with test summaries
-    documentation_with_tests = enhance_prompt_with_tests(test_file, documentation)
-    logging.info("Updated Documentation with Test Summaries")
-    # Process the documentation through the AI component for improvements
-    final_documentation = ai_component(documentation_with_tests, ai='gemini') # Gemini Tested
-    logging.info("Improvised Documentation using GenAI")
+    if spec_cache is not None:
+        for name, value in spec_cache.stats().items():
+            metrics.count(f"spec_cache_{name}", value)
+    # Operations and parameters are counted as the records flow into the next stage
+    paths = metrics.count_operations(paths)
+    formats = [name.strip().lower() for name in args.formats.split(',') if name.strip()] if args.formats else []
+    if formats or args.dedup or args.chunked and not args.incremental:
+        # Every format (and the test linker) reads the same model, so streamed records are collected once
+        paths = collect_paths(paths)
+    if args.incremental:
+        # Render, test analysis and AI enhancement only run for the sections that changed
+        with metrics.stage('incremental'):
+            final_documentation = generate_incremental(metadata, paths, test_file, ai=router, manifest_file=args.manifest,
+                                                       group_by=args.group_by, max_concurrency=args.max_concurrency,
+                                                       tokens_per_minute=args.tokens_per_minute, cache=cache,
+                                                       token_budget=args.token_budget, schema_depth=args.schema_depth)
+    else:
+        with metrics.stage('render'):
+            if isinstance(paths, dict):
+                documentation = generate_documentation(metadata, paths, schema_depth=args.schema_depth)
+            else:
+                # Streamed records are rendered straight to disk, so memory stays bounded by the largest path item
+                write_documentation(metadata, paths, "output/intermediate.md", args.schema_depth, index_file=SEARCH_INDEX_FILE)
+                documentation = None
+        logging.info("Base Documentation Generated")
+        # Enhance documentation with test summaries
+        test_links = None
+        with metrics.stage('tests'):
+            if args.chunked and not args.dedup:
+                # Every endpoint group carries its own tests; only the unlinked ones go to the overview
+                test_links, unlinked = link_tests(paths, extract_test_info(test_file))
+                metrics.count('tests_linked', len({id(test) for tests in test_links.values() for test in tests}))
+                metrics.count('tests_unlinked', len(unlinked))
+                documentation_with_tests = (append_test_summaries(unlinked, documentation, token_budget=args.token_budget)
+                                            if unlinked else documentation)
+            elif documentation is None and args.no_ai:
+                # Offline streamed run: the test summary is appended while the rendered file is copied to the output
+                prompt_tokens = estimate_tokens(build_ai_prompt("")) + os.path.getsize("output/intermediate.md") // CHARS_PER_TOKEN
+                test_summary = fit_test_summaries(extract_test_info(test_file), prompt_tokens, args.token_budget)
+                documentation_with_tests = None
+            else:
+                if documentation is None:
+                    # The prompt holds the whole documentation, so the streamed rendering is read back
+                    with open("output/intermediate.md", 'r') as f:
+                        documentation = f.read()
+                documentation_with_tests = enhance_prompt_with_tests(test_file, documentation, token_budget=args.token_budget)
+        logging.info("Updated Documentation with Test Summaries")
+        # Process the documentation through the AI component for improvements
+        with metrics.stage('ai'):
+            if args.no_ai and documentation_with_tests is None:
+                export_documentation_file("output/intermediate.md", output_file, f"\n\n{test_summary}" if test_summary else "")
+                final_documentation = None
+            elif args.no_ai:
+                # Offline run: the documentation and its test summaries are exported as they are
+                final_documentation = documentation_with_tests
+            elif args.dedup:
+                final_documentation, report = ai_component_deduplicated(documentation_with_tests, paths, ai=router,
+                                                                        max_concurrency=args.max_concurrency,
+                                                                        tokens_per_minute=args.tokens_per_minute, cache=cache,
+                                                                        schemas=schema_renderer(metadata, args.schema_depth))
+                metrics.count('dedup_groups', report['groups'])
+                metrics.count('dedup_prompt_tokens_saved', report['prompt_tokens'] - report['deduplicated_prompt_tokens'])
+            elif args.chunked:
+                final_documentation = ai_component_chunked(documentation_with_tests, ai=router, max_concurrency=args.max_concurrency,
+                                                           tokens_per_minute=args.tokens_per_minute, group_by=args.group_by, cache=cache,
+                                                           test_links=test_links)
+            elif args.stream:
+                # The response is written to the output file as it arrives
+                stream_documentation(documentation_with_tests, ai=router, filename=output_file, cache=cache)
+                final_documentation = None
+            else:
+                final_documentation = ai_component(documentation_with_tests, ai=router, cache=cache) # Gemini Tested
+    if router is not None:
+        record_ai_stats(router, cache, metrics)
+        logging.info("Improvised Documentation using GenAI")
     # Export the final documentation to a markdown file
-    export_documentation(final_documentation, output_file)
+    with metrics.stage('export'):
+        if final_documentation is not None:
+            export_documentation(final_documentation, output_file)
+        if formats:
+            export_formats(metadata, paths, formats, args.export_dir, group_by=args.site_group_by,
+                           page_operations=args.site_page_size, schema_depth=args.schema_depth)
     logging.info("Documentation Exported")
     # Print the final documentation to console
     # print(final_documentation)
     logging.info("Documentation stored in %s", output_file)
+
+if __name__ == "__main__":
+    main()